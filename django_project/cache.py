@@ -0,0 +1,149 @@
+import math
+import random
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+class TieredCache(BaseCache):
+    """
+    Keeps a short-lived copy of shared cache entries in process memory, so hot
+    keys are read from Redis or the database at most once per worker every
+    ``LOCAL_TIMEOUT`` seconds.
+
+    Entries are stored with their compute time and expiry. ``get_or_set``
+    refreshes an entry a little before it expires, with a probability that
+    grows as expiry nears, and lets only one worker recompute a missing entry
+    while the others wait for it. This keeps an expiring hot key from sending
+    every worker to the database at once.
+
+    Deletes reach the local copy of the current process only; other workers
+    may serve the old value for up to ``LOCAL_TIMEOUT`` seconds.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.local_alias = options.get("LOCAL", "local")
+        self.shared_alias = options.get("SHARED", "default")
+        self.local_timeout = options.get("LOCAL_TIMEOUT", 5)
+        self.lock_timeout = options.get("LOCK_TIMEOUT", 10)
+        self.lock_wait = options.get("LOCK_WAIT", 0.05)
+        # Higher values refresh earlier, 1 is the usual choice
+        self.beta = options.get("BETA", 1.0)
+
+    @property
+    def local(self):
+        return caches[self.local_alias]
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def _get_local_timeout(self, timeout):
+        if timeout is None:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def _get_entry(self, key):
+        entry = self.local.get(key)
+        if entry is None:
+            entry = self.shared.get(key)
+            if entry is not None:
+                self._set_local(key, entry)
+        return entry
+
+    def _set_local(self, key, entry):
+        value, expires, delta = entry
+        timeout = None if expires is None else max(expires - time.time(), 0)
+        self.local.set(key, entry, self._get_local_timeout(timeout))
+
+    def _make_entry(self, value, timeout, delta=0):
+        expires = None if timeout is None else time.time() + timeout
+        return value, expires, delta
+
+    def _is_stale(self, entry):
+        value, expires, delta = entry
+        if expires is None or not delta:
+            return False
+        # 1 - random() is in (0, 1], so the log never sees zero
+        early = delta * self.beta * -math.log(1 - random.random())
+        return time.time() + early >= expires
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        timeout = self.get_backend_timeout(timeout)
+        entry = self._make_entry(value, timeout)
+        if not self.shared.add(key, entry, timeout):
+            return False
+        self._set_local(key, entry)
+        return True
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        entry = self._get_entry(key)
+        return default if entry is None else entry[0]
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._set(key, value, self.get_backend_timeout(timeout))
+
+    def _set(self, key, value, timeout, delta=0):
+        entry = self._make_entry(value, timeout, delta)
+        self.shared.set(key, entry, timeout)
+        self._set_local(key, entry)
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        timeout = self.get_backend_timeout(timeout)
+        entry = self._get_entry(key)
+        if entry is not None and not self._is_stale(entry):
+            return entry[0]
+
+        lock_key = f"{key}:lock"
+        deadline = time.monotonic() + self.lock_timeout
+        locked = self.shared.add(lock_key, True, self.lock_timeout)
+        while not locked:
+            if entry is not None:
+                # Someone else is refreshing, the current value is still valid
+                return entry[0]
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(self.lock_wait)
+            entry = self.shared.get(key)
+            if entry is not None:
+                self._set_local(key, entry)
+                return entry[0]
+            locked = self.shared.add(lock_key, True, self.lock_timeout)
+
+        try:
+            started = time.monotonic()
+            value = default() if callable(default) else default
+            if value is not None:
+                self._set(key, value, timeout, time.monotonic() - started)
+            return value
+        finally:
+            if locked:
+                self.shared.delete(lock_key)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        entry = self._get_entry(key)
+        if entry is None:
+            return False
+        self._set(key, entry[0], self.get_backend_timeout(timeout), entry[2])
+        return True
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self.local.delete(key)
+        return self.shared.delete(key)
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._get_entry(key) is not None
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
@@ -16,6 +16,7 @@ import string
 from email.policy import default
 from pathlib import Path
 
+from boto3.s3.transfer import TransferConfig
 from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
 from environs import Env
@@ -92,10 +93,60 @@ MIDDLEWARE = [
     # "django.middleware.cache.FetchFromCacheMiddleware",
 ]
 
+# Caches are shared by every worker: Redis when REDIS_URL is set, a database
+# table otherwise (created by "manage.py createcachetable"). "local" is a
+# per-process cache and "tiered" puts it in front of the shared one for hot,
+# rarely changing keys, see django_project/cache.py.
+REDIS_URL = env.str("REDIS_URL", default="")
+
+if REDIS_URL:
+    SHARED_CACHE = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    }
+else:
+    SHARED_CACHE = {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    }
+
+TIERED_CACHE = {
+    "BACKEND": "django_project.cache.TieredCache",
+    "OPTIONS": {
+        "LOCAL": "local",
+        "SHARED": "default",
+        "LOCAL_TIMEOUT": env.int("LOCAL_CACHE_SECONDS", default=5),
+    },
+}
+
+CACHES = {
+    "default": {
+        **SHARED_CACHE,
+        "KEY_PREFIX": "uwc",
+    },
+    "local": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "local",
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+    "tiered": TIERED_CACHE,
+    # Used by the {% cache %} template tag
+    "template_fragments": TIERED_CACHE,
+}
+
 CACHE_MIDDLEWARE_ALIAS = "default"
 CACHE_MIDDLEWARE_SECONDS = 604800
 CACHE_MIDDLEWARE_KEY_PREFIX = ""
 
+# Full-page cache for anonymous visitors of public pages. Entries are dropped
+# when the content they show changes, see pages/cache.py
+PAGE_CACHE_ALIAS = "default"
+PAGE_CACHE_SECONDS = env.int("PAGE_CACHE_SECONDS", default=60 * 60 * 24)
+
+# Navigation and footer fragments of the base layouts, keyed by language, user
+# role and the nav version in hub/cache.py
+FRAGMENT_CACHE_SECONDS = env.int("FRAGMENT_CACHE_SECONDS", default=60 * 60 * 24)
+
 ROOT_URLCONF = "django_project.urls"
 
 TEMPLATES = [
@@ -174,6 +225,11 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Local staging directory for uploads when running with DEBUG (see the
+# "staging" storage below)
+MEDIA_UPLOAD_TEMP_ROOT = env.str(
+    "MEDIA_UPLOAD_TEMP_ROOT", default=str(BASE_DIR / "media_tmp")
+)
 
 # LOCALE_PATHS = [BASE_DIR / "locale"]
 LOCALE_PATHS = [
@@ -214,16 +270,40 @@ AWS_S3_ACCESS_KEY_ID = env.str("AWS_S3_ACCESS_KEY_ID")
 AWS_S3_SECRET_ACCESS_KEY = env.str("AWS_S3_SECRET_ACCESS_KEY")
 AWS_STORAGE_BUCKET_NAME = env.str("AWS_STORAGE_BUCKET_NAME")
 AWS_S3_CUSTOM_DOMAIN = "%s.s3.amazonaws.com" % AWS_STORAGE_BUCKET_NAME
-AWS_S3_FILE_OVERWRITE = True
+# Media keys carry a version token (hub.storage.VersionedUploadTo), so
+# objects are never overwritten and can be cached for a year
+AWS_S3_FILE_OVERWRITE = False
+AWS_S3_OBJECT_PARAMETERS = {
+    "CacheControl": "public, max-age=31536000, immutable",
+}
+# Files above the threshold are sent to S3 as multipart uploads
+AWS_S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=4,
+)
 
 STORAGES = {
     # Media file (image) management
     "default": {
         "BACKEND": (
-            "storages.backends.s3boto3.S3Boto3Storage",
+            "hub.storage.MediaStorage",
             "django.core.files.storage.FileSystemStorage",
         )[DEBUG],
     },
+    # Uploads wait here until the process_media worker copies them to media
+    # storage. In production this is shared S3, as the worker runs on
+    # another dyno than the web process that received the upload.
+    "staging": (
+        {
+            "BACKEND": "storages.backends.s3boto3.S3Boto3Storage",
+            "OPTIONS": {"location": "staging", "object_parameters": {}},
+        },
+        {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+            "OPTIONS": {"location": MEDIA_UPLOAD_TEMP_ROOT},
+        },
+    )[DEBUG],
     #     CSS and JS file management
     "staticfiles": {
         "BACKEND": (
@@ -317,3 +397,5 @@ LOGGING = {
 PAYPAL_CLIENT_ID = env("PAYPAL_CLIENT_ID")
 PAYPAL_CLIENT_SECRET = env("PAYPAL_CLIENT_SECRET")
 PAYPAL_MODE = env("PAYPAL_MODE", default="sandbox")
+# Overrides the API address of PAYPAL_MODE, e.g. to use the fake_paypal command
+PAYPAL_API_URL = env("PAYPAL_API_URL", default="")
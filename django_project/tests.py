@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import TestCase
+
+
+class TieredCacheTests(TestCase):
+    def setUp(self):
+        self.cache = caches["tiered"]
+        self.cache.clear()
+
+    def test_get_reads_local_copy(self):
+        self.cache.set("key", "value", 60)
+        caches["default"].clear()
+
+        self.assertEqual(self.cache.get("key"), "value")
+
+    def test_get_fills_local_copy_from_shared_cache(self):
+        self.cache.set("key", "value", 60)
+        caches["local"].clear()
+
+        self.assertEqual(self.cache.get("key"), "value")
+        caches["default"].clear()
+        self.assertEqual(self.cache.get("key"), "value")
+
+    def test_delete_removes_both_copies(self):
+        self.cache.set("key", "value", 60)
+        self.cache.delete("key")
+
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_get_or_set_computes_missing_value_once(self):
+        compute = mock.Mock(return_value="value")
+
+        self.assertEqual(self.cache.get_or_set("key", compute, 60), "value")
+        self.assertEqual(self.cache.get_or_set("key", compute, 60), "value")
+        compute.assert_called_once()
+
+    def test_get_or_set_refreshes_before_expiry(self):
+        self.cache._set(self.cache.make_key("key"), "old", 60, delta=30)
+
+        with mock.patch("django_project.cache.random.random", return_value=0.99):
+            value = self.cache.get_or_set("key", "new", 60)
+        self.assertEqual(value, "new")
+
+    def test_get_or_set_serves_old_value_while_another_worker_refreshes(self):
+        key = self.cache.make_key("key")
+        self.cache._set(key, "old", 60, delta=30)
+        caches["default"].add(f"{key}:lock", True)
+
+        with mock.patch("django_project.cache.random.random", return_value=0.99):
+            value = self.cache.get_or_set("key", "new", 60)
+        self.assertEqual(value, "old")
+
+    def test_get_or_set_waits_for_another_worker_on_miss(self):
+        key = self.cache.make_key("key")
+        caches["default"].add(f"{key}:lock", True)
+
+        def finish_refresh(seconds):
+            caches["default"].set(key, ("value", None, 0))
+
+        compute = mock.Mock(return_value="other")
+        with mock.patch("django_project.cache.time.sleep", side_effect=finish_refresh):
+            value = self.cache.get_or_set("key", compute, 60)
+        self.assertEqual(value, "value")
+        compute.assert_not_called()
@@ -0,0 +1,16 @@
+from django.core.cache import caches
+
+# Part of every navigation fragment key, bumped when the menus change
+NAV_VERSION_KEY = "nav:version"
+
+
+def get_nav_version():
+    return caches["tiered"].get_or_set(NAV_VERSION_KEY, 1, timeout=None)
+
+
+def invalidate_nav():
+    cache = caches["tiered"]
+    try:
+        cache.incr(NAV_VERSION_KEY)
+    except ValueError:
+        cache.set(NAV_VERSION_KEY, 2, timeout=None)
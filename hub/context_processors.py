@@ -4,4 +4,5 @@ from django.conf import settings
 def context_processor(request):
     return {
         "admin_path": settings.DJANGO_ADMIN_PATH,
+        "fragment_cache_seconds": settings.FRAGMENT_CACHE_SECONDS,
     }
@@ -1,5 +1,5 @@
 from django import forms
-from django.forms import inlineformset_factory
+from django.forms import BaseInlineFormSet, inlineformset_factory
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext as _
 
@@ -45,10 +45,42 @@ class SectionForm(forms.ModelForm):
         }
 
 
+class LoadedInstanceChoiceField(forms.ModelChoiceField):
+    """
+    Hidden primary key field that resolves to the instance the formset has
+    already loaded, instead of issuing one lookup query per form.
+    """
+
+    def __init__(self, instance, *args, **kwargs):
+        self.instance = instance
+        super().__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        if value not in self.empty_values and str(value) == str(self.instance.pk):
+            return self.instance
+        return super().to_python(value)
+
+
+class BaseSectionFormSet(BaseInlineFormSet):
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        if form.is_bound and not form.instance._state.adding:
+            pk_name = self._pk_field.name
+            pk_field = form.fields[pk_name]
+            form.fields[pk_name] = LoadedInstanceChoiceField(
+                form.instance,
+                pk_field.queryset,
+                initial=pk_field.initial,
+                required=False,
+                widget=pk_field.widget,
+            )
+
+
 SectionFormSet = inlineformset_factory(
     Page,
     Section,
     form=SectionForm,
+    formset=BaseSectionFormSet,
     extra=0,
     can_delete=True,
 )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from hub.cache import invalidate_nav
+
+
+class Command(BaseCommand):
+    help = "Drops the cached navigation fragments, e.g. after a deploy."
+
+    def handle(self, *args, **options):
+        invalidate_nav()
+        self.stdout.write("Navigation cache invalidated.")
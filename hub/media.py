@@ -0,0 +1,100 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.storage import storages
+from django.db import transaction
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+
+from .models import MediaItem, MediaTask
+
+staging_storage = storages["staging"]
+
+
+def stage_upload(item, field_name="content_draft"):
+    """
+    Writes a freshly uploaded file to staging storage and points the item at
+    the name it will have once the worker has copied it to media storage.
+    Returns an unsaved upload task, or None if the field holds no new upload.
+    """
+    field_file = getattr(item, field_name)
+    if not isinstance(field_file, FieldFile) or not field_file or field_file._committed:
+        return None
+
+    name = field_file.field.generate_filename(item, field_file.name)
+    source = staging_storage.save(name, field_file.file)
+
+    setattr(item, field_name, name)
+    item.upload_status = MediaItem.UploadStatus.PENDING
+
+    return MediaTask(
+        action=MediaTask.Action.UPLOAD,
+        content_type=ContentType.objects.get_for_model(item),
+        object_id=item.pk,
+        field_name=field_name,
+        source=source,
+        target=name,
+    )
+
+
+def schedule_delete(field_file, name=None):
+    """
+    Returns an unsaved task deleting ``name`` (or the file currently held by
+    ``field_file``) from the field's storage.
+    """
+    name = name or field_file.name
+    if not name:
+        return None
+
+    return MediaTask(
+        action=MediaTask.Action.DELETE,
+        content_type=ContentType.objects.get_for_model(field_file.instance),
+        object_id=field_file.instance.pk,
+        field_name=field_file.field.name,
+        target=name,
+    )
+
+
+def schedule_renditions(item, field_name="content"):
+    """
+    Returns an unsaved task generating responsive renditions of an image.
+    """
+    return MediaTask(
+        action=MediaTask.Action.RENDER,
+        content_type=ContentType.objects.get_for_model(item),
+        object_id=item.pk,
+        field_name=field_name,
+        target=getattr(item, field_name).name or "",
+    )
+
+
+def enqueue(tasks):
+    return MediaTask.objects.bulk_create([task for task in tasks if task])
+
+
+def claim_pending(batch_size=10):
+    """
+    Claims a batch of due tasks in queue order by moving their ``run_after``
+    past the claim timeout. Locked rows are skipped so several workers can
+    share the queue, and the locks are released as soon as the claim commits.
+    """
+    with transaction.atomic():
+        tasks = list(
+            MediaTask.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(status=MediaTask.Status.PENDING, run_after__lte=timezone.now())
+            .select_related("content_type")
+            .order_by("id")[:batch_size]
+        )
+        MediaTask.objects.filter(pk__in=[task.pk for task in tasks]).update(
+            run_after=timezone.now() + MediaTask.CLAIM_TIMEOUT
+        )
+    return tasks
+
+
+def process_pending(batch_size=10):
+    """
+    Runs one batch of due tasks. Storage work happens outside of any
+    transaction and each task records its own result.
+    """
+    tasks = claim_pending(batch_size)
+    for task in tasks:
+        task.run()
+    return len(tasks)
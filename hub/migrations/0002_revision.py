@@ -0,0 +1,136 @@
+# Generated by Django 5.1.3 on 2026-10-18 23:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_original_data(apps, schema_editor):
+    """
+    Pending snapshots kept in ``original_data`` become the first revision of
+    each object, so rejecting an update still restores them.
+    """
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Revision = apps.get_model("hub", "Revision")
+
+    revisions = []
+    for model_name in ["section", "text", "file", "image", "video", "url"]:
+        model = apps.get_model("hub", model_name)
+        content_type, _ = ContentType.objects.get_or_create(
+            app_label="hub", model=model_name
+        )
+        for object_id, data in (
+            model.objects.filter(original_data__isnull=False)
+            .values_list("id", "original_data")
+            .iterator()
+        ):
+            revisions.append(
+                Revision(
+                    content_type=content_type,
+                    object_id=object_id,
+                    action="RQ",
+                    data={
+                        field: value
+                        for field, value in data.items()
+                        if field.startswith(("title_draft", "content_draft"))
+                        and (value is None or isinstance(value, str))
+                    },
+                )
+            )
+    Revision.objects.bulk_create(revisions, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("hub", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Revision",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("object_id", models.UUIDField()),
+                ("language", models.CharField(blank=True, default="", max_length=2)),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("RQ", "Request update"),
+                            ("CF", "Confirm update"),
+                            ("RJ", "Reject update"),
+                            ("PB", "Publish"),
+                            ("HD", "Hide"),
+                            ("RB", "Rollback"),
+                        ],
+                        max_length=2,
+                    ),
+                ),
+                ("data", models.JSONField(blank=True, default=dict)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="revisions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Revision",
+                "verbose_name_plural": "Revisions",
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["content_type", "object_id", "language", "id"],
+                        name="hub_revisio_content_f43542_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(copy_original_data, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="file",
+            name="original_data",
+        ),
+        migrations.RemoveField(
+            model_name="image",
+            name="original_data",
+        ),
+        migrations.RemoveField(
+            model_name="section",
+            name="original_data",
+        ),
+        migrations.RemoveField(
+            model_name="text",
+            name="original_data",
+        ),
+        migrations.RemoveField(
+            model_name="url",
+            name="original_data",
+        ),
+        migrations.RemoveField(
+            model_name="video",
+            name="original_data",
+        ),
+    ]
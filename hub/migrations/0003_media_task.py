@@ -0,0 +1,91 @@
+# Generated by Django 5.1.3 on 2026-10-18 23:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("hub", "0002_revision"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="file",
+            name="upload_status",
+            field=models.CharField(
+                choices=[("RD", "Ready"), ("PD", "Pending"), ("FL", "Failed")],
+                default="RD",
+                max_length=2,
+            ),
+        ),
+        migrations.AddField(
+            model_name="image",
+            name="upload_status",
+            field=models.CharField(
+                choices=[("RD", "Ready"), ("PD", "Pending"), ("FL", "Failed")],
+                default="RD",
+                max_length=2,
+            ),
+        ),
+        migrations.CreateModel(
+            name="MediaTask",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[("UP", "Upload"), ("DL", "Delete")], max_length=2
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("PD", "Pending"), ("DN", "Done"), ("FL", "Failed")],
+                        default="PD",
+                        max_length=2,
+                    ),
+                ),
+                ("object_id", models.UUIDField(blank=True, null=True)),
+                ("field_name", models.CharField(blank=True, default="", max_length=50)),
+                ("source", models.CharField(blank=True, default="", max_length=255)),
+                ("target", models.CharField(max_length=255)),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("error", models.TextField(blank=True, default="")),
+                ("run_after", models.DateTimeField(default=django.utils.timezone.now)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("updated", models.DateTimeField(auto_now=True)),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Media task",
+                "verbose_name_plural": "Media tasks",
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "run_after"],
+                        name="hub_mediata_status_9bd3b8_idx",
+                    )
+                ],
+            },
+        ),
+    ]
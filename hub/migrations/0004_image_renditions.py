@@ -0,0 +1,26 @@
+# Generated by Django 5.1.3 on 2026-10-19 00:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hub", "0003_media_task"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="image",
+            name="renditions",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name="mediatask",
+            name="action",
+            field=models.CharField(
+                choices=[("UP", "Upload"), ("DL", "Delete"), ("RN", "Render")],
+                max_length=2,
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.3 on 2026-10-19 00:08
+
+import hub.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hub", "0004_image_renditions"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="file",
+            name="content",
+            field=models.FileField(
+                blank=True, null=True, upload_to=hub.storage.VersionedUploadTo("files")
+            ),
+        ),
+        migrations.AlterField(
+            model_name="file",
+            name="content_draft",
+            field=models.FileField(
+                blank=True, null=True, upload_to=hub.storage.VersionedUploadTo("files")
+            ),
+        ),
+        migrations.AlterField(
+            model_name="image",
+            name="content",
+            field=models.ImageField(
+                blank=True, null=True, upload_to=hub.storage.VersionedUploadTo("images")
+            ),
+        ),
+        migrations.AlterField(
+            model_name="image",
+            name="content_draft",
+            field=models.ImageField(
+                blank=True, null=True, upload_to=hub.storage.VersionedUploadTo("images")
+            ),
+        ),
+    ]
@@ -1,15 +1,21 @@
+import logging
 import uuid
+from datetime import timedelta
 
-from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
-from django.core.exceptions import ObjectDoesNotExist
-from django.db import models
+from django.core.files.storage import default_storage
+from django.db import models, transaction
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
+from storages.backends.s3boto3 import S3Boto3Storage
 
 from .fields import OrderField
+from .storage import MediaStorage, VersionedUploadTo
+
+logger = logging.getLogger(__name__)
 
 COMMON_PERMISSIONS = [
     ("request_update_en", "Can request update (English)"),
@@ -95,12 +101,12 @@ class Section(models.Model):
     objects = models.Manager()
     published = PublishedManager()
     order = OrderField(blank=True, for_fields=["page"])
-    original_data = models.JSONField(null=True, blank=True)
 
     is_update_pending_en = models.BooleanField(default=False)
     is_update_pending_uk = models.BooleanField(default=False)
     is_update_confirmed_en = models.BooleanField(default=False)
     is_update_confirmed_uk = models.BooleanField(default=False)
+    revisions = GenericRelation("Revision")
 
     class Meta:
         verbose_name = _("Section")
@@ -113,6 +119,8 @@ class Section(models.Model):
             ("change_section_order", "Can change section order"),
         ]
 
+    revision_fields = {"en": ["title_draft_en"], "uk": ["title_draft_uk"]}
+
     def __str__(self):
         return f"{self.order}. {self.title}"
 
@@ -188,6 +196,7 @@ class ItemBase(models.Model):
     title = models.CharField(max_length=255, blank=True, null=True, default="")
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
+    revisions = GenericRelation("Revision")
 
     class Meta:
         abstract = True
@@ -195,43 +204,73 @@ class ItemBase(models.Model):
     def __str__(self):
         return self.title
 
-    def get_absolute_url(self):
-        try:
-            content_link = Content.objects.get(
-                object_id=self.id,
-                content_type=ContentType.objects.get_for_model(self),
-            )
-            return reverse(
-                "section_content_update",
-                kwargs={
-                    "section_id": content_link.section.id,
-                    "model_name": self.__class__.__name__.lower(),
-                    "id": self.id,
-                },
+    def get_content_link(self):
+        """
+        Returns the Content row placing this item on a section, with the
+        section and page loaded. Set in bulk by ``prefetch_content_links``.
+        """
+        if not hasattr(self, "_content_link"):
+            self._content_link = (
+                Content.objects.select_related("section__page")
+                .filter(
+                    object_id=self.id,
+                    content_type=ContentType.objects.get_for_model(self),
+                )
+                .first()
             )
-        except ObjectDoesNotExist:
+        return self._content_link
+
+    def get_absolute_url(self):
+        content_link = self.get_content_link()
+        if content_link is None:
             return "#"
+        return reverse(
+            "section_content_update",
+            kwargs={
+                "section_id": content_link.section_id,
+                "model_name": self.__class__.__name__.lower(),
+                "id": self.id,
+            },
+        )
 
     def get_public_url(self):
         """
         Forms the public URL for content with an anchor to scroll to it.
         """
-        try:
-            content_link = Content.objects.get(
-                object_id=self.id,
-                content_type=ContentType.objects.get_for_model(self),
-            )
-            page_slug = content_link.section.page.slug
-            anchor = f"#content-{self.id}"
-            return reverse("page", kwargs={"slug": page_slug}) + anchor
-        except ObjectDoesNotExist:
+        content_link = self.get_content_link()
+        if content_link is None:
             return "#"
+        page_slug = content_link.section.page.slug
+        anchor = f"#content-{self.id}"
+        return reverse("page", kwargs={"slug": page_slug}) + anchor
+
+
+def prefetch_content_links(results):
+    """
+    Loads the Content row, section and page of every content item in
+    ``results`` with a single query, so building their URLs is free.
+    """
+    items = [result for result in results if isinstance(result, ItemBase)]
+    if not items:
+        return results
+
+    links = {
+        (link.content_type_id, link.object_id): link
+        for link in Content.objects.select_related("section__page").filter(
+            object_id__in=[item.id for item in items]
+        )
+    }
+    for item in items:
+        content_type = ContentType.objects.get_for_model(item)
+        item._content_link = links.get((content_type.id, item.id))
+    return results
 
 
 class Updatable(models.Model):
     is_update_pending = models.BooleanField(default=False)
     is_update_confirmed = models.BooleanField(default=False)
-    original_data = models.JSONField(null=True, blank=True)
+
+    revision_fields = {"": ["content_draft"]}
 
     class Meta:
         abstract = True
@@ -242,17 +281,51 @@ class Text(ItemBase, Updatable):
     content = models.TextField(_("Content"), blank=True, null=True)
     content_draft = models.TextField(_("Content Draft"), blank=True, null=True)
 
+    revision_fields = {"en": ["content_draft_en"], "uk": ["content_draft_uk"]}
+
+
+class MediaItem(Updatable):
+    class UploadStatus(models.TextChoices):
+        READY = "RD", "Ready"
+        PENDING = "PD", "Pending"
+        FAILED = "FL", "Failed"
+
+    upload_status = models.CharField(
+        max_length=2, choices=UploadStatus.choices, default=UploadStatus.READY
+    )
+
+    class Meta:
+        abstract = True
+
 
-class File(ItemBase, Updatable):
+class File(ItemBase, MediaItem):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    content = models.FileField(upload_to="files", blank=True, null=True)
-    content_draft = models.FileField(upload_to="files", blank=True, null=True)
+    content = models.FileField(
+        upload_to=VersionedUploadTo("files"), blank=True, null=True
+    )
+    content_draft = models.FileField(
+        upload_to=VersionedUploadTo("files"), blank=True, null=True
+    )
 
 
-class Image(ItemBase, Updatable):
+class Image(ItemBase, MediaItem):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    content = models.ImageField(upload_to="images", blank=True, null=True)
-    content_draft = models.ImageField(upload_to="images", blank=True, null=True)
+    content = models.ImageField(
+        upload_to=VersionedUploadTo("images"), blank=True, null=True
+    )
+    content_draft = models.ImageField(
+        upload_to=VersionedUploadTo("images"), blank=True, null=True
+    )
+    renditions = models.JSONField(default=dict, blank=True)
+
+    def get_renditions(self):
+        """
+        Returns the stored renditions if they were generated from the image
+        currently displayed.
+        """
+        if self.content and self.renditions.get("name") == self.content.name:
+            return self.renditions.get("sources", [])
+        return []
 
 
 class Video(ItemBase, Updatable):
@@ -265,3 +338,286 @@ class URL(ItemBase, Updatable):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     content = models.URLField(blank=True, null=True)
     content_draft = models.URLField(blank=True, null=True)
+
+
+class RevisionManager(models.Manager):
+    def for_object(self, obj, language=None):
+        queryset = self.filter(
+            content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk
+        )
+        if language is not None:
+            queryset = queryset.filter(language=language)
+        return queryset
+
+    def snapshot(self, obj, until=None):
+        """
+        Folds the diffs recorded for an object, oldest first, into the draft
+        values they describe. With ``until`` the fold stops at that revision.
+        """
+        return self.snapshots([obj], until)[obj.pk]
+
+    def snapshots(self, objects, until=None):
+        """
+        Same as ``snapshot`` for several objects of one model in one query,
+        returned as a dict keyed by primary key.
+        """
+        states = {obj.pk: {} for obj in objects}
+        if not objects:
+            return states
+
+        queryset = self.filter(
+            content_type=ContentType.objects.get_for_model(objects[0]),
+            object_id__in=list(states),
+        )
+        if until is not None:
+            queryset = queryset.filter(id__lte=until.id)
+
+        for object_id, data in queryset.order_by("id").values_list("object_id", "data"):
+            states[object_id].update(data)
+        return states
+
+    @staticmethod
+    def get_tracked_fields(obj, language=""):
+        if language:
+            return obj.revision_fields.get(language, [])
+        return [field for fields in obj.revision_fields.values() for field in fields]
+
+    @staticmethod
+    def serialize(value):
+        if isinstance(value, models.fields.files.FieldFile):
+            return value.name if value else None
+        if isinstance(value, str):
+            return value
+        return None
+
+    def build(self, obj, action, language="", user=None, baseline=None, data=None):
+        """
+        Returns an unsaved revision holding only the tracked fields whose
+        value differs from ``baseline`` (the object's current snapshot).
+        """
+        if data is None:
+            data = {
+                field: self.serialize(getattr(obj, field, None))
+                for field in self.get_tracked_fields(obj, language)
+            }
+        if baseline is None:
+            baseline = self.snapshot(obj)
+
+        return self.model(
+            content_type=ContentType.objects.get_for_model(obj),
+            object_id=obj.pk,
+            language=language,
+            action=action,
+            data={
+                field: value
+                for field, value in data.items()
+                if field not in baseline or baseline[field] != value
+            },
+            created_by=user,
+        )
+
+    def record(self, obj, action, language="", user=None, baseline=None, data=None):
+        revision = self.build(obj, action, language, user, baseline, data)
+        revision.save()
+        return revision
+
+
+class Revision(models.Model):
+    """
+    Append-only history of draft values for sections and content items.
+
+    Each row stores only the fields that changed since the previous revision
+    of the same object, so the accepted draft at any point in time is the
+    fold of all earlier rows.
+    """
+
+    class Action(models.TextChoices):
+        REQUEST = "RQ", "Request update"
+        CONFIRM = "CF", "Confirm update"
+        REJECT = "RJ", "Reject update"
+        PUBLISH = "PB", "Publish"
+        HIDE = "HD", "Hide"
+        ROLLBACK = "RB", "Rollback"
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.UUIDField()
+    item = GenericForeignKey("content_type", "object_id")
+    language = models.CharField(max_length=2, blank=True, default="")
+    action = models.CharField(max_length=2, choices=Action)
+    data = models.JSONField(default=dict, blank=True)
+    created_by = models.ForeignKey(
+        "accounts.CustomUser",
+        related_name="revisions",
+        on_delete=models.SET_NULL,
+        null=True,
+    )
+    created = models.DateTimeField(auto_now_add=True)
+
+    objects = RevisionManager()
+
+    class Meta:
+        verbose_name = _("Revision")
+        verbose_name_plural = _("Revisions")
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["content_type", "object_id", "language", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_action_display()} {self.object_id} ({self.language or '-'})"
+
+    def rollback(self, user=None):
+        """
+        Restores the draft values of the object as they were at this revision
+        and records the rollback as a new revision.
+        """
+        obj = self.item
+        state = Revision.objects.snapshot(obj, until=self)
+        fields = [
+            field
+            for field in Revision.objects.get_tracked_fields(obj)
+            if field in state
+        ]
+        for field in fields:
+            setattr(obj, field, state[field])
+        obj.save(update_fields=fields)
+        return Revision.objects.record(
+            obj,
+            Revision.Action.ROLLBACK,
+            language=self.language,
+            user=user,
+            data={field: state[field] for field in fields},
+        )
+
+
+class MediaTask(models.Model):
+    """
+    Queued storage work for uploaded media, run by the ``process_media``
+    management command outside of the request.
+    """
+
+    MAX_ATTEMPTS = 5
+    # A claimed task is run again if its worker has not finished it by then.
+    CLAIM_TIMEOUT = timedelta(minutes=15)
+
+    class Action(models.TextChoices):
+        UPLOAD = "UP", "Upload"
+        DELETE = "DL", "Delete"
+        RENDER = "RN", "Render"
+
+    class Status(models.TextChoices):
+        PENDING = "PD", "Pending"
+        DONE = "DN", "Done"
+        FAILED = "FL", "Failed"
+
+    action = models.CharField(max_length=2, choices=Action.choices)
+    status = models.CharField(
+        max_length=2, choices=Status.choices, default=Status.PENDING
+    )
+    content_type = models.ForeignKey(
+        ContentType, on_delete=models.CASCADE, blank=True, null=True
+    )
+    object_id = models.UUIDField(blank=True, null=True)
+    field_name = models.CharField(max_length=50, blank=True, default="")
+    source = models.CharField(max_length=255, blank=True, default="")
+    target = models.CharField(max_length=255)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    run_after = models.DateTimeField(default=timezone.now)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Media task")
+        verbose_name_plural = _("Media tasks")
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.get_action_display()} {self.target} ({self.get_status_display()})"
+        )
+
+    def get_storage(self):
+        if self.content_type_id and self.field_name:
+            model = self.content_type.model_class()
+            return model._meta.get_field(self.field_name).storage
+        return default_storage
+
+    def run(self):
+        """
+        Does the storage work, then records the outcome in its own short
+        transaction so no lock is held during the transfer.
+        """
+        try:
+            name = self.perform()
+        except Exception as e:
+            logger.exception("Media task %s failed.", self.pk)
+            self.attempts += 1
+            self.error = str(e)
+            with transaction.atomic():
+                if self.attempts >= self.MAX_ATTEMPTS:
+                    self.status = self.Status.FAILED
+                    self.set_upload_status(MediaItem.UploadStatus.FAILED)
+                else:
+                    self.run_after = timezone.now() + timedelta(
+                        seconds=30 * 2**self.attempts
+                    )
+                self.save()
+        else:
+            with transaction.atomic():
+                if self.action == self.Action.UPLOAD:
+                    # The draft may have been replaced by a newer upload in
+                    # the meantime.
+                    self.set_upload_status(MediaItem.UploadStatus.READY, name)
+                    self.target = name
+                self.status = self.Status.DONE
+                self.error = ""
+                self.save()
+
+    def perform(self):
+        if self.action == self.Action.UPLOAD:
+            return self.upload()
+        if self.action == self.Action.RENDER:
+            self.render()
+        else:
+            self.get_storage().delete(self.target)
+        return self.target
+
+    def upload(self):
+        # Imported here as the media module depends on these models.
+        from .media import staging_storage
+
+        storage = self.get_storage()
+        if isinstance(storage, MediaStorage) and isinstance(
+            staging_storage, S3Boto3Storage
+        ):
+            name = storage.save_copy(staging_storage, self.source, self.target)
+        else:
+            with staging_storage.open(self.source) as source:
+                name = storage.save(self.target, source)
+        staging_storage.delete(self.source)
+        return name
+
+    def render(self):
+        from .renditions import generate_renditions
+
+        item = self.content_type.model_class().objects.filter(pk=self.object_id).first()
+        if item is None:
+            return
+
+        storage = self.get_storage()
+        for name in generate_renditions(item, self.field_name):
+            storage.delete(name)
+
+    def set_upload_status(self, status, name=None):
+        if not self.content_type_id:
+            return
+        values = {"upload_status": status}
+        if name is not None:
+            values[self.field_name] = name
+        self.content_type.model_class().objects.filter(
+            pk=self.object_id, **{self.field_name: self.target}
+        ).update(**values)
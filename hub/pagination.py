@@ -0,0 +1,153 @@
+import base64
+import json
+from urllib.parse import urlencode
+
+from django.db.models import Q
+from django.http import Http404
+from django.utils.translation import gettext_lazy as _
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Pages through a queryset by the values of its sort key instead of an
+    offset, so every page costs one indexed range scan however deep it is.
+
+    ``ordering`` lists fields or annotations, optionally prefixed with ``-``
+    for descending order. The last one must be unique (usually the primary
+    key).
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset.order_by(*ordering)
+        self.ordering = [field.lstrip("-") for field in ordering]
+        self.descending = [field.startswith("-") for field in ordering]
+        self.per_page = per_page
+
+    @staticmethod
+    def encode_cursor(values):
+        data = json.dumps([str(value) for value in values]).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(data)
+        except (ValueError, TypeError):
+            raise Http404(_("Invalid page cursor."))
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise Http404(_("Invalid page cursor."))
+        return values
+
+    def get_cursor(self, obj):
+        return self.encode_cursor(getattr(obj, field) for field in self.ordering)
+
+    def get_filter(self, values, forward=True):
+        """
+        Builds ``(a, b) > (x, y)`` as ``a > x OR (a = x AND b > y)``, flipping
+        the comparison for descending fields and for backward paging.
+        """
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            lookup = "gt" if forward != self.descending[index] else "lt"
+            equal = {name: value for name, value in zip(self.ordering[:index], values)}
+            condition |= Q(**equal, **{f"{field}__{lookup}": values[index]})
+        return condition
+
+    def get_page(self, after=None, before=None):
+        queryset = self.queryset
+        if before:
+            values = self.decode_cursor(before)
+            queryset = queryset.filter(self.get_filter(values, forward=False)).reverse()
+        elif after:
+            values = self.decode_cursor(after)
+            queryset = queryset.filter(self.get_filter(values))
+
+        object_list = list(queryset[: self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[: self.per_page]
+        if before:
+            object_list.reverse()
+
+        if not object_list:
+            return KeysetPage(object_list)
+
+        has_next = has_more if not before else True
+        has_previous = bool(after) if not before else has_more
+        return KeysetPage(
+            object_list,
+            next_cursor=self.get_cursor(object_list[-1]) if has_next else None,
+            previous_cursor=self.get_cursor(object_list[0]) if has_previous else None,
+        )
+
+
+def get_page_queries(request, page):
+    """
+    Returns the query strings of the neighbouring pages, keeping every other
+    GET parameter of the current request.
+    """
+    params = request.GET.copy()
+    params.pop("after", None)
+    params.pop("before", None)
+
+    queries = {}
+    if page.next_cursor:
+        queries["next_page_query"] = urlencode(
+            {**params.dict(), "after": page.next_cursor}
+        )
+    if page.previous_cursor:
+        queries["previous_page_query"] = urlencode(
+            {**params.dict(), "before": page.previous_cursor}
+        )
+    return queries
+
+
+class KeysetPaginationMixin:
+    """
+    Replaces ListView's offset pagination with ``KeysetPaginator``. Pages are
+    addressed by the ``after`` and ``before`` query parameters.
+    """
+
+    keyset_ordering = ["pk"]
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, self.get_keyset_ordering(), page_size)
+        page = paginator.get_page(
+            after=self.request.GET.get("after"),
+            before=self.request.GET.get("before"),
+        )
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context.get("page_obj")
+        if page is not None:
+            context.update(get_page_queries(self.request, page))
+        return context
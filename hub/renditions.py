@@ -0,0 +1,91 @@
+import os
+from io import BytesIO
+
+from PIL import Image as PILImage, ImageOps
+from django.core.files.base import ContentFile
+
+try:  # AVIF support ships as a Pillow plugin
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+RENDITION_WIDTHS = (320, 640, 960, 1280, 1920)
+
+# Format name used by Pillow, MIME type, file extension and save options
+RENDITION_FORMATS = [
+    ("AVIF", "image/avif", "avif", {"quality": 50}),
+    ("WEBP", "image/webp", "webp", {"quality": 75, "method": 6}),
+]
+
+
+def get_formats():
+    PILImage.init()
+    return [fmt for fmt in RENDITION_FORMATS if fmt[0] in PILImage.SAVE]
+
+
+def get_widths(width):
+    """
+    Returns the width buckets smaller than the original, plus the original
+    width itself so the largest rendition is never upscaled.
+    """
+    return [bucket for bucket in RENDITION_WIDTHS if bucket < width] + [width]
+
+
+def get_rendition_name(name, width, extension):
+    root, _ = os.path.splitext(name)
+    return f"{root}_{width}w.{extension}"
+
+
+def generate_renditions(item, field_name="content"):
+    """
+    Writes width-bucketed AVIF/WebP copies of an image next to the original
+    and stores their metadata on the item. Returns the names of renditions
+    that are no longer referenced.
+    """
+    field_file = getattr(item, field_name)
+    previous = {source["name"] for source in item.renditions.get("sources", [])}
+
+    if not field_file:
+        item.renditions = {}
+        item.save(update_fields=["renditions"])
+        return sorted(previous)
+
+    storage = field_file.storage
+    with storage.open(field_file.name) as original:
+        image = ImageOps.exif_transpose(PILImage.open(original))
+        image.load()
+
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+    sources = []
+    for width in get_widths(image.width):
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), PILImage.Resampling.LANCZOS)
+
+        for pil_format, mime_type, extension, options in get_formats():
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, **options)
+            name = storage.save(
+                get_rendition_name(field_file.name, width, extension),
+                ContentFile(buffer.getvalue()),
+            )
+            sources.append(
+                {
+                    "name": name,
+                    "type": mime_type,
+                    "width": width,
+                    "height": height,
+                    "size": buffer.tell(),
+                }
+            )
+
+    item.renditions = {
+        "name": field_file.name,
+        "width": image.width,
+        "height": image.height,
+        "sources": sources,
+    }
+    item.save(update_fields=["renditions"])
+
+    return sorted(previous - {source["name"] for source in sources})
@@ -1,7 +1,9 @@
-from django.db.models.signals import pre_delete
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
-from .models import Section, Content
+from pages.cache import get_page_paths, invalidate_all, invalidate_paths
+from .models import Section, Content, Page, Text, File, Image, Video, URL
 
 
 @receiver(pre_delete, sender=Section)
@@ -13,3 +15,36 @@ def delete_related_content(sender, instance, **kwargs):
 def delete_related_item(sender, instance, **kwargs):
     if instance.item:
         instance.item.delete()
+
+
+def invalidate_page(page):
+    if page is not None:
+        paths = get_page_paths(page)
+        transaction.on_commit(lambda: invalidate_paths(paths))
+
+
+@receiver([post_save, post_delete], sender=Page)
+def invalidate_pages(sender, instance, **kwargs):
+    # Page titles and slugs show up outside the page itself
+    transaction.on_commit(invalidate_all)
+
+
+@receiver([post_save, post_delete], sender=Section)
+def invalidate_section_page(sender, instance, **kwargs):
+    invalidate_page(Page.objects.filter(pk=instance.page_id).first())
+
+
+@receiver([post_save, post_delete], sender=Content)
+def invalidate_content_page(sender, instance, **kwargs):
+    invalidate_page(Page.objects.filter(sections=instance.section_id).first())
+
+
+@receiver([post_save, post_delete], sender=Text)
+@receiver([post_save, post_delete], sender=File)
+@receiver([post_save, post_delete], sender=Image)
+@receiver([post_save, post_delete], sender=Video)
+@receiver([post_save, post_delete], sender=URL)
+def invalidate_item_page(sender, instance, **kwargs):
+    content = instance.get_content_link()
+    if content is not None:
+        invalidate_page(content.section.page)
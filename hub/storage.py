@@ -0,0 +1,77 @@
+import os
+import threading
+import uuid
+
+from cachetools import TTLCache
+from django.utils.deconstruct import deconstructible
+from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
+
+
+@deconstructible
+class VersionedUploadTo:
+    """
+    Puts each upload under its own version token so a key is never reused
+    and stored objects can be cached as immutable.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+
+    def __call__(self, instance, filename):
+        return os.path.join(self.prefix, uuid.uuid4().hex[:12], filename)
+
+    def __eq__(self, other):
+        return isinstance(other, VersionedUploadTo) and self.prefix == other.prefix
+
+
+class MediaStorage(S3Boto3Storage):
+    """
+    S3 storage that memoizes object URLs. Keys are versioned, so a URL stays
+    valid for as long as its signature does.
+    """
+
+    url_cache_size = 4096
+
+    def __init__(self, **settings):
+        super().__init__(**settings)
+        # Signed URLs are reused for at most half of their lifetime.
+        ttl = self.querystring_expire // 2 if self.querystring_auth else 24 * 60 * 60
+        self._url_cache = TTLCache(maxsize=self.url_cache_size, ttl=ttl)
+        self._url_lock = threading.Lock()
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        if parameters or expire is not None or http_method is not None:
+            return super().url(name, parameters, expire, http_method)
+
+        with self._url_lock:
+            url = self._url_cache.get(name)
+        if url is None:
+            url = super().url(name)
+            with self._url_lock:
+                self._url_cache[name] = url
+        return url
+
+    def delete(self, name):
+        super().delete(name)
+        with self._url_lock:
+            self._url_cache.pop(name, None)
+
+    def save_copy(self, source_storage, source_name, name):
+        """
+        Stores a copy of an object of another S3 storage with a server-side
+        copy, so the file is not downloaded and uploaded again. Returns the
+        name the copy was saved under.
+        """
+        name = self.get_available_name(name)
+        key = self._normalize_name(clean_name(name))
+        params = self._get_write_parameters(key)
+        self.bucket.Object(key).copy(
+            {
+                "Bucket": source_storage.bucket_name,
+                "Key": source_storage._normalize_name(clean_name(source_name)),
+            },
+            # The staged object has none of the media headers, replace them
+            ExtraArgs={**params, "MetadataDirective": "REPLACE"},
+        )
+        return name
@@ -0,0 +1,23 @@
+from django import template
+
+from hub.cache import get_nav_version
+
+register = template.Library()
+
+
+@register.simple_tag
+def nav_version():
+    return get_nav_version()
+
+
+@register.simple_tag
+def user_role(user):
+    """
+    Returns what the navigation shows differently per user, for use as a
+    fragment cache key.
+    """
+    if not user.is_authenticated:
+        return "anonymous"
+    if user.is_superuser:
+        return "superuser"
+    return user.role
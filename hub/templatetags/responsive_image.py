@@ -0,0 +1,53 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(image, alt="", css_class="", sizes="100vw", loading="lazy"):
+    """
+    Renders an image as a <picture> with AVIF/WebP srcsets when renditions
+    exist, falling back to the original upload.
+    """
+    if not image or not image.content:
+        return ""
+
+    renditions = image.get_renditions()
+    sources = {}
+    for source in renditions:
+        sources.setdefault(source["type"], []).append(source)
+
+    source_tags = format_html_join(
+        "",
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (
+                mime_type,
+                ", ".join(
+                    f"{image.content.storage.url(source['name'])} {source['width']}w"
+                    for source in group
+                ),
+                sizes,
+            )
+            for mime_type, group in sources.items()
+        ),
+    )
+
+    dimensions = ""
+    if renditions:
+        dimensions = format_html(
+            ' width="{}" height="{}"',
+            image.renditions["width"],
+            image.renditions["height"],
+        )
+
+    return format_html(
+        '<picture>{}<img src="{}" alt="{}" class="{}" loading="{}" decoding="async"{}></picture>',
+        source_tags,
+        image.content.url,
+        alt,
+        css_class,
+        loading,
+        dimensions,
+    )
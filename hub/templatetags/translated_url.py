@@ -0,0 +1,16 @@
+from django import template
+from django.urls import translate_url
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def translated_url(context, language):
+    """
+    Returns the current page's URL in another language, so switching
+    language is a plain link instead of a CSRF-protected form.
+    """
+    request = context.get("request")
+    if request is None:
+        return "/"
+    return translate_url(request.get_full_path(), language)
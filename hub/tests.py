@@ -2,23 +2,49 @@ import json
 import logging
 import os
 import uuid
-from io import BytesIO
+from io import BytesIO, StringIO
+from unittest.mock import PropertyMock, patch
 
 from PIL import Image
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.template import Context, Template
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse, resolve
-from django.utils.translation import activate
+from django.utils import timezone
+from storages.backends.s3boto3 import S3Boto3Storage
+from django.utils.translation import activate, get_language
 from django.apps import apps
 
 from accounts.models import CustomUser
 from locations.models import Division, Branch, Person
 from payments.models import Donor, Donation
+from .cache import get_nav_version
 from .forms import PageForm
-from .models import Page, Section, Content, Text, File, Image as ImageModel, Video, URL
+from .media import claim_pending, process_pending, staging_storage
+from .storage import MediaStorage, VersionedUploadTo
+from .models import (
+    Page,
+    Section,
+    Content,
+    Text,
+    File,
+    Image as ImageModel,
+    Video,
+    URL,
+    Revision,
+    MediaTask,
+    prefetch_content_links,
+)
 from .views import (
     DashboardView,
     ManagePageListView,
@@ -120,6 +146,37 @@ class ManagePageListViewTest(TestCase):
         view = resolve("/en/list/")
         self.assertEqual(view.func.__name__, ManagePageListView.as_view().__name__)
 
+    def test_page_list_is_paginated_by_cursor(self):
+        for number in range(3, 28):
+            Page.objects.create(
+                title=f"Page {number:02d}", slug=f"page-{number}", modified_by=self.user
+            )
+
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context["page_list"]), 25)
+        self.assertTrue(response.context["is_paginated"])
+        self.assertIn("next_page_query", response.context)
+
+        response = self.client.get(f"{self.url}?{response.context['next_page_query']}")
+        self.assertEqual(len(response.context["page_list"]), 2)
+        self.assertNotIn("next_page_query", response.context)
+        self.assertIn("previous_page_query", response.context)
+
+    def test_page_list_links_first_section(self):
+        self.user.user_permissions.add(Permission.objects.get(codename="view_content"))
+        second = Section.objects.create(page=self.page1, title="Second", order=1)
+        first = Section.objects.create(page=self.page1, title="First", order=0)
+        self.assertGreater(second.order, first.order)
+
+        response = self.client.get(self.url)
+        page = response.context["page_list"][0]
+        self.assertEqual(page.first_section_id, first.id)
+        self.assertContains(response, reverse("section_content_list", args=[first.id]))
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(f"{self.url}?after=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
+
 
 class PageCreateViewTest(TestCase):
     def setUp(self):
@@ -653,7 +710,7 @@ class PageSectionUpdateViewTests(TestCase):
         self.assertEqual(len(response.context["formset"].forms), 1)
 
     def test_request_update_en(self):
-        """Test that 'request_update_en' updates 'original_data' when not set."""
+        """Test that 'request_update_en' updates the revision snapshot when not set."""
         self.client.login(
             username="user_with_permission_request_update", password="password"
         )
@@ -681,21 +738,21 @@ class PageSectionUpdateViewTests(TestCase):
                 f"Unexpected response: status_code={response.status_code}, content={response.content}"
             )
 
-        # Refresh the section object and check original_data
+        # Refresh the section object and check its revisions
         self.section.refresh_from_db()
 
         self.assertIsNotNone(
-            self.section.original_data,
-            "original_data should not be None after update request",
+            Revision.objects.snapshot(self.section),
+            "The revision snapshot should not be None after update request",
         )
         self.assertIn(
             "title_draft_en",
-            self.section.original_data,
-            "original_data should include 'title_draft_en'",
+            Revision.objects.snapshot(self.section),
+            "The revision snapshot should include 'title_draft_en'",
         )
 
     def test_request_update_uk(self):
-        """Test that 'request_update_uk' updates 'original_data' when not set."""
+        """Test that 'request_update_uk' updates the revision snapshot when not set."""
         self.client.login(
             username="user_with_permission_request_update", password="password"
         )
@@ -723,17 +780,17 @@ class PageSectionUpdateViewTests(TestCase):
                 f"Unexpected response: status_code={response.status_code}, content={response.content}"
             )
 
-        # Refresh the section object and check original_data
+        # Refresh the section object and check its revisions
         self.section.refresh_from_db()
 
         self.assertIsNotNone(
-            self.section.original_data,
-            "original_data should not be None after update request",
+            Revision.objects.snapshot(self.section),
+            "The revision snapshot should not be None after update request",
         )
         self.assertIn(
             "title_draft_uk",
-            self.section.original_data,
-            "original_data should include 'title_draft_uk'",
+            Revision.objects.snapshot(self.section),
+            "The revision snapshot should include 'title_draft_uk'",
         )
 
     def test_set_is_update_pending_en_success(self):
@@ -833,7 +890,11 @@ class PageSectionUpdateViewTests(TestCase):
         section = Section.objects.create(
             page=page,
             is_update_pending_en=True,
-            original_data={"title_draft_en": None, "title_draft_uk": None},
+        )
+        Revision.objects.record(
+            section,
+            Revision.Action.REQUEST,
+            data={"title_draft_en": None, "title_draft_uk": None},
         )
 
         url = reverse("page_section_update", kwargs={"slug": page.slug})
@@ -863,9 +924,9 @@ class PageSectionUpdateViewTests(TestCase):
         self.assertTrue(section.is_update_confirmed_en)
 
         self.assertEqual(
-            section.original_data["title_draft_en"],
+            Revision.objects.snapshot(section)["title_draft_en"],
             "Updated Title EN",
-            "The 'title_draft_en' in 'original_data' should be updated",
+            "The 'title_draft_en' in the revision snapshot should be updated",
         )
 
     def test_confirm_update_en_permission_denied(self):
@@ -877,9 +938,13 @@ class PageSectionUpdateViewTests(TestCase):
         section = Section.objects.create(
             page=page,
             is_update_pending_en=True,
-            original_data={"title_draft_en": "Draft Title EN", "title_draft_uk": None},
             title_draft_en="Updated Title EN",
         )
+        Revision.objects.record(
+            section,
+            Revision.Action.REQUEST,
+            data={"title_draft_en": "Draft Title EN", "title_draft_uk": None},
+        )
 
         url = reverse("page_section_update", kwargs={"slug": page.slug})
         self.client.login(username="user_without_permission", password="password")
@@ -902,9 +967,9 @@ class PageSectionUpdateViewTests(TestCase):
         self.assertTrue(section.is_update_pending_en)
         self.assertFalse(section.is_update_confirmed_en)
         self.assertEqual(
-            section.original_data["title_draft_en"],
+            Revision.objects.snapshot(section)["title_draft_en"],
             "Draft Title EN",
-            "The 'original_data' should remain unchanged if permission is denied",
+            "The the revision snapshot should remain unchanged if permission is denied",
         )
 
     def test_confirm_update_uk_permission_denied(self):
@@ -916,9 +981,13 @@ class PageSectionUpdateViewTests(TestCase):
         section = Section.objects.create(
             page=page,
             is_update_pending_uk=True,
-            original_data={"title_draft_en": None, "title_draft_uk": "Draft Title UK"},
             title_draft_uk="Updated Title UK",
         )
+        Revision.objects.record(
+            section,
+            Revision.Action.REQUEST,
+            data={"title_draft_en": None, "title_draft_uk": "Draft Title UK"},
+        )
 
         url = reverse("page_section_update", kwargs={"slug": page.slug})
         self.client.login(username="user_without_permission", password="password")
@@ -941,9 +1010,9 @@ class PageSectionUpdateViewTests(TestCase):
         self.assertTrue(section.is_update_pending_uk)
         self.assertFalse(section.is_update_confirmed_uk)
         self.assertEqual(
-            section.original_data["title_draft_uk"],
+            Revision.objects.snapshot(section)["title_draft_uk"],
             "Draft Title UK",
-            "The 'original_data' should remain unchanged if permission is denied",
+            "The the revision snapshot should remain unchanged if permission is denied",
         )
 
     def test_confirm_update_uk(self):
@@ -956,7 +1025,11 @@ class PageSectionUpdateViewTests(TestCase):
         section = Section.objects.create(
             page=page,
             is_update_pending_uk=True,
-            original_data={"title_draft_en": None, "title_draft_uk": None},
+        )
+        Revision.objects.record(
+            section,
+            Revision.Action.REQUEST,
+            data={"title_draft_en": None, "title_draft_uk": None},
         )
 
         url = reverse("page_section_update", kwargs={"slug": page.slug})
@@ -989,9 +1062,9 @@ class PageSectionUpdateViewTests(TestCase):
         self.assertTrue(section.is_update_confirmed_uk)
 
         self.assertEqual(
-            section.original_data["title_draft_uk"],
+            Revision.objects.snapshot(section)["title_draft_uk"],
             "Updated Title UK",
-            "The 'title_draft_uk' in 'original_data' should be updated",
+            "The 'title_draft_uk' in the revision snapshot should be updated",
         )
 
     def test_reject_update_en(self):
@@ -1004,11 +1077,15 @@ class PageSectionUpdateViewTests(TestCase):
             page=page,
             is_update_pending_en=True,
             is_update_confirmed_en=False,
-            original_data={
+            title_draft_en="Draft Title EN",
+        )
+        Revision.objects.record(
+            section,
+            Revision.Action.REQUEST,
+            data={
                 "title_draft_en": "Original Title EN",
                 "title_draft_uk": "Original Title UK",
             },
-            title_draft_en="Draft Title EN",
         )
 
         url = reverse("page_section_update", kwargs={"slug": page.slug})
@@ -1049,11 +1126,15 @@ class PageSectionUpdateViewTests(TestCase):
             page=page,
             is_update_pending_uk=True,
             is_update_confirmed_uk=True,
-            original_data={
+            title_draft_uk="Updated Title UK",
+        )
+        Revision.objects.record(
+            section,
+            Revision.Action.REQUEST,
+            data={
                 "title_draft_en": "Original Title EN",
                 "title_draft_uk": "Original Title UK",
             },
-            title_draft_uk="Updated Title UK",
         )
 
         url = reverse("page_section_update", kwargs={"slug": page.slug})
@@ -1093,9 +1174,11 @@ class PageSectionUpdateViewTests(TestCase):
         section = Section.objects.create(
             page=page,
             is_update_pending_en=True,
-            original_data={"title_draft_en": "Draft Title EN"},
             title_draft_en="Updated Title EN",
         )
+        Revision.objects.record(
+            section, Revision.Action.REQUEST, data={"title_draft_en": "Draft Title EN"}
+        )
 
         url = reverse("page_section_update", kwargs={"slug": page.slug})
         self.client.login(username="user_without_permission", password="password")
@@ -1119,11 +1202,11 @@ class PageSectionUpdateViewTests(TestCase):
         self.assertTrue(section.is_update_pending_en)
         self.assertFalse(section.is_update_confirmed_en)
 
-        # Ensure original_data is unchanged
+        # Ensure the revision snapshot is unchanged
         self.assertEqual(
-            section.original_data["title_draft_en"],
+            Revision.objects.snapshot(section)["title_draft_en"],
             "Draft Title EN",
-            "The 'original_data' should remain unchanged if permission is denied.",
+            "The the revision snapshot should remain unchanged if permission is denied.",
         )
 
     def test_reject_update_uk_permission_denied(self):
@@ -1135,9 +1218,11 @@ class PageSectionUpdateViewTests(TestCase):
         section = Section.objects.create(
             page=page,
             is_update_pending_uk=True,
-            original_data={"title_draft_uk": "Draft Title UK"},
             title_draft_uk="Updated Title UK",
         )
+        Revision.objects.record(
+            section, Revision.Action.REQUEST, data={"title_draft_uk": "Draft Title UK"}
+        )
 
         url = reverse("page_section_update", kwargs={"slug": page.slug})
         self.client.login(username="user_without_permission", password="password")
@@ -1161,13 +1246,43 @@ class PageSectionUpdateViewTests(TestCase):
         self.assertTrue(section.is_update_pending_uk)
         self.assertFalse(section.is_update_confirmed_uk)
 
-        # Ensure original_data is unchanged
+        # Ensure the revision snapshot is unchanged
         self.assertEqual(
-            section.original_data["title_draft_uk"],
+            Revision.objects.snapshot(section)["title_draft_uk"],
             "Draft Title UK",
-            "The 'original_data' should remain unchanged if permission is denied.",
+            "The the revision snapshot should remain unchanged if permission is denied.",
         )
 
+    def test_reject_update_uk_requires_uk_permission(self):
+        """Test that 'reject_update_uk' is not allowed by the 'reject_update_en' permission alone."""
+        self.user_with_permission_reject_update.user_permissions.remove(
+            Permission.objects.get(
+                codename="reject_update_uk",
+                content_type=ContentType.objects.get(app_label="hub", model="section"),
+            )
+        )
+        self.section.is_update_pending_uk = True
+        self.section.save()
+
+        self.client.login(
+            username="user_with_permission_reject_update", password="password"
+        )
+
+        post_data = {
+            "sections-TOTAL_FORMS": "1",
+            "sections-INITIAL_FORMS": "1",
+            "sections-MIN_NUM_FORMS": "0",
+            "sections-MAX_NUM_FORMS": "1000",
+            "sections-0-id": str(self.section.id),
+            "sections-0-reject_update_uk": "on",
+        }
+
+        response = self.client.post(self.url, post_data)
+
+        self.assertEqual(response.status_code, 403)
+        self.section.refresh_from_db()
+        self.assertTrue(self.section.is_update_pending_uk)
+
     def test_redirect_after_post(self):
         """Test that the view redirects to 'page_section_update' after a successful POST."""
         page = Page.objects.create(
@@ -1177,9 +1292,13 @@ class PageSectionUpdateViewTests(TestCase):
         section = Section.objects.create(
             page=page,
             is_update_pending_en=True,
-            original_data={"title_draft_en": None, "title_draft_uk": None},
             title_draft_en="Draft Title EN",
         )
+        Revision.objects.record(
+            section,
+            Revision.Action.REQUEST,
+            data={"title_draft_en": None, "title_draft_uk": None},
+        )
 
         url = reverse("page_section_update", kwargs={"slug": page.slug})
         self.client.login(
@@ -1206,9 +1325,9 @@ class PageSectionUpdateViewTests(TestCase):
         self.assertFalse(section.is_update_pending_en)
         self.assertTrue(section.is_update_confirmed_en)
         self.assertEqual(
-            section.original_data["title_draft_en"],
+            Revision.objects.snapshot(section)["title_draft_en"],
             "Updated Title EN",
-            "The 'title_draft_en' in 'original_data' should be updated",
+            "The 'title_draft_en' in the revision snapshot should be updated",
         )
 
     def test_render_to_response_on_get(self):
@@ -1254,6 +1373,112 @@ class PageSectionUpdateViewTests(TestCase):
         formset_errors = response.context["formset"].errors
         self.assertGreater(len(formset_errors), 0, "Formset should contain errors")
 
+    def _build_sections_post_data(self, sections):
+        post_data = {
+            "sections-TOTAL_FORMS": str(len(sections)),
+            "sections-INITIAL_FORMS": str(len(sections)),
+            "sections-MIN_NUM_FORMS": "0",
+            "sections-MAX_NUM_FORMS": "1000",
+        }
+        for index, section in enumerate(sections):
+            post_data[f"sections-{index}-id"] = str(section.id)
+            post_data[f"sections-{index}-title_draft_en"] = section.title_draft_en
+            post_data[f"sections-{index}-title_draft_uk"] = section.title_draft_uk
+        return post_data
+
+    def test_unchanged_sections_are_skipped(self):
+        """Test that only changed sections, or sections with an action, are saved."""
+        page = Page.objects.create(
+            title="Skip Unchanged Page",
+            modified_by=self.user_with_permission_request_update,
+        )
+        sections = [
+            Section.objects.create(
+                page=page,
+                title_draft_en=f"Draft EN {index}",
+                title_draft_uk=f"Draft UK {index}",
+            )
+            for index in range(3)
+        ]
+        url = reverse("page_section_update", kwargs={"slug": page.slug})
+        self.client.login(
+            username="user_with_permission_request_update", password="password"
+        )
+
+        post_data = self._build_sections_post_data(sections)
+        post_data["sections-1-title_draft_en"] = "Changed Draft EN"
+        post_data["sections-2-request_update_uk"] = "on"
+
+        response = self.client.post(url, post_data)
+
+        self.assertEqual(response.status_code, 302)
+        for section in sections:
+            section.refresh_from_db()
+
+        self.assertIsNone(sections[0].modified_by)
+        self.assertEqual(
+            sections[1].modified_by, self.user_with_permission_request_update
+        )
+        self.assertEqual(sections[1].title_draft_en, "Changed Draft EN")
+        self.assertTrue(sections[2].is_update_pending_uk)
+        self.assertEqual(
+            Revision.objects.snapshot(sections[2]), {"title_draft_uk": "Draft UK 2"}
+        )
+        self.assertFalse(Revision.objects.for_object(sections[0]).exists())
+
+    def test_query_count_does_not_grow_with_sections(self):
+        """Test that saving the formset costs the same number of queries for any page length."""
+        self.client.login(
+            username="user_with_permission_request_update", password="password"
+        )
+
+        def count_queries(section_count):
+            page = Page.objects.create(
+                title=f"Query Count Page {section_count}",
+                modified_by=self.user_with_permission_request_update,
+            )
+            sections = [
+                Section.objects.create(
+                    page=page,
+                    title_draft_en=f"Draft EN {index}",
+                    title_draft_uk=f"Draft UK {index}",
+                )
+                for index in range(section_count)
+            ]
+            post_data = self._build_sections_post_data(sections)
+            for index in range(section_count):
+                post_data[f"sections-{index}-title_draft_en"] = f"Changed EN {index}"
+                post_data[f"sections-{index}-request_update_en"] = "on"
+
+            # Content types are cached per process; warm the cache so only
+            # the first run does not pay for the lookup.
+            ContentType.objects.get_for_model(Section)
+            url = reverse("page_section_update", kwargs={"slug": page.slug})
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(url, post_data)
+            self.assertEqual(response.status_code, 302)
+            return len(queries)
+
+        self.assertEqual(count_queries(2), count_queries(8))
+
+    def test_denied_action_rolls_back_new_section(self):
+        """Test that a denied action leaves no section added by the same submission."""
+        self.user_with_permission_request_update.user_permissions.add(
+            Permission.objects.get(content_type__app_label="hub", codename="add_section")
+        )
+        self.client.login(
+            username="user_with_permission_request_update", password="password"
+        )
+
+        post_data = self._build_sections_post_data([self.section])
+        post_data["add_new_section"] = "on"
+        post_data["sections-0-confirm_update_en"] = "on"
+
+        response = self.client.post(self.url, post_data)
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Section.objects.filter(page=self.page).count(), 1)
+
 
 class SectionDeleteViewTests(TestCase):
     def setUp(self):
@@ -1470,7 +1695,10 @@ class SectionPublishViewTests(TestCase):
         self.assertEqual(self.draft_section.status, Section.Status.PUBLISHED)
         self.assertEqual(self.draft_section.title_en, "Draft Title EN")
         self.assertEqual(self.draft_section.title_uk, "Draft Title UK")
-        self.assertIsNone(self.draft_section.original_data)
+        self.assertEqual(
+            Revision.objects.for_object(self.draft_section).last().action,
+            Revision.Action.PUBLISH,
+        )
         self.assertFalse(self.draft_section.is_update_pending_en)
         self.assertFalse(self.draft_section.is_update_pending_uk)
         self.assertFalse(self.draft_section.is_update_confirmed_en)
@@ -2097,8 +2325,12 @@ class ContentCreateUpdateViewTests(TestCase):
         self.assertTrue(updated_text_content.is_update_pending_en)
         self.assertTrue(updated_text_content.is_update_pending_uk)
 
-        self.assertIn("content_draft_en", updated_text_content.original_data)
-        self.assertIn("content_draft_uk", updated_text_content.original_data)
+        self.assertIn(
+            "content_draft_en", Revision.objects.snapshot(updated_text_content)
+        )
+        self.assertIn(
+            "content_draft_uk", Revision.objects.snapshot(updated_text_content)
+        )
 
         # --- FILE Content ---
         post_data_file = {
@@ -2122,7 +2354,7 @@ class ContentCreateUpdateViewTests(TestCase):
 
         updated_file_content = self.file_model.objects.get(id=self.file_content.id)
         self.assertTrue(updated_file_content.is_update_pending)
-        self.assertIn("content_draft", updated_file_content.original_data)
+        self.assertIn("content_draft", Revision.objects.snapshot(updated_file_content))
 
         # --- IMAGE Content ---
         post_data_image = {
@@ -2146,7 +2378,7 @@ class ContentCreateUpdateViewTests(TestCase):
 
         updated_image_content = self.image_model.objects.get(id=self.image_content.id)
         self.assertTrue(updated_image_content.is_update_pending)
-        self.assertIn("content_draft", updated_image_content.original_data)
+        self.assertIn("content_draft", Revision.objects.snapshot(updated_image_content))
 
         # --- VIDEO Content ---
         post_data_video = {
@@ -2170,7 +2402,7 @@ class ContentCreateUpdateViewTests(TestCase):
 
         updated_video_content = self.video_model.objects.get(id=self.video_content.id)
         self.assertTrue(updated_video_content.is_update_pending)
-        self.assertIn("content_draft", updated_video_content.original_data)
+        self.assertIn("content_draft", Revision.objects.snapshot(updated_video_content))
 
         # --- URL Content ---
         post_data_url = {
@@ -2194,7 +2426,7 @@ class ContentCreateUpdateViewTests(TestCase):
 
         updated_url_content = self.url_model.objects.get(id=self.url_content.id)
         self.assertTrue(updated_url_content.is_update_pending)
-        self.assertIn("content_draft", updated_url_content.original_data)
+        self.assertIn("content_draft", Revision.objects.snapshot(updated_url_content))
 
     def test_confirm_update_permission_denied(self):
         """Test permission denied for confirmation update without permissions."""
@@ -2232,9 +2464,10 @@ class ContentCreateUpdateViewTests(TestCase):
         self.assertFalse(updated_text_content.is_update_pending_uk)
         self.assertTrue(updated_text_content.is_update_confirmed_en)
         self.assertTrue(updated_text_content.is_update_confirmed_uk)
-        self.assertIsNone(
-            updated_text_content.original_data,
-            "Original data should be cleared after confirmation for text.",
+        self.assertEqual(
+            Revision.objects.for_object(updated_text_content).last().action,
+            Revision.Action.CONFIRM,
+            "A confirm revision should be recorded for text.",
         )
 
         # --- FILE CONTENT ---
@@ -2255,9 +2488,10 @@ class ContentCreateUpdateViewTests(TestCase):
         updated_file_content = self.file_model.objects.get(id=self.file_content.id)
         self.assertFalse(updated_file_content.is_update_pending)
         self.assertTrue(updated_file_content.is_update_confirmed)
-        self.assertIsNone(
-            updated_file_content.original_data,
-            "Original data should be cleared after confirmation for file.",
+        self.assertEqual(
+            Revision.objects.for_object(updated_file_content).last().action,
+            Revision.Action.CONFIRM,
+            "A confirm revision should be recorded for file.",
         )
 
         # --- IMAGE CONTENT ---
@@ -2278,9 +2512,10 @@ class ContentCreateUpdateViewTests(TestCase):
         updated_image_content = self.image_model.objects.get(id=self.image_content.id)
         self.assertFalse(updated_image_content.is_update_pending)
         self.assertTrue(updated_image_content.is_update_confirmed)
-        self.assertIsNone(
-            updated_image_content.original_data,
-            "Original data should be cleared after confirmation for image.",
+        self.assertEqual(
+            Revision.objects.for_object(updated_image_content).last().action,
+            Revision.Action.CONFIRM,
+            "A confirm revision should be recorded for image.",
         )
 
         # --- VIDEO CONTENT ---
@@ -2301,9 +2536,10 @@ class ContentCreateUpdateViewTests(TestCase):
         updated_video_content = self.video_model.objects.get(id=self.video_content.id)
         self.assertFalse(updated_video_content.is_update_pending)
         self.assertTrue(updated_video_content.is_update_confirmed)
-        self.assertIsNone(
-            updated_video_content.original_data,
-            "Original data should be cleared after confirmation for video.",
+        self.assertEqual(
+            Revision.objects.for_object(updated_video_content).last().action,
+            Revision.Action.CONFIRM,
+            "A confirm revision should be recorded for video.",
         )
 
         # --- URL CONTENT ---
@@ -2324,9 +2560,10 @@ class ContentCreateUpdateViewTests(TestCase):
         updated_url_content = self.url_model.objects.get(id=self.url_content.id)
         self.assertFalse(updated_url_content.is_update_pending)
         self.assertTrue(updated_url_content.is_update_confirmed)
-        self.assertIsNone(
-            updated_url_content.original_data,
-            "Original data should be cleared after confirmation for URL.",
+        self.assertEqual(
+            Revision.objects.for_object(updated_url_content).last().action,
+            Revision.Action.CONFIRM,
+            "A confirm revision should be recorded for URL.",
         )
 
     def test_reject_update_permission_denied(self):
@@ -2492,33 +2729,135 @@ class ContentCreateUpdateViewTests(TestCase):
         )
 
         # Проверяем, что оригинальные данные сохранены (если они были заданы ранее)
-        self.assertIsNotNone(
-            updated_content.original_data,
-            "Original data should be saved for rollback.",
+        self.assertTrue(
+            Revision.objects.for_object(updated_content).exists(),
+            "A revision should be saved for rollback.",
+        )
+
+    def test_file_upload_is_staged_for_media_worker(self):
+        """Test that an uploaded file is kept locally until the media worker uploads it."""
+        self.client.login(username="user_with_permissions", password="password")
+        url = reverse(
+            "section_content_update",
+            kwargs={
+                "section_id": self.section.id,
+                "model_name": "file",
+                "id": self.file_content.id,
+            },
+        )
+        upload = SimpleUploadedFile(
+            f"staged_{uuid.uuid4().hex}.txt",
+            b"Staged content",
+            content_type="text/plain",
+        )
+
+        response = self.client.post(
+            url, data={"request_update": "on", "content_draft": upload}
+        )
+
+        self.assertEqual(response.status_code, 302)
+        file_content = self.file_model.objects.get(id=self.file_content.id)
+        self.assertEqual(file_content.upload_status, File.UploadStatus.PENDING)
+        self.assertFalse(
+            file_content.content_draft.storage.exists(file_content.content_draft.name)
+        )
+
+        task = MediaTask.objects.get(action=MediaTask.Action.UPLOAD)
+        self.assertTrue(staging_storage.exists(task.source))
+
+        status_url = reverse(
+            "content_media_status",
+            kwargs={"model_name": "file", "id": self.file_content.id},
         )
+        self.assertEqual(self.client.get(status_url).json()["status"], "PD")
+
+        self.assertEqual(process_pending(), 1)
+
+        file_content.refresh_from_db()
+        task.refresh_from_db()
+        self.assertEqual(file_content.upload_status, File.UploadStatus.READY)
+        self.assertEqual(task.status, MediaTask.Status.DONE)
+        self.assertEqual(file_content.content_draft.name, task.target)
+        self.assertTrue(
+            file_content.content_draft.storage.exists(file_content.content_draft.name)
+        )
+        self.assertFalse(staging_storage.exists(task.source))
+        self.assertEqual(self.client.get(status_url).json()["status"], "RD")
+
+    def test_failed_media_task_is_retried_later(self):
+        """Test that a failing media task is rescheduled and eventually marked failed."""
+        task = MediaTask.objects.create(
+            action=MediaTask.Action.UPLOAD,
+            content_type=ContentType.objects.get_for_model(File),
+            object_id=self.file_content.id,
+            field_name="content_draft",
+            source="missing/file.txt",
+            target=self.file_content.content_draft.name,
+        )
+
+        self.assertEqual(process_pending(), 1)
+        task.refresh_from_db()
+        self.assertEqual(task.status, MediaTask.Status.PENDING)
+        self.assertEqual(task.attempts, 1)
+        self.assertGreater(task.run_after, timezone.now())
+        self.assertEqual(process_pending(), 0)
+
+        task.attempts = MediaTask.MAX_ATTEMPTS - 1
+        task.run_after = timezone.now()
+        task.save()
+        process_pending()
+
+        task.refresh_from_db()
+        self.file_content.refresh_from_db()
+        self.assertEqual(task.status, MediaTask.Status.FAILED)
+        self.assertEqual(self.file_content.upload_status, File.UploadStatus.FAILED)
+
+    def test_claimed_media_task_is_not_claimed_again(self):
+        """Test that a claimed task stays with its worker until the claim expires."""
+        task = MediaTask.objects.create(
+            action=MediaTask.Action.DELETE,
+            target="files/abc/old.txt",
+        )
+
+        self.assertEqual(claim_pending(), [task])
+        self.assertEqual(claim_pending(), [])
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, MediaTask.Status.PENDING)
+        self.assertGreater(task.run_after, timezone.now())
+
+    def test_media_status_invalid_model_name(self):
+        """Test that the media status endpoint only serves file and image items."""
+        self.client.login(username="user_with_permissions", password="password")
+        url = reverse(
+            "content_media_status",
+            kwargs={"model_name": "text", "id": self.text_content.id},
+        )
+
+        self.assertEqual(self.client.get(url).status_code, 404)
 
     def test_create_content_copy(self):
         """Test creating a content copy."""
-        ContentCreateUpdateView.create_content_copy(self.text_content)
+        revision = ContentCreateUpdateView.create_content_copy(self.text_content)
 
-        self.assertIn("content_draft_en", self.text_content.original_data)
-        self.assertIn("content_draft_uk", self.text_content.original_data)
+        self.assertEqual(revision.action, Revision.Action.REQUEST)
+        self.assertIn("content_draft_en", revision.data)
+        self.assertIn("content_draft_uk", revision.data)
 
     def test_update_content_copy(self):
         """Test updating content copy."""
-        ContentCreateUpdateView.create_content_copy(self.text_content)
-        ContentCreateUpdateView.update_content_copy(
-            self.text_content, "content_draft_en"
-        )
+        ContentCreateUpdateView.create_content_copy(self.text_content).save()
+        self.text_content.content_draft_en = "Confirmed EN"
+        ContentCreateUpdateView.update_content_copy(self.text_content, "en").save()
 
         self.assertEqual(
-            self.text_content.original_data["content_draft_en"],
-            self.text_content.content_draft_en,
+            Revision.objects.snapshot(self.text_content)["content_draft_en"],
+            "Confirmed EN",
         )
 
     def test_restore_content_from_copy(self):
         """Test restoring content from copy."""
-        ContentCreateUpdateView.create_content_copy(self.text_content)
+        ContentCreateUpdateView.create_content_copy(self.text_content).save()
         self.text_content.content_draft_en = "Modified EN"
         ContentCreateUpdateView.restore_content_from_copy(self.text_content)
 
@@ -2529,6 +2868,160 @@ class ContentCreateUpdateViewTests(TestCase):
         )
 
 
+class RevisionTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="editor", password="password"
+        )
+        self.page = Page.objects.create(title="Revision Page", modified_by=self.user)
+        self.section = Section.objects.create(
+            page=self.page, title_draft_en="Draft EN", title_draft_uk="Draft UK"
+        )
+
+    def test_build_stores_only_changed_fields(self):
+        """Test that a revision only holds the fields that differ from the snapshot."""
+        Revision.objects.record(self.section, Revision.Action.REQUEST)
+        self.section.title_draft_en = "Changed EN"
+
+        revision = Revision.objects.build(self.section, Revision.Action.CONFIRM)
+
+        self.assertIsNone(revision.pk)
+        self.assertEqual(revision.data, {"title_draft_en": "Changed EN"})
+
+    def test_build_with_language_tracks_language_fields(self):
+        """Test that a language revision ignores the other language's fields."""
+        revision = Revision.objects.build(
+            self.section, Revision.Action.REQUEST, language="uk"
+        )
+
+        self.assertEqual(revision.data, {"title_draft_uk": "Draft UK"})
+
+    def test_snapshot_folds_diffs_in_order(self):
+        """Test that later revisions override earlier values in the snapshot."""
+        Revision.objects.record(
+            self.section,
+            Revision.Action.REQUEST,
+            data={"title_draft_en": "First EN", "title_draft_uk": "First UK"},
+        )
+        Revision.objects.record(
+            self.section, Revision.Action.CONFIRM, data={"title_draft_en": "Second EN"}
+        )
+
+        self.assertEqual(
+            Revision.objects.snapshot(self.section),
+            {"title_draft_en": "Second EN", "title_draft_uk": "First UK"},
+        )
+
+    def test_snapshot_until_revision(self):
+        """Test that the fold stops at the given revision."""
+        first = Revision.objects.record(
+            self.section, Revision.Action.REQUEST, data={"title_draft_en": "First EN"}
+        )
+        Revision.objects.record(
+            self.section, Revision.Action.CONFIRM, data={"title_draft_en": "Second EN"}
+        )
+
+        self.assertEqual(
+            Revision.objects.snapshot(self.section, until=first),
+            {"title_draft_en": "First EN"},
+        )
+
+    def test_snapshots_for_several_objects(self):
+        """Test that snapshots are folded per object in a single query."""
+        other = Section.objects.create(page=self.page, title_draft_en="Other EN")
+        Revision.objects.record(
+            self.section, Revision.Action.REQUEST, data={"title_draft_en": "First EN"}
+        )
+        Revision.objects.record(
+            other, Revision.Action.REQUEST, data={"title_draft_en": "Other First"}
+        )
+        Revision.objects.record(
+            self.section, Revision.Action.CONFIRM, data={"title_draft_en": "Last EN"}
+        )
+        unrevised = Section.objects.create(page=self.page)
+
+        with self.assertNumQueries(1):
+            states = Revision.objects.snapshots([self.section, other, unrevised])
+
+        self.assertEqual(
+            states,
+            {
+                self.section.pk: {"title_draft_en": "Last EN"},
+                other.pk: {"title_draft_en": "Other First"},
+                unrevised.pk: {},
+            },
+        )
+
+    def test_rollback_restores_draft(self):
+        """Test that rolling back restores the draft and records a rollback revision."""
+        first = Revision.objects.record(self.section, Revision.Action.REQUEST)
+        self.section.title_draft_en = "Confirmed EN"
+        self.section.save()
+        Revision.objects.record(self.section, Revision.Action.CONFIRM)
+
+        revision = first.rollback(user=self.user)
+
+        self.section.refresh_from_db()
+        self.assertEqual(self.section.title_draft_en, "Draft EN")
+        self.assertEqual(revision.action, Revision.Action.ROLLBACK)
+        self.assertEqual(revision.created_by, self.user)
+        self.assertEqual(Revision.objects.for_object(self.section).last(), revision)
+        self.assertEqual(
+            Revision.objects.snapshot(self.section)["title_draft_en"], "Draft EN"
+        )
+
+    def test_deleting_objects_deletes_their_revisions(self):
+        """Test that revisions are removed along with their section or item."""
+        text = Text.objects.create(content_draft_en="Draft text")
+        Content.objects.create(section=self.section, item=text)
+        Revision.objects.record(self.section, Revision.Action.REQUEST)
+        Revision.objects.record(text, Revision.Action.REQUEST, language="en")
+
+        text.delete()
+        self.assertFalse(Revision.objects.for_object(text).exists())
+        self.assertTrue(Revision.objects.for_object(self.section).exists())
+
+        self.section.delete()
+        self.assertFalse(Revision.objects.exists())
+
+
+class RevisionMigrationTests(TransactionTestCase):
+    migrate_from = [("hub", "0001_initial")]
+    migrate_to = [("hub", "0002_revision")]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        old_apps = executor.loader.project_state(self.migrate_from).apps
+
+        OldText = old_apps.get_model("hub", "Text")
+        self.pending = OldText.objects.create(
+            content_draft_en="Draft EN",
+            original_data={
+                "content_draft_en": "Original EN",
+                "content_draft_uk": None,
+                "is_update_pending_en": False,
+            },
+        )
+        self.settled = OldText.objects.create(content_draft_en="Settled EN")
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.migrate_to)
+
+    def test_copy_original_data(self):
+        """Test that pending snapshots are carried over as request revisions."""
+        pending = Text.objects.get(pk=self.pending.pk)
+        settled = Text.objects.get(pk=self.settled.pk)
+
+        revision = Revision.objects.for_object(pending).get()
+        self.assertEqual(revision.action, Revision.Action.REQUEST)
+        self.assertEqual(
+            revision.data, {"content_draft_en": "Original EN", "content_draft_uk": None}
+        )
+        self.assertFalse(Revision.objects.for_object(settled).exists())
+
+
 class ContentDisplayViewTests(TestCase):
     def setUp(self):
         """Set up test data, permissions, and user accounts."""
@@ -2663,7 +3156,10 @@ class ContentDisplayViewTests(TestCase):
 
         self.assertEqual(updated_content.content_en, "Draft Text EN")
         self.assertEqual(updated_content.content_uk, "Draft Text UK")
-        self.assertIsNone(updated_content.original_data)
+        self.assertEqual(
+            Revision.objects.for_object(updated_content).last().action,
+            Revision.Action.PUBLISH,
+        )
 
     def test_post_valid_display_file_content(self):
         """Test POST request to display file content after confirmation."""
@@ -2766,6 +3262,157 @@ class ContentDisplayViewTests(TestCase):
         )
 
 
+class ImageRenditionTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="publisher", password="password"
+        )
+        self.user.user_permissions.add(*Permission.objects.filter(codename="display"))
+        page = Page.objects.create(title="Rendition Page", modified_by=self.user)
+        self.section = Section.objects.create(page=page)
+
+        buffer = BytesIO()
+        Image.new("RGB", (1000, 500), "blue").save(buffer, "JPEG")
+        upload = SimpleUploadedFile(
+            f"rendition_{uuid.uuid4().hex}.jpg",
+            buffer.getvalue(),
+            content_type="image/jpeg",
+        )
+        self.image = ImageModel.objects.create(
+            content_draft=upload, is_update_confirmed=True
+        )
+        self.content = Content.objects.create(section=self.section, item=self.image)
+
+    def publish(self):
+        self.client.login(username="publisher", password="password")
+        response = self.client.post(
+            reverse("section_content_display", kwargs={"id": self.content.id})
+        )
+        self.assertEqual(response.status_code, 302)
+        process_pending()
+        self.image.refresh_from_db()
+
+    def test_publish_generates_width_bucketed_renditions(self):
+        """Test that displaying an image queues WebP renditions up to its own width."""
+        self.publish()
+
+        renditions = self.image.get_renditions()
+        self.assertEqual(self.image.renditions["width"], 1000)
+        self.assertEqual(self.image.renditions["height"], 500)
+        webp = [source for source in renditions if source["type"] == "image/webp"]
+        self.assertEqual([source["width"] for source in webp], [320, 640, 960, 1000])
+        self.assertEqual(webp[0]["height"], 160)
+        for source in renditions:
+            self.assertTrue(self.image.content.storage.exists(source["name"]))
+            self.assertGreater(source["size"], 0)
+
+    def test_renditions_ignored_after_image_changes(self):
+        """Test that renditions of a previously displayed image are not served."""
+        self.publish()
+        self.image.content = "images/other.jpg"
+
+        self.assertEqual(self.image.get_renditions(), [])
+
+    def test_responsive_image_tag_emits_srcset(self):
+        """Test that the template tag renders sources for each rendition format."""
+        self.publish()
+
+        html = Template(
+            "{% load responsive_image %}"
+            '{% responsive_image image alt="Banner" css_class="img-fluid" %}'
+        ).render(Context({"image": self.image}))
+
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn("_320w.webp 320w", html)
+        self.assertIn(f'src="{self.image.content.url}"', html)
+        self.assertIn('width="1000" height="500"', html)
+        self.assertIn('class="img-fluid"', html)
+
+    def test_responsive_image_tag_without_renditions(self):
+        """Test that the template tag falls back to the original image."""
+        self.image.content = self.image.content_draft
+
+        html = Template(
+            "{% load responsive_image %}{% responsive_image image %}"
+        ).render(Context({"image": self.image}))
+
+        self.assertNotIn("<source", html)
+        self.assertIn(f'src="{self.image.content.url}"', html)
+
+
+class MediaStorageTests(TestCase):
+    def test_versioned_upload_to_never_reuses_a_key(self):
+        """Test that uploading the same file name twice gives two different keys."""
+        upload_to = VersionedUploadTo("images")
+
+        first = upload_to(None, "banner.jpg")
+        second = upload_to(None, "banner.jpg")
+
+        self.assertNotEqual(first, second)
+        self.assertTrue(first.startswith("images/"))
+        self.assertTrue(first.endswith("/banner.jpg"))
+
+    def test_url_is_memoized(self):
+        """Test that the storage builds each object URL only once."""
+        storage = MediaStorage(
+            bucket_name="bucket",
+            custom_domain="cdn.example.com",
+            querystring_auth=False,
+        )
+
+        with patch.object(
+            S3Boto3Storage, "url", autospec=True, side_effect=S3Boto3Storage.url
+        ) as url:
+            first = storage.url("images/abc/banner.jpg")
+            second = storage.url("images/abc/banner.jpg")
+
+        self.assertEqual(first, "https://cdn.example.com/images/abc/banner.jpg")
+        self.assertEqual(first, second)
+        self.assertEqual(url.call_count, 1)
+
+    def test_url_with_parameters_is_not_memoized(self):
+        """Test that URLs built with extra parameters bypass the cache."""
+        storage = MediaStorage(
+            bucket_name="bucket",
+            custom_domain="cdn.example.com",
+            querystring_auth=False,
+        )
+
+        with patch.object(
+            S3Boto3Storage, "url", autospec=True, side_effect=S3Boto3Storage.url
+        ) as url:
+            storage.url("files/abc/report.pdf", parameters={"download": "1"})
+            storage.url("files/abc/report.pdf", parameters={"download": "1"})
+
+        self.assertEqual(url.call_count, 2)
+
+    def test_save_copy_copies_inside_s3(self):
+        """Test that a staged object is copied server-side with the media headers."""
+        storage = MediaStorage(
+            bucket_name="bucket",
+            object_parameters={"CacheControl": "public, max-age=31536000, immutable"},
+        )
+        staging = S3Boto3Storage(bucket_name="staging-bucket", location="staging")
+
+        with patch.object(
+            MediaStorage, "bucket", new_callable=PropertyMock
+        ) as bucket, patch.object(storage, "exists", return_value=False):
+            name = storage.save_copy(
+                staging, "files/abc/report.pdf", "files/abc/report.pdf"
+            )
+
+        self.assertEqual(name, "files/abc/report.pdf")
+        bucket.return_value.Object.assert_called_once_with("files/abc/report.pdf")
+        bucket.return_value.Object.return_value.copy.assert_called_once_with(
+            {"Bucket": "staging-bucket", "Key": "staging/files/abc/report.pdf"},
+            ExtraArgs={
+                "CacheControl": "public, max-age=31536000, immutable",
+                "ContentType": "application/pdf",
+                "MetadataDirective": "REPLACE",
+            },
+        )
+
+
 class ContentHideViewTests(TestCase):
     """Test suite for ContentHideView."""
 
@@ -3149,7 +3796,12 @@ class ContentDeleteViewTests(TestCase):
         with self.assertRaises(self.file_model.DoesNotExist):
             self.file_model.objects.get(id=self.file_content.id)
 
-        # File should be deleted from storage
+        # File is deleted from storage by the media worker
+        self.assertTrue(
+            os.path.exists(self.file_content.content_draft.path),
+            "File should be kept until the media worker runs.",
+        )
+        process_pending()
         self.assertFalse(
             os.path.exists(self.file_content.content_draft.path),
             "File should be deleted from storage.",
@@ -3828,6 +4480,58 @@ class ContentOrderViewTests(TestCase):
         )
 
 
+class ContentLinkTests(TestCase):
+    def setUp(self):
+        self.page = Page.objects.create(title="Links Page", slug="links-page")
+        self.section = Section.objects.create(page=self.page)
+        self.texts = []
+        for index in range(5):
+            text = Text.objects.create(title=f"Text {index}")
+            Content.objects.create(section=self.section, item=text)
+            self.texts.append(text)
+        self.orphan = URL.objects.create(title="Orphan")
+
+    def test_prefetch_content_links_uses_one_query(self):
+        """Test that URLs of prefetched items are built without further queries."""
+        results = list(Text.objects.all()) + [self.orphan, self.page]
+        # Content types are cached per process after their first lookup.
+        ContentType.objects.get_for_models(Text, URL)
+
+        with self.assertNumQueries(1):
+            prefetch_content_links(results)
+
+        with self.assertNumQueries(0):
+            public_urls = [result.get_public_url() for result in results[:-1]]
+            admin_urls = [result.get_absolute_url() for result in results[:-1]]
+
+        self.assertIn(
+            reverse("page", kwargs={"slug": "links-page"})
+            + f"#content-{self.texts[0].id}",
+            public_urls,
+        )
+        self.assertIn(
+            reverse(
+                "section_content_update",
+                kwargs={
+                    "section_id": self.section.id,
+                    "model_name": "text",
+                    "id": self.texts[0].id,
+                },
+            ),
+            admin_urls,
+        )
+        self.assertEqual(public_urls[-1], "#")
+        self.assertEqual(admin_urls[-1], "#")
+
+    def test_get_public_url_without_prefetch(self):
+        """Test that an item still resolves its URL on its own."""
+        text = Text.objects.get(id=self.texts[0].id)
+
+        self.assertTrue(text.get_public_url().endswith(f"#content-{text.id}"))
+        with self.assertNumQueries(0):
+            text.get_absolute_url()
+
+
 class GlobalSearchViewTests(TestCase):
     """Tests for the global_search view."""
 
@@ -3996,3 +4700,35 @@ class GlobalSearchViewTests(TestCase):
         response = self.client.get(url, {"query": ""})
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.context["results"]), 0)
+
+
+class NavFragmentCacheTests(TestCase):
+    def setUp(self):
+        caches["template_fragments"].clear()
+        self.url = reverse("dashboard")
+
+    def test_nav_fragments_are_cached(self):
+        self.client.get(self.url)
+
+        key = make_template_fragment_key(
+            "hub_offcanvas", [get_language(), get_nav_version()]
+        )
+        self.assertIsNotNone(caches["template_fragments"].get(key))
+
+    def test_nav_is_cached_per_role(self):
+        CustomUser.objects.create_superuser(
+            username="admin", email="admin@example.com", password="password"
+        )
+        CustomUser.objects.create_user(username="staff", password="password")
+        panel = f'href="/{settings.DJANGO_ADMIN_PATH}/"'
+
+        self.client.login(username="admin", password="password")
+        self.assertContains(self.client.get(self.url), panel)
+
+        self.client.login(username="staff", password="password")
+        self.assertNotContains(self.client.get(self.url), panel)
+
+    def test_invalidate_nav_bumps_version(self):
+        version = get_nav_version()
+        call_command("invalidate_nav", stdout=StringIO())
+        self.assertEqual(get_nav_version(), version + 1)
@@ -28,6 +28,11 @@ urlpatterns = [
         views.ContentCreateUpdateView.as_view(),
         name="section_content_update",
     ),
+    path(
+        "content/<model_name>/<uuid:id>/status/",
+        views.ContentMediaStatusView.as_view(),
+        name="content_media_status",
+    ),
     path(
         "content/<uuid:id>/display/",
         views.ContentDisplayView.as_view(),
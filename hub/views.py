@@ -1,5 +1,4 @@
 import logging
-import os
 import uuid
 
 from braces.views import CsrfExemptMixin, JsonRequestResponseMixin
@@ -9,9 +8,10 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.contrib.postgres.search import SearchVector, SearchRank
 from django.core.exceptions import PermissionDenied
-from django.db import models
+from django.db import models, transaction
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.db.models.fields.files import FieldFile
-from django.forms.models import model_to_dict
 from django.forms.models import modelform_factory
 from django.http import HttpResponseForbidden, JsonResponse, Http404
 from django.shortcuts import get_object_or_404, redirect, render
@@ -20,13 +20,28 @@ from django.views.generic import TemplateView
 from django.views.generic.base import TemplateResponseMixin, View
 from django.views.generic.edit import CreateView, UpdateView, DeleteView
 from django.views.generic.list import ListView
-from django.utils.translation import gettext_lazy as _
+from django.utils.translation import get_language, gettext_lazy as _
 
 from accounts.models import CustomUser
 from locations.models import Division, Branch, Person
 from payments.models import Donor, Donation
 from .forms import SectionFormSet, SectionForm, PageForm, SearchForm
-from .models import Page, Section, Content, Text, File, Image, Video, URL
+from .models import (
+    Page,
+    Section,
+    Content,
+    Text,
+    File,
+    Image,
+    Video,
+    URL,
+    Revision,
+    MediaItem,
+    prefetch_content_links,
+)
+from .pagination import KeysetPaginationMixin
+from .signals import invalidate_page
+from .media import stage_upload, schedule_delete, schedule_renditions, enqueue
 
 logger = logging.getLogger(__name__)
 
@@ -62,13 +77,29 @@ class ModifiedByPageEditMixin(ModifiedByPageMixin, ModifiedByEditMixin):
     template_name = "hub/manage/page/form.html"
 
 
-class ManagePageListView(ModifiedByPageMixin, ListView):
+class ManagePageListView(KeysetPaginationMixin, ModifiedByPageMixin, ListView):
     model = Page
     template_name = "hub/manage/page/list.html"
     context_object_name = "page_list"
     login_url = "account_login"
     redirect_field_name = "next"
     permission_required = "hub.view_page"
+    paginate_by = 25
+    keyset_ordering = ["sort_title", "id"]
+
+    def get_queryset(self):
+        sort_field = "title_uk" if get_language() == "uk" else "title_en"
+        first_section = (
+            Section.objects.filter(page=OuterRef("pk")).order_by("order").values("id")
+        )
+        return (
+            super()
+            .get_queryset()
+            .annotate(
+                sort_title=Coalesce(sort_field, Value("")),
+                first_section_id=Subquery(first_section[:1]),
+            )
+        )
 
 
 class PageCreateView(ModifiedByPageEditMixin, CreateView):
@@ -119,6 +150,25 @@ class PageSectionUpdateView(
     redirect_field_name = "next"
     permission_required = "hub.view_section"
 
+    workflow_actions = (
+        "request_update_en",
+        "request_update_uk",
+        "confirm_update_en",
+        "confirm_update_uk",
+        "reject_update_en",
+        "reject_update_uk",
+    )
+
+    section_update_fields = [
+        "title_draft_en",
+        "title_draft_uk",
+        "is_update_pending_en",
+        "is_update_pending_uk",
+        "is_update_confirmed_en",
+        "is_update_confirmed_uk",
+        "modified_by",
+    ]
+
     def get_formset(self, data=None):
         return SectionFormSet(
             instance=self.page,
@@ -134,6 +184,9 @@ class PageSectionUpdateView(
         formset = self.get_formset()
         return self.render_to_response({"page": self.page, "formset": formset})
 
+    # A permission check on a later form must not leave the sections saved
+    # by earlier forms behind, so the whole submission is one transaction.
+    @transaction.atomic
     def post(self, request, *args, **kwargs):
 
         if "add_new_section" in request.POST:
@@ -142,95 +195,124 @@ class PageSectionUpdateView(
             Section.objects.create(page=self.page)
 
         formset = self.get_formset(data=request.POST)
+        sections = [form.instance for form in formset.forms]
+        baselines = Revision.objects.snapshots(sections)
 
-        for form in formset:
-            form.has_changed = lambda: True
-
+        # Request snapshots are built from the stored drafts, before the
+        # submitted data is applied to the instances during validation.
+        request_revisions = {}
         for form in formset.forms:
             section = form.instance
-            section_prefix = form.prefix
-
-            if (
-                f"{section_prefix}-request_update_en" in request.POST
-                and not section.original_data
-            ):
-                self.create_section_copy(section)
-            if (
-                f"{section_prefix}-request_update_uk" in request.POST
-                and not section.original_data
-            ):
-                self.create_section_copy(section)
+            request_revisions[form.prefix] = [
+                self.create_section_copy(
+                    section, language, request.user, baselines[section.pk]
+                )
+                for language in ("en", "uk")
+                if f"{form.prefix}-request_update_{language}" in request.POST
+                and not getattr(section, f"is_update_pending_{language}")
+            ]
 
         if formset.is_valid():
-            sections = formset.save(commit=False)
+            sections_to_update = []
+            revisions = []
 
-            for form, section in zip(formset.forms, sections):
-                section_prefix = form.prefix
+            for form in formset.forms:
+                if form in formset.deleted_forms:
+                    continue
 
-                if f"{section_prefix}-request_update_en" in request.POST:
-                    if not request.user.has_perm("hub.request_update_en"):
-                        raise PermissionDenied
-                    section.is_update_pending_en = True
-
-                if f"{section_prefix}-request_update_uk" in request.POST:
-                    if not request.user.has_perm("hub.request_update_uk"):
-                        raise PermissionDenied
-                    section.is_update_pending_uk = True
-
-                if f"{section_prefix}-confirm_update_en" in request.POST:
-                    if not request.user.has_perm("hub.confirm_update_en"):
-                        raise PermissionDenied
-                    section.is_update_pending_en = False
-                    section.is_update_confirmed_en = True
-                    self.update_section_copy(section, "title_draft_en")
-
-                if f"{section_prefix}-confirm_update_uk" in request.POST:
-                    if not request.user.has_perm("hub.confirm_update_uk"):
-                        raise PermissionDenied
-                    section.is_update_pending_uk = False
-                    section.is_update_confirmed_uk = True
-                    self.update_section_copy(section, "title_draft_uk")
-
-                if f"{section_prefix}-reject_update_en" in request.POST:
-                    if not request.user.has_perm("hub.reject_update_en"):
-                        raise PermissionDenied
-                    section.is_update_pending_en = False
-                    section.is_update_confirmed_en = False
-                    self.restore_section_from_copy(section)
-
-                if f"{section_prefix}-reject_update_uk" in request.POST:
-                    if not request.user.has_perm("hub.reject_update_en"):
-                        raise PermissionDenied
-                    section.is_update_pending_uk = False
-                    section.is_update_confirmed_uk = False
-                    self.restore_section_from_copy(section)
+                section_prefix = form.prefix
+                actions = [
+                    action
+                    for action in self.workflow_actions
+                    if f"{section_prefix}-{action}" in request.POST
+                ]
+                section = form.instance
+                if not actions and not form.has_changed() and not section._state.adding:
+                    continue
+
+                baseline = baselines[section.pk]
+                revisions.extend(request_revisions[section_prefix])
+
+                for language in ("en", "uk"):
+                    if f"request_update_{language}" in actions:
+                        if not request.user.has_perm(f"hub.request_update_{language}"):
+                            raise PermissionDenied
+                        setattr(section, f"is_update_pending_{language}", True)
+
+                    if f"confirm_update_{language}" in actions:
+                        if not request.user.has_perm(f"hub.confirm_update_{language}"):
+                            raise PermissionDenied
+                        setattr(section, f"is_update_pending_{language}", False)
+                        setattr(section, f"is_update_confirmed_{language}", True)
+                        revisions.append(
+                            self.update_section_copy(
+                                section, language, request.user, baseline
+                            )
+                        )
+
+                    if f"reject_update_{language}" in actions:
+                        if not request.user.has_perm(f"hub.reject_update_{language}"):
+                            raise PermissionDenied
+                        setattr(section, f"is_update_pending_{language}", False)
+                        setattr(section, f"is_update_confirmed_{language}", False)
+                        revisions.append(
+                            self.restore_section_from_copy(
+                                section, language, request.user, baseline
+                            )
+                        )
 
                 section.modified_by = request.user
-                section.save()
+
+                if section._state.adding:
+                    section.save()
+                else:
+                    sections_to_update.append(section)
+
+            if sections_to_update:
+                Section.objects.bulk_update(
+                    sections_to_update, self.section_update_fields
+                )
+            if revisions:
+                Revision.objects.bulk_create(revisions)
 
             return redirect("page_section_update", slug=self.page.slug)
 
         return self.render_to_response({"page": self.page, "formset": formset})
 
     @staticmethod
-    def create_section_copy(section):
-        fields_to_include = ["title_draft_en", "title_draft_uk"]
-        section_copy_data = model_to_dict(section, fields=fields_to_include)
-        section.original_data = section_copy_data
-        section.save()
+    def create_section_copy(section, language, user, baseline):
+        return Revision.objects.build(
+            section,
+            Revision.Action.REQUEST,
+            language=language,
+            user=user,
+            baseline=baseline,
+        )
 
     @staticmethod
-    def update_section_copy(section, field_to_update):
-        if section.original_data:
-            section.original_data[field_to_update] = getattr(section, field_to_update)
-            section.save(update_fields=["original_data"])
+    def update_section_copy(section, language, user, baseline):
+        revision = Revision.objects.build(
+            section,
+            Revision.Action.CONFIRM,
+            language=language,
+            user=user,
+            baseline=baseline,
+        )
+        baseline.update(revision.data)
+        return revision
 
     @staticmethod
-    def restore_section_from_copy(section):
-        if section.original_data:
-            for field, value in section.original_data.items():
-                setattr(section, field, value)
-            section.save()
+    def restore_section_from_copy(section, language, user, baseline):
+        for field in Section.revision_fields[language]:
+            if field in baseline:
+                setattr(section, field, baseline[field])
+        return Revision.objects.build(
+            section,
+            Revision.Action.REJECT,
+            language=language,
+            user=user,
+            baseline=baseline,
+        )
 
 
 class SectionDeleteView(ModifiedByPageMixin, DeleteView):
@@ -280,12 +362,12 @@ class SectionPublishView(LoginRequiredMixin, PermissionRequiredMixin, View):
         section.title_en = section.title_draft_en
         section.title_uk = section.title_draft_uk
         section.status = Section.Status.PUBLISHED
-        section.original_data = None
         section.is_update_pending_en = False
         section.is_update_confirmed_en = False
         section.is_update_pending_uk = False
         section.is_update_confirmed_uk = False
         section.save()
+        Revision.objects.record(section, Revision.Action.PUBLISH, user=request.user)
 
         messages.success(request, "Section published successfully.")
         return redirect("page_section_update", slug=section.page.slug)
@@ -371,57 +453,63 @@ class ContentCreateUpdateView(
             if not request.user.has_perm("hub.request_update"):
                 raise PermissionDenied
 
-            if not self.obj:
+            if issubclass(self.model, Text):
+                languages = []
+                for language in ("en", "uk"):
+                    if f"request_update_{language}" in request.POST:
+                        if not request.user.has_perm(f"hub.request_update_{language}"):
+                            raise PermissionDenied
+                        languages.append(language)
+            else:
+                languages = [""]
+
+            # The baseline is built from the stored drafts, before the
+            # submitted data is applied to the instance during validation.
+            revisions = []
+            if self.obj:
+                baseline = Revision.objects.snapshot(self.obj)
+                revisions = [
+                    self.create_content_copy(self.obj, language, request.user, baseline)
+                    for language in languages
+                    if not self.is_update_pending(self.obj, language)
+                ]
+
+            if not form.is_valid():
+                if not self.obj:
+                    return self.render_to_response({"form": form, "object": None})
+            else:
                 obj = form.save(commit=False)
+                media_tasks = []
+                if isinstance(obj, MediaItem):
+                    media_tasks.append(stage_upload(obj))
+
+                for language in languages:
+                    self.set_update_flags(obj, language, pending=True)
+
+                if not self.obj:
+                    obj.title = f"Content {self.section.order + 1}.{self.section.contents.count() + 1}"
+                    revisions = [
+                        Revision.objects.build(
+                            obj,
+                            Revision.Action.REQUEST,
+                            user=request.user,
+                            baseline={},
+                            data={
+                                field: None
+                                for field in Revision.objects.get_tracked_fields(obj)
+                            },
+                        )
+                    ]
 
-                original_content_draft_en = getattr(obj, "content_draft_en", None)
-                original_content_draft_uk = getattr(obj, "content_draft_uk", None)
-                original_content_draft = getattr(obj, "content_draft", None)
-
-                if isinstance(obj, Text):
-                    obj.content_draft_en = None
-                    obj.content_draft_uk = None
-                else:
-                    obj.content_draft = None
-
-                self.create_content_copy(obj)
-
-                if isinstance(obj, Text):
-                    obj.content_draft_en = original_content_draft_en
-                    obj.content_draft_uk = original_content_draft_uk
-                else:
-                    obj.content_draft = original_content_draft
-
-                obj.title = f"Content {self.section.order + 1}.{self.section.contents.count() + 1}"
                 obj.modified_by = request.user
                 obj.save()
 
-                Content.objects.create(section=self.section, item=obj)
-                self.obj = obj
-
-            else:
-                obj = self.obj or form.instance
-                if not obj.original_data:
-                    self.create_content_copy(obj)
-
-            if isinstance(obj, Text):
-                if "request_update_en" in request.POST:
-                    if not request.user.has_perm("hub.request_update_en"):
-                        raise PermissionDenied
-                    obj.is_update_pending_en = True
-                if "request_update_uk" in request.POST:
-                    if not request.user.has_perm("hub.request_update_uk"):
-                        raise PermissionDenied
-                    obj.is_update_pending_uk = True
-            else:
-                if not request.user.has_perm("hub.request_update"):
-                    raise PermissionDenied
-                obj.is_update_pending = True
+                if not self.obj:
+                    Content.objects.create(section=self.section, item=obj)
+                    self.obj = obj
 
-            if form.is_valid():
-                obj = form.save(commit=False)
-                obj.modified_by = request.user
-                obj.save()
+                Revision.objects.bulk_create(revisions)
+                enqueue(media_tasks)
 
             return redirect(
                 "section_content_update",
@@ -436,41 +524,41 @@ class ContentCreateUpdateView(
                 raise PermissionDenied
 
             obj = form.save(commit=False)
+            baseline = Revision.objects.snapshot(obj)
+            media_tasks = []
 
             if isinstance(obj, Text):
-                if "confirm_update_en" in request.POST:
-                    if not request.user.has_perm("hub.confirm_update_en"):
-                        raise PermissionDenied
-                    obj.is_update_pending_en = False
-                    obj.is_update_confirmed_en = True
-                    self.update_content_copy(obj, "content_draft_en")
-                if "confirm_update_uk" in request.POST:
-                    if not request.user.has_perm("hub.confirm_update_uk"):
-                        raise PermissionDenied
-                    obj.is_update_pending_uk = False
-                    obj.is_update_confirmed_uk = True
-                    self.update_content_copy(obj, "content_draft_uk")
+                languages = []
+                for language in ("en", "uk"):
+                    if f"confirm_update_{language}" in request.POST:
+                        if not request.user.has_perm(f"hub.confirm_update_{language}"):
+                            raise PermissionDenied
+                        languages.append(language)
             else:
                 if not request.user.has_perm("hub.confirm_update"):
                     raise PermissionDenied
-                if obj.original_data and "content_draft" in obj.original_data:
-                    previous_file = obj.original_data.get("content_draft")
-                    if previous_file:
-                        try:
-                            obj.content.storage.delete(previous_file)
-                            print(
-                                f"Previous file '{previous_file}' successfully deleted."
-                            )
-                        except Exception as e:
-                            print(f"Error deleting file '{previous_file}': {e}")
+                languages = [""]
 
-                obj.is_update_pending = False
-                obj.is_update_confirmed = True
+                previous_file = baseline.get("content_draft")
+                if previous_file and previous_file not in (
+                    self.get_file_name(obj.content_draft),
+                    self.get_file_name(obj.content),
+                ):
+                    media_tasks.append(
+                        schedule_delete(obj.content_draft, previous_file)
+                    )
 
-                self.update_content_copy(obj, "content_draft")
+            revisions = []
+            for language in languages:
+                self.set_update_flags(obj, language, confirmed=True)
+                revisions.append(
+                    self.update_content_copy(obj, language, request.user, baseline)
+                )
 
             obj.modified_by = request.user
             obj.save()
+            Revision.objects.bulk_create(revisions)
+            enqueue(media_tasks)
 
             return redirect(
                 "section_content_update",
@@ -484,56 +572,55 @@ class ContentCreateUpdateView(
                 raise PermissionDenied
 
             obj = form.save(commit=False)
+            baseline = Revision.objects.snapshot(obj)
+            media_tasks = []
 
-            if obj.original_data and all(
-                value is None for value in obj.original_data.values()
-            ):
-                if hasattr(obj, "content") and isinstance(obj.content, FieldFile):
-                    obj.content.delete(save=False)
-
-                if hasattr(obj, "content_draft") and isinstance(
-                    obj.content_draft, FieldFile
-                ):
-                    obj.content_draft.delete(save=False)
+            if baseline and all(value is None for value in baseline.values()):
+                if isinstance(obj, MediaItem):
+                    media_tasks.append(schedule_delete(obj.content))
+                    media_tasks.append(schedule_delete(obj.content_draft))
 
                 obj.delete()
+                enqueue(media_tasks)
                 return redirect(
                     "section_content_list",
                     section_id=self.section.id,
                 )
 
             if isinstance(obj, Text):
-                if "reject_update_en" in request.POST:
-                    if not request.user.has_perm("hub.reject_update_en"):
-                        raise PermissionDenied
-                    obj.is_update_pending_en = False
-                    obj.is_update_confirmed_en = False
-                    self.restore_content_from_copy(obj)
-                if "reject_update_uk" in request.POST:
-                    if not request.user.has_perm("hub.reject_update_uk"):
-                        raise PermissionDenied
-                    obj.is_update_pending_uk = False
-                    obj.is_update_confirmed_uk = False
-                    self.restore_content_from_copy(obj)
+                languages = []
+                for language in ("en", "uk"):
+                    if f"reject_update_{language}" in request.POST:
+                        if not request.user.has_perm(f"hub.reject_update_{language}"):
+                            raise PermissionDenied
+                        languages.append(language)
             else:
                 if not request.user.has_perm("hub.reject_update"):
                     raise PermissionDenied
-
-                if hasattr(obj, "content_draft") and obj.content_draft:
-                    temp = os.path.basename(obj.content_draft.name)
-                    try:
-                        obj.content_draft.delete(save=False)
-                        print(f"Draft file '{temp}' successfully deleted.")
-                    except Exception as e:
-                        print(f"Error deleting draft file '{temp}': {e}")
-
-                obj.is_update_pending = False
-                obj.is_update_confirmed = False
-
-                self.restore_content_from_copy(obj)
+                languages = [""]
+
+                draft_file = self.get_file_name(getattr(obj, "content_draft", None))
+                if draft_file and draft_file != baseline.get("content_draft"):
+                    media_tasks.append(schedule_delete(obj.content_draft))
+
+            revisions = []
+            for language in languages:
+                self.set_update_flags(obj, language)
+                self.restore_content_from_copy(obj, baseline, language)
+                revisions.append(
+                    Revision.objects.build(
+                        obj,
+                        Revision.Action.REJECT,
+                        language=language,
+                        user=request.user,
+                        baseline=baseline,
+                    )
+                )
 
             obj.modified_by = request.user
             obj.save()
+            Revision.objects.bulk_create(revisions)
+            enqueue(media_tasks)
 
             return redirect(
                 "section_content_update",
@@ -545,64 +632,86 @@ class ContentCreateUpdateView(
         return self.render_to_response({"form": form, "object": self.obj})
 
     @staticmethod
-    def create_content_copy(content):
-        fields_to_include = [
-            field.name
-            for field in content._meta.fields
-            if field.name.startswith("content_draft")
-        ]
-
-        content_copy_data = {}
-
-        for field in fields_to_include:
-            value = getattr(content, field, None)
-
-            if isinstance(value, models.fields.files.FieldFile):
-                content_copy_data[field] = value.name if value else None
-            elif isinstance(value, str):
-                content_copy_data[field] = value
-            else:
-                content_copy_data[field] = None
+    def is_update_pending(content, language=""):
+        suffix = f"_{language}" if language else ""
+        return getattr(content, f"is_update_pending{suffix}")
 
-        content.original_data = content_copy_data
-        content.save()
+    @staticmethod
+    def set_update_flags(content, language="", pending=False, confirmed=False):
+        suffix = f"_{language}" if language else ""
+        setattr(content, f"is_update_pending{suffix}", pending)
+        setattr(content, f"is_update_confirmed{suffix}", confirmed)
 
     @staticmethod
-    def update_content_copy(content, field_to_update):
-        if content.original_data:
-            value = getattr(content, field_to_update, None)
-
-            if isinstance(value, models.fields.files.FieldFile):
-                content.original_data[field_to_update] = value.name if value else None
-            elif isinstance(value, str):
-                content.original_data[field_to_update] = value
-            else:
-                content.original_data[field_to_update] = None
+    def get_file_name(value):
+        return value.name if isinstance(value, FieldFile) and value else None
+
+    @staticmethod
+    def create_content_copy(content, language="", user=None, baseline=None):
+        return Revision.objects.build(
+            content,
+            Revision.Action.REQUEST,
+            language=language,
+            user=user,
+            baseline=baseline,
+        )
 
-            content.save(update_fields=["original_data"])
+    @staticmethod
+    def update_content_copy(content, language="", user=None, baseline=None):
+        revision = Revision.objects.build(
+            content,
+            Revision.Action.CONFIRM,
+            language=language,
+            user=user,
+            baseline=baseline,
+        )
+        if baseline is not None:
+            baseline.update(revision.data)
+        return revision
 
     @staticmethod
-    def restore_content_from_copy(content):
-        if content.original_data:
-            for field, value in content.original_data.items():
-                if hasattr(content, field):
-                    model_field = content._meta.get_field(field)
-                    if isinstance(model_field, models.FileField):
-                        if value:
-                            try:
-                                content_field = getattr(content, field)
-                                content_field.storage.open(value)
-                                setattr(content, field, value)
-                            except Exception as e:
-                                setattr(content, field, None)
-                                print(_(f"File '{value}' not found in storage: {e}"))
-                        else:
-                            setattr(content, field, None)
-                    elif isinstance(model_field, models.URLField):
-                        setattr(content, field, value)
-                    else:
+    def restore_content_from_copy(content, baseline=None, language=""):
+        if baseline is None:
+            baseline = Revision.objects.snapshot(content)
+
+        for field in Revision.objects.get_tracked_fields(content, language):
+            if field not in baseline:
+                continue
+            value = baseline[field]
+            model_field = content._meta.get_field(field)
+            if isinstance(model_field, models.FileField):
+                if value:
+                    try:
+                        content_field = getattr(content, field)
+                        content_field.storage.open(value)
                         setattr(content, field, value)
-            content.save()
+                    except Exception:
+                        setattr(content, field, None)
+                        logger.exception("File '%s' not found in storage.", value)
+                else:
+                    setattr(content, field, None)
+            else:
+                setattr(content, field, value)
+
+
+class ContentMediaStatusView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    login_url = "account_login"
+    redirect_field_name = "next"
+    permission_required = "hub.view_content"
+
+    def get(self, request, *args, **kwargs):
+        model_name = kwargs.get("model_name")
+        if model_name not in ["file", "image"]:
+            raise Http404(_("Invalid model name."))
+
+        model = apps.get_model(app_label="hub", model_name=model_name)
+        item = get_object_or_404(model, id=kwargs.get("id"))
+        return JsonResponse(
+            {
+                "status": item.upload_status,
+                "status_display": item.get_upload_status_display(),
+            }
+        )
 
 
 class ContentDisplayView(LoginRequiredMixin, PermissionRequiredMixin, View):
@@ -647,8 +756,10 @@ class ContentDisplayView(LoginRequiredMixin, PermissionRequiredMixin, View):
             item.is_update_pending = False
             item.is_update_confirmed = False
 
-        item.original_data = None
         item.save()
+        Revision.objects.record(item, Revision.Action.PUBLISH, user=request.user)
+        if isinstance(item, Image):
+            enqueue([schedule_renditions(item)])
 
         content.display()
 
@@ -680,8 +791,8 @@ class ContentHideView(LoginRequiredMixin, PermissionRequiredMixin, View):
             item.is_update_pending = False
             item.is_update_confirmed = False
 
-        item.original_data = None
         item.save()
+        Revision.objects.record(item, Revision.Action.HIDE, user=request.user)
 
         content.hide()
 
@@ -705,20 +816,19 @@ class ContentDeleteView(LoginRequiredMixin, PermissionRequiredMixin, View):
         content = get_object_or_404(Content, id=object_id)
         section = content.section
 
-        if hasattr(content.item, "content") and isinstance(
-            content.item.content, models.fields.files.FieldFile
-        ):
-            if content.item.content:
-                content.item.content.delete(save=False)
-
-        if hasattr(content.item, "content_draft") and isinstance(
-            content.item.content_draft, models.fields.files.FieldFile
-        ):
-            if content.item.content_draft:
-                content.item.content_draft.delete(save=False)
+        media_tasks = []
+        if isinstance(content.item, MediaItem):
+            media_tasks.append(schedule_delete(content.item.content))
+            media_tasks.append(schedule_delete(content.item.content_draft))
+        if isinstance(content.item, Image):
+            media_tasks.extend(
+                schedule_delete(content.item.content, source["name"])
+                for source in content.item.renditions.get("sources", [])
+            )
 
         content.item.delete()
         content.delete()
+        enqueue(media_tasks)
 
         return redirect("section_content_list", section.id)
 
@@ -787,19 +897,29 @@ class SectionOrderView(
             )
 
         updated_sections = []
-        for section_id, order in self.request_json.items():
-            try:
-                uuid.UUID(section_id)
-            except ValueError:
-                return JsonResponse(
-                    {"error": _("Invalid section ID provided.")}, status=400
-                )
+        try:
+            for section_id, order in self.request_json.items():
+                try:
+                    uuid.UUID(section_id)
+                except ValueError:
+                    return JsonResponse(
+                        {"error": _("Invalid section ID provided.")}, status=400
+                    )
 
-            updated_count = Section.objects.filter(id=section_id).update(order=order)
+                updated_count = Section.objects.filter(id=section_id).update(
+                    order=order
+                )
 
-            if updated_count == 0:
-                return JsonResponse({"error": _("Section ID not found.")}, status=404)
-            updated_sections.append(section_id)
+                if updated_count == 0:
+                    return JsonResponse(
+                        {"error": _("Section ID not found.")}, status=404
+                    )
+                updated_sections.append(section_id)
+        finally:
+            # update() sends no post_save, so drop the cached pages here,
+            # also for the sections reordered before an error
+            for page in Page.objects.filter(sections__in=updated_sections).distinct():
+                invalidate_page(page)
 
         return self.render_json_response({"updated": updated_sections})
 
@@ -856,20 +976,31 @@ class ContentOrderView(
             )
 
         updated_contents = []
-        for content_id, order in self.request_json.items():
+        try:
+            for content_id, order in self.request_json.items():
+
+                try:
+                    uuid.UUID(content_id)
+                except ValueError:
+                    return JsonResponse(
+                        {"error": _("Invalid content ID provided.")}, status=400
+                    )
 
-            try:
-                uuid.UUID(content_id)
-            except ValueError:
-                return JsonResponse(
-                    {"error": _("Invalid content ID provided.")}, status=400
+                updated_count = Content.objects.filter(id=content_id).update(
+                    order=order
                 )
 
-            updated_count = Content.objects.filter(id=content_id).update(order=order)
-
-            if updated_count == 0:
-                return JsonResponse({"error": _("Content ID not found.")}, status=404)
-            updated_contents.append(content_id)
+                if updated_count == 0:
+                    return JsonResponse(
+                        {"error": _("Content ID not found.")}, status=404
+                    )
+                updated_contents.append(content_id)
+        finally:
+            # update() sends no post_save, so drop the cached pages here,
+            # also for the contents reordered before an error
+            pages = Page.objects.filter(sections__contents__in=updated_contents)
+            for page in pages.distinct():
+                invalidate_page(page)
 
         return self.render_json_response({"updated": updated_contents})
 
@@ -891,9 +1022,11 @@ def global_search(request):
                 search=SearchVector("title_en", "title_uk")
             ).filter(search=query)
 
-            sections = Section.objects.annotate(
-                search=SearchVector("title_en", "title_uk")
-            ).filter(search=query)
+            sections = (
+                Section.objects.select_related("page")
+                .annotate(search=SearchVector("title_en", "title_uk"))
+                .filter(search=query)
+            )
 
             text_content = Text.objects.annotate(
                 search=SearchVector(
@@ -967,6 +1100,7 @@ def global_search(request):
                 + list(donors)
                 + list(donations)
             )
+            prefetch_content_links(results)
 
     return render(
         request,
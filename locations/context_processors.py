@@ -1,10 +1,13 @@
+from django.utils.functional import SimpleLazyObject
+
 from .models import Division
 
 
 def divisions_context(request):
-    first_division = Division.objects.first()
+    # Only the staff navigation needs the division, public pages skip the query
+    first_division = SimpleLazyObject(Division.objects.first)
 
     return {
         "division": first_division,
-        "has_divisions": first_division is not None,
+        "has_divisions": lambda: bool(first_division),
     }
@@ -5,11 +5,12 @@ from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout
 from django import forms
 from django.core.exceptions import ValidationError
-from django.forms import inlineformset_factory, Select
+from django.forms import inlineformset_factory
 from django.forms.widgets import Textarea
 
 from locations.models import Branch, Phone, Email, Person, Division
 from locations.validators import format_uk_phone_number
+from locations.widgets import PersonAutocompleteSelect
 
 
 class DivisionForm(forms.ModelForm):
@@ -75,9 +76,15 @@ class BranchForm(forms.ModelForm):
             "other_details_uk",
         ]
         widgets = {
-            "parish_priest": Select(attrs={"class": "form-select py-3"}),
-            "branch_chair": Select(attrs={"class": "form-select py-3"}),
-            "branch_secretary": Select(attrs={"class": "form-select py-3"}),
+            "parish_priest": PersonAutocompleteSelect(
+                attrs={"class": "form-select py-3"}
+            ),
+            "branch_chair": PersonAutocompleteSelect(
+                attrs={"class": "form-select py-3"}
+            ),
+            "branch_secretary": PersonAutocompleteSelect(
+                attrs={"class": "form-select py-3"}
+            ),
             "other_details_en": Textarea(attrs={"class": "form-control", "rows": 4}),
             "other_details_uk": Textarea(attrs={"class": "form-control", "rows": 4}),
         }
@@ -95,11 +102,8 @@ class BranchForm(forms.ModelForm):
         self.fields["other_details_uk"].label = "Other Details (Ukrainian)"
 
         self.fields["parish_priest"].label = "Parish Priest"
-        self.fields["parish_priest"].queryset = Person.objects.all()
         self.fields["branch_chair"].label = "Branch Chair"
-        self.fields["branch_chair"].queryset = Person.objects.all()
         self.fields["branch_secretary"].label = "Branch Secretary"
-        self.fields["branch_secretary"].queryset = Person.objects.all()
 
         self.helper = FormHelper()
         self.helper.form_tag = False
@@ -208,6 +212,10 @@ class PhoneForm(forms.ModelForm):
             return format_uk_phone_number(number)
         return number
 
+    def save(self, commit=True):
+        self.instance.normalize()
+        return super().save(commit)
+
 
 class EmailForm(forms.ModelForm):
     class Meta:
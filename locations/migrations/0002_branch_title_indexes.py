@@ -0,0 +1,36 @@
+# Generated by Django 5.1.3 on 2026-10-19 00:24
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("locations", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="branch",
+            index=models.Index(
+                models.F("division"),
+                django.db.models.functions.comparison.Coalesce(
+                    "title_en", models.Value("")
+                ),
+                models.F("id"),
+                name="branch_division_title_en_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="branch",
+            index=models.Index(
+                models.F("division"),
+                django.db.models.functions.comparison.Coalesce(
+                    "title_uk", models.Value("")
+                ),
+                models.F("id"),
+                name="branch_division_title_uk_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+import logging
+
+from django.db import DatabaseError, migrations, transaction
+
+logger = logging.getLogger(__name__)
+
+NAME_FIELDS = ["last_name_en", "last_name_uk", "first_name_en", "first_name_uk"]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    Enables pg_trgm and indexes the person names for fuzzy search. Databases
+    without the extension keep working with prefix search only.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except DatabaseError:
+        logger.warning("pg_trgm is not available, person search will not be fuzzy")
+        return
+
+    for field in NAME_FIELDS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS person_{field}_trgm "
+            f"ON locations_person USING gin ({field} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for field in NAME_FIELDS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS person_{field}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("locations", "0002_branch_title_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
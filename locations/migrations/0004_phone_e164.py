@@ -0,0 +1,48 @@
+# Generated by Django 5.1.3 on 2026-10-19 00:34
+
+import phonenumbers
+from django.db import migrations, models
+
+
+def to_e164(value):
+    # Kept here rather than imported from locations.validators, so the
+    # migration does not change when the application code does.
+    try:
+        parsed_number = phonenumbers.parse(value, "GB")
+    except phonenumbers.NumberParseException:
+        return None
+    if not phonenumbers.is_valid_number(parsed_number):
+        return None
+    return phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.E164)
+
+
+def fill_e164(apps, schema_editor):
+    Phone = apps.get_model("locations", "Phone")
+
+    phones = []
+    for phone in (
+        Phone.objects.exclude(number__isnull=True).exclude(number="").iterator()
+    ):
+        phone.e164 = to_e164(phone.number)
+        if phone.e164 is None:
+            continue
+        phones.append(phone)
+    Phone.objects.bulk_update(phones, ["e164"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("locations", "0003_person_trigram_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="phone",
+            name="e164",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=16, null=True
+            ),
+        ),
+        migrations.RunPython(fill_e164, migrations.RunPython.noop),
+    ]
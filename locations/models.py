@@ -1,12 +1,22 @@
+import re
+from functools import lru_cache, reduce
+from operator import or_
 from uuid import uuid4
 
-from django.db import models
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections, models
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Coalesce, Greatest
 from django.urls import reverse
-from django.utils.translation import gettext_lazy as _
+from django.utils.translation import get_language, gettext_lazy as _
 from environs import Env
 
 from locations.fields import OrderField
-from locations.validators import validate_uk_phone_number, format_uk_phone_number
+from locations.validators import (
+    normalize_uk_phone_number,
+    normalize_uk_phone_numbers,
+    validate_uk_phone_number,
+)
 
 env = Env()
 env.read_env()
@@ -124,15 +134,78 @@ class Branch(models.Model):
     class Meta:
         verbose_name = _("Branch")
         verbose_name_plural = _("Branches")
+        # Serve the division branch table sorted by title straight from an index
+        indexes = [
+            models.Index(
+                F("division"),
+                Coalesce("title_en", Value("")),
+                F("id"),
+                name="branch_division_title_en_idx",
+            ),
+            models.Index(
+                F("division"),
+                Coalesce("title_uk", Value("")),
+                F("id"),
+                name="branch_division_title_uk_idx",
+            ),
+        ]
         permissions = [
             ("display", "Can display"),
             ("hide", "Can hide"),
         ]
 
+    # Fields that feed geocoding
+    location_fields = ["address_en", "address_uk", "postcode"]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_location()
+        return instance
+
     def save(self, *args, **kwargs):
         if self.address:
             self.address = self.format_address(self.address)
         super().save(*args, **kwargs)
+        self.remember_location()
+
+    def remember_location(self):
+        """
+        Keeps the geocoded fields as loaded so a save can tell whether they
+        changed without fetching the row again.
+        """
+        if all(field in self.__dict__ for field in self.location_fields):
+            self._loaded_location = [
+                self.__dict__[field] for field in self.location_fields
+            ]
+
+    def location_changed(self):
+        loaded = getattr(self, "_loaded_location", None)
+        if loaded is None:
+            loaded = (
+                Branch.objects.filter(pk=self.pk)
+                .values_list(*self.location_fields)
+                .first()
+            )
+            if loaded is None:
+                return True
+        current = [getattr(self, field) for field in self.location_fields]
+        return self.normalize_location(loaded) != self.normalize_location(current)
+
+    @classmethod
+    def normalize_location(cls, values):
+        """
+        Formats the geocoded fields the way they are stored, so a location
+        that only differs in case or spacing is not geocoded again.
+        """
+        normalized = []
+        for field, value in zip(cls.location_fields, values):
+            if value and field == "postcode":
+                value = " ".join(value.upper().split())
+            elif value:
+                value = cls.format_address(value)
+            normalized.append(value)
+        return normalized
 
     @staticmethod
     def format_address(address):
@@ -163,6 +236,70 @@ class Branch(models.Model):
         )
 
 
+@lru_cache(maxsize=None)
+def has_trigram_support(using="default"):
+    """
+    Whether the pg_trgm extension is installed on the database.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+class PersonManager(models.Manager):
+    name_fields = ["last_name_en", "last_name_uk", "first_name_en", "first_name_uk"]
+
+    def search(self, query, limit=20):
+        """
+        Returns up to ``limit`` people whose names start with every word of
+        the query, followed by fuzzy trigram matches when pg_trgm is
+        available.
+
+        Both conditions are written so the trigram GIN indexes can serve
+        them: prefixes as case-insensitive regexes (``istartswith`` compares
+        ``UPPER()`` of the column) and fuzzy matches with the ``%`` operator,
+        which applies ``pg_trgm.similarity_threshold`` (0.3 by default).
+        """
+        words = query.split()
+        if not words:
+            return self.none()
+
+        prefix = Q()
+        for word in words:
+            pattern = f"^{re.escape(word)}"
+            prefix &= reduce(
+                or_,
+                (Q(**{f"{field}__iregex": pattern}) for field in self.name_fields),
+            )
+
+        sort_field = "last_name_uk" if get_language() == "uk" else "last_name_en"
+        queryset = self.annotate(
+            is_prefix=Case(When(prefix, then=Value(True)), default=Value(False))
+        )
+        if has_trigram_support(self.db):
+            similar = reduce(
+                or_,
+                (
+                    Q(**{f"{field}__trigram_similar": query})
+                    for field in self.name_fields
+                ),
+            )
+            queryset = queryset.filter(prefix | similar).annotate(
+                similarity=Greatest(
+                    *(TrigramSimilarity(field, query) for field in self.name_fields)
+                )
+            )
+            ordering = ["-is_prefix", "-similarity", sort_field, "id"]
+        else:
+            queryset = queryset.filter(prefix)
+            ordering = [sort_field, "id"]
+
+        return queryset.order_by(*ordering)[:limit]
+
+
 class Person(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
     first_name = models.CharField(
@@ -170,6 +307,8 @@ class Person(models.Model):
     )
     last_name = models.CharField(_("Last Name"), max_length=100, blank=True, null=True)
 
+    objects = PersonManager()
+
     class Meta:
         verbose_name = _("Person")
         verbose_name_plural = _("People")
@@ -191,6 +330,30 @@ class Person(models.Model):
         )
 
 
+class PhoneManager(models.Manager):
+    def add_numbers(self, branch, values):
+        """
+        Adds the valid numbers among ``values`` to a branch in one insert,
+        skipping numbers the branch already has. Returns the invalid values
+        with their errors.
+        """
+        numbers, errors = normalize_uk_phone_numbers(values)
+        existing = set(
+            self.filter(
+                branch=branch, e164__in=[e164 for _, e164 in numbers.values()]
+            ).values_list("e164", flat=True)
+        )
+
+        phones = {}
+        for number, e164 in numbers.values():
+            if e164 not in existing:
+                phones.setdefault(
+                    e164, self.model(branch=branch, number=number, e164=e164)
+                )
+        self.bulk_create(phones.values())
+        return errors
+
+
 class Phone(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
     branch = models.ForeignKey(
@@ -206,16 +369,27 @@ class Phone(models.Model):
         null=True,
         validators=[validate_uk_phone_number],
     )
+    # Canonical form used for lookups and deduplication
+    e164 = models.CharField(
+        max_length=16, blank=True, null=True, editable=False, db_index=True
+    )
+
+    objects = PhoneManager()
 
     class Meta:
         verbose_name = _("Phone")
         verbose_name_plural = _("Phones")
 
     def save(self, *args, **kwargs):
-        if self.number:
-            self.number = format_uk_phone_number(self.number)
+        self.normalize()
         super().save(*args, **kwargs)
 
+    def normalize(self):
+        if self.number:
+            self.number, self.e164 = normalize_uk_phone_number(self.number)
+        else:
+            self.e164 = None
+
     def __str__(self):
         return self.number
 
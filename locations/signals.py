@@ -1,9 +1,12 @@
-from django.db.models.signals import pre_save
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 
 from django_project.geocode import geocode
 from django_project.util import unique_slug_generator
-from .models import Division, Branch
+from pages.cache import get_division_paths, invalidate_all, invalidate_paths
+from .models import Division, Branch, Email, Person, Phone
 
 
 @receiver(pre_save, sender=Division)
@@ -25,21 +28,60 @@ def update_geocoding(instance):
         instance.place_id = place_id
 
 
+def needs_geocoding(instance):
+    if instance._state.adding:
+        return not instance.place_id
+    return not instance.place_id or instance.location_changed()
+
+
+def geocode_branch(instance):
+    """
+    Geocodes a branch ahead of saving it. Views saving a branch inside a
+    transaction call this first, so no row lock is held during the request
+    to the geocoding API, and the save itself does not geocode again.
+    """
+    if needs_geocoding(instance):
+        update_geocoding(instance)
+    instance._geocoded = True
+
+
 @receiver(pre_save, sender=Branch)
 def branch_pre_save_receiver(sender, instance, *args, **kwargs):
     if not instance.slug:
         instance.slug = unique_slug_generator(instance)
 
-    if instance.pk:
-        try:
-            current_instance = Branch.objects.get(pk=instance.pk)
-            address_changed = current_instance.address != instance.address
-            postcode_changed = current_instance.postcode != instance.postcode
-
-            if not instance.place_id or address_changed or postcode_changed:
-                update_geocoding(instance)
-        except Branch.DoesNotExist:
-            update_geocoding(instance)
-    else:
-        if not instance.place_id:
-            update_geocoding(instance)
+    if not instance.__dict__.pop("_geocoded", False) and needs_geocoding(instance):
+        update_geocoding(instance)
+
+
+def invalidate_divisions(divisions):
+    paths = [path for division in divisions for path in get_division_paths(division)]
+    transaction.on_commit(lambda: invalidate_paths(paths))
+
+
+@receiver([post_save, post_delete], sender=Division)
+def invalidate_division(sender, instance, **kwargs):
+    # Divisions are listed in the navigation of every page
+    transaction.on_commit(invalidate_all)
+
+
+@receiver([post_save, post_delete], sender=Branch)
+def invalidate_branch_division(sender, instance, **kwargs):
+    invalidate_divisions(Division.objects.filter(pk=instance.division_id))
+
+
+@receiver([post_save, post_delete], sender=Phone)
+@receiver([post_save, post_delete], sender=Email)
+def invalidate_contact_division(sender, instance, **kwargs):
+    invalidate_divisions(Division.objects.filter(branches=instance.branch_id))
+
+
+@receiver([post_save, pre_delete], sender=Person)
+def invalidate_person_divisions(sender, instance, **kwargs):
+    invalidate_divisions(
+        Division.objects.filter(
+            Q(branches__parish_priest=instance.pk)
+            | Q(branches__branch_chair=instance.pk)
+            | Q(branches__branch_secretary=instance.pk)
+        ).distinct()
+    )
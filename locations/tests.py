@@ -8,13 +8,29 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
+from django.db import DatabaseError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.translation import activate, get_language
 
 from locations.forms import BranchForm, PersonForm, EmailForm
-from locations.models import Phone, Branch, Division, Person
-from locations.validators import validate_uk_phone_number, format_uk_phone_number
+from locations.models import (
+    Phone,
+    Branch,
+    Division,
+    Email,
+    Person,
+    has_trigram_support,
+)
+from locations.signals import geocode_branch
+from locations.validators import (
+    format_uk_phone_number,
+    normalize_uk_phone_number,
+    normalize_uk_phone_numbers,
+    validate_uk_phone_number,
+)
+from phonenumbers import parse
 
 
 User = get_user_model()
@@ -55,6 +71,95 @@ class BranchFormTests(TestCase):
         self.assertEqual(cleaned_data["address_en"], "123 Example Street")
         self.assertEqual(cleaned_data["postcode"], "SW1A 1AA")
 
+    def test_person_selects_render_only_chosen_person(self):
+        chosen = Person.objects.create(first_name_en="Ivan", last_name_en="Franko")
+        Person.objects.create(first_name_en="Lesya", last_name_en="Ukrainka")
+        branch = Branch(parish_priest=chosen)
+
+        html = BranchForm(instance=branch)["parish_priest"].as_widget()
+
+        self.assertIn("Ivan Franko", html)
+        self.assertNotIn("Ukrainka", html)
+        self.assertIn(
+            f'data-autocomplete-url="{reverse("locations:person_search")}"', html
+        )
+        with self.assertNumQueries(0):
+            BranchForm()["branch_chair"].as_widget()
+
+    def test_person_select_accepts_searched_person(self):
+        person = Person.objects.create(first_name_en="Ivan", last_name_en="Franko")
+        form = BranchForm(data={"postcode": "SW1A 1AA", "branch_chair": str(person.pk)})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data["branch_chair"], person)
+
+
+class PersonSearchViewTests(TestCase):
+    def setUp(self):
+        activate("en")
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.user.user_permissions.add(Permission.objects.get(codename="view_person"))
+        self.url = reverse("locations:person_search")
+
+        self.franko = Person.objects.create(
+            first_name_en="Ivan",
+            last_name_en="Franko",
+            first_name_uk="Іван",
+            last_name_uk="Франко",
+        )
+        self.ukrainka = Person.objects.create(
+            first_name_en="Lesya",
+            last_name_en="Ukrainka",
+            first_name_uk="Леся",
+            last_name_uk="Українка",
+        )
+
+        self.logger = logging.getLogger("django.request")
+        self.logger.setLevel(logging.CRITICAL)
+
+    def tearDown(self):
+        self.logger.setLevel(logging.DEBUG)
+
+    def search(self, query):
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(self.url, {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def test_prefix_match_on_either_language(self):
+        self.assertEqual(
+            self.search("fra"), [{"id": str(self.franko.id), "text": "Ivan Franko"}]
+        )
+        self.assertEqual(
+            [person["id"] for person in self.search("Укр")], [str(self.ukrainka.id)]
+        )
+
+    def test_every_word_must_match(self):
+        self.assertEqual(len(self.search("ivan fr")), 1)
+        self.assertEqual(self.search("ivan uk"), [])
+
+    def test_empty_query(self):
+        self.assertEqual(self.search("  "), [])
+
+    def test_misspelled_query_matches_when_trigrams_are_available(self):
+        if not has_trigram_support():
+            self.skipTest("pg_trgm is not installed")
+        self.assertEqual(
+            [person["id"] for person in self.search("Franka")], [str(self.franko.id)]
+        )
+
+    def test_results_are_limited(self):
+        Person.objects.bulk_create(
+            Person(first_name_en="Test", last_name_en=f"Fedak{number}")
+            for number in range(30)
+        )
+        self.assertEqual(len(self.search("fe")), 20)
+
+    def test_permission_required(self):
+        User.objects.create_user(username="other", password="password")
+        self.client.login(username="other", password="password")
+        response = self.client.get(self.url, {"q": "fra"})
+        self.assertEqual(response.status_code, 403)
+
 
 class PersonFormTests(TestCase):
     def test_person_form_sanitization(self):
@@ -112,6 +217,45 @@ class UKPhoneNumberTests(TestCase):
         phone.save()
 
         self.assertEqual(phone.number, "+44 7911 123456")
+        self.assertEqual(phone.e164, "+447911123456")
+
+    def test_normalization_is_cached(self):
+        normalize_uk_phone_number.cache_clear()
+        with patch(
+            "locations.validators.phonenumbers.parse", wraps=parse
+        ) as mock_parse:
+            format_uk_phone_number("020 7946 0123")
+            format_uk_phone_number("020 7946 0123")
+        self.assertEqual(mock_parse.call_count, 1)
+
+    def test_bulk_normalization(self):
+        numbers, errors = normalize_uk_phone_numbers(
+            ["07911 123456", "+44 7911 123456", "123456", "07911 123456"]
+        )
+        self.assertEqual(
+            numbers,
+            {
+                "07911 123456": ("+44 7911 123456", "+447911123456"),
+                "+44 7911 123456": ("+44 7911 123456", "+447911123456"),
+            },
+        )
+        self.assertEqual(list(errors), ["123456"])
+
+    @patch("locations.signals.update_geocoding")
+    def test_add_numbers_deduplicates_by_e164(self, mock_update_geocoding):
+        division = Division.objects.create(title="Test Division", slug="test-division")
+        branch = Branch.objects.create(title="Test Branch", division=division)
+        Phone.objects.create(branch=branch, number="07911 123456")
+
+        errors = Phone.objects.add_numbers(
+            branch, ["+447911123456", "020 7946 0958", "02079460958", "123"]
+        )
+
+        self.assertEqual(list(errors), ["123"])
+        self.assertEqual(
+            sorted(branch.phones.values_list("e164", flat=True)),
+            ["+442079460958", "+447911123456"],
+        )
 
 
 class EmailFormTests(TestCase):
@@ -406,6 +550,119 @@ class DivisionListViewTests(TestCase):
         self.assertEqual(branches[0], self.branch1)
         self.assertEqual(branches[1], self.branch2)
 
+    def test_sorting_by_parish_priest_last_name(self):
+        Branch.objects.filter(pk=self.branch1.pk).update(
+            parish_priest=Person.objects.create(
+                first_name_en="Ivan", last_name_en="Zinchenko"
+            )
+        )
+        Branch.objects.filter(pk=self.branch2.pk).update(
+            parish_priest=Person.objects.create(
+                first_name_en="Petro", last_name_en="Antonenko"
+            )
+        )
+
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(
+            reverse("locations:division_list", kwargs={"slug": self.division1.slug}),
+            {"sort": "parish_priest"},
+        )
+        self.assertEqual(
+            list(response.context["branches"]), [self.branch2, self.branch1]
+        )
+
+    def test_branches_are_paginated_by_cursor(self):
+        Branch.objects.bulk_create(
+            Branch(
+                division=self.division1,
+                title_en=f"Branch Z{number:02d}",
+                slug=f"z-{number}",
+            )
+            for number in range(50)
+        )
+        url = reverse("locations:division_list", kwargs={"slug": self.division1.slug})
+
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(url, {"sort": "title", "direction": "desc"})
+        branches = list(response.context["branches"])
+        self.assertEqual(len(branches), 50)
+        self.assertEqual(branches[0].title_en, "Branch Z49")
+
+        response = self.client.get(f"{url}?{response.context['next_page_query']}")
+        self.assertEqual(
+            list(response.context["branches"]), [self.branch2, self.branch1]
+        )
+        self.assertIn("previous_page_query", response.context)
+
+    def test_branch_pager_is_rendered(self):
+        Branch.objects.bulk_create(
+            Branch(
+                division=self.division1,
+                title_en=f"Branch Z{number:02d}",
+                slug=f"z-{number}",
+            )
+            for number in range(50)
+        )
+        url = reverse("locations:division_list", kwargs={"slug": self.division1.slug})
+
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(url)
+
+        soup = BeautifulSoup(response.content, "html.parser")
+        links = soup.select("[data-branch-pagination] .page-item a")
+        self.assertEqual(len(links), 2)
+        self.assertEqual(links[1]["href"], f"?{response.context['next_page_query']}")
+        self.assertEqual(links[0]["href"], "#")
+
+    def test_branch_pager_is_hidden_on_a_single_page(self):
+        url = reverse("locations:division_list", kwargs={"slug": self.division1.slug})
+
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(url)
+
+        soup = BeautifulSoup(response.content, "html.parser")
+        self.assertEqual(soup.select("[data-branch-pagination] .page-item"), [])
+
+    def test_branch_people_are_selected_with_branches(self):
+        for branch in (self.branch1, self.branch2):
+            Branch.objects.filter(pk=branch.pk).update(
+                parish_priest=Person.objects.create(last_name_en=branch.title_en)
+            )
+        url = reverse("locations:division_list", kwargs={"slug": self.division1.slug})
+
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(url)
+        with self.assertNumQueries(0):
+            for branch in response.context["branches"]:
+                branch.parish_priest.last_name
+                branch.division.slug
+
+    def test_json_mode(self):
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(
+            reverse("locations:division_list", kwargs={"slug": self.division1.slug}),
+            {"sort": "title", "direction": "desc", "format": "json"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            [branch["title"] for branch in data["results"]], ["Branch B", "Branch A"]
+        )
+        self.assertEqual(data["sort"], "title")
+        self.assertEqual(data["direction"], "desc")
+        self.assertIsNone(data["next_page_query"])
+        self.assertEqual(
+            data["results"][0]["url"],
+            reverse(
+                "locations:division_branch_update",
+                kwargs={
+                    "division_slug": self.division1.slug,
+                    "branch_slug": self.branch2.slug,
+                },
+            ),
+        )
+
     # -------------------------
     # 5. Edge Cases
     # -------------------------
@@ -1114,6 +1371,163 @@ class BranchCreateUpdateViewTests(TestCase):
         # Ensure 'is_religious' context is True
         self.assertTrue(response.context["is_religious"])
 
+    @patch("locations.signals.update_geocoding")
+    def test_post_update_writes_phones_in_bulk(self, mock_update_geocoding):
+        kept = Phone.objects.create(branch=self.branch, number="020 7946 0000")
+        removed = Phone.objects.create(branch=self.branch, number="020 7946 0001")
+        data = {
+            "title_en": "Test Branch",
+            "postcode": "AB12 3CD",
+            "phones-TOTAL_FORMS": "3",
+            "phones-INITIAL_FORMS": "2",
+            "phones-0-id": str(kept.pk),
+            "phones-0-number": "020 7946 0002",
+            "phones-1-id": str(removed.pk),
+            "phones-1-number": "020 7946 0001",
+            "phones-1-DELETE": "on",
+            "phones-2-number": "020 7946 0003",
+            "emails-TOTAL_FORMS": "1",
+            "emails-INITIAL_FORMS": "0",
+            "emails-0-email": "Branch@Example.com",
+        }
+
+        response = self.client.post(self.update_url, data)
+
+        self.assertRedirects(response, self.redirect_url)
+        self.assertEqual(
+            sorted(self.branch.phones.values_list("number", flat=True)),
+            sorted(
+                [
+                    format_uk_phone_number("020 7946 0002"),
+                    format_uk_phone_number("020 7946 0003"),
+                ]
+            ),
+        )
+        self.assertFalse(Phone.objects.filter(pk=removed.pk).exists())
+        self.assertEqual(
+            sorted(self.branch.phones.values_list("e164", flat=True)),
+            ["+442079460002", "+442079460003"],
+        )
+        self.assertEqual(
+            list(self.branch.emails.values_list("email", flat=True)),
+            ["branch@example.com"],
+        )
+
+    @patch("locations.signals.update_geocoding")
+    def test_post_geocodes_outside_the_transaction(self, mock_update_geocoding):
+        depth = len(connection.savepoint_ids)
+        depths = []
+        mock_update_geocoding.side_effect = lambda branch: depths.append(
+            len(connection.savepoint_ids)
+        )
+        data = {
+            "title_en": "Test Branch",
+            "postcode": "AB13 4CD",
+            "phones-TOTAL_FORMS": "0",
+            "phones-INITIAL_FORMS": "0",
+            "emails-TOTAL_FORMS": "0",
+            "emails-INITIAL_FORMS": "0",
+        }
+
+        response = self.client.post(self.update_url, data)
+
+        self.assertRedirects(response, self.redirect_url)
+        self.assertEqual(depths, [depth])
+
+    @patch("locations.signals.update_geocoding")
+    def test_post_is_atomic(self, mock_update_geocoding):
+        data = {
+            "title_en": "Renamed Branch",
+            "postcode": "AB12 3CD",
+            "phones-TOTAL_FORMS": "1",
+            "phones-INITIAL_FORMS": "0",
+            "phones-0-number": "020 7946 0003",
+            "emails-TOTAL_FORMS": "1",
+            "emails-INITIAL_FORMS": "0",
+            "emails-0-email": "branch@example.com",
+        }
+
+        with patch.object(
+            Email.objects, "bulk_create", side_effect=DatabaseError
+        ), self.assertRaises(DatabaseError):
+            self.client.post(self.update_url, data)
+
+        self.branch.refresh_from_db()
+        self.assertEqual(self.branch.title_en, "Test Branch")
+        self.assertFalse(self.branch.phones.exists())
+
+
+class BranchGeocodingTests(TestCase):
+    @patch("locations.signals.update_geocoding")
+    def setUp(self, mock_update_geocoding):
+        self.division = Division.objects.create(title_en="Test Division")
+        self.branch = Branch.objects.create(
+            division=self.division,
+            title_en="Test Branch",
+            address_en="1 Test Street",
+            postcode="AB12 3CD",
+            place_id="place",
+        )
+
+    @patch("locations.signals.update_geocoding")
+    def test_unchanged_location_is_not_geocoded(self, mock_update_geocoding):
+        branch = Branch.objects.get(pk=self.branch.pk)
+        branch.title_en = "Renamed"
+
+        with CaptureQueriesContext(connection) as queries:
+            branch.save()
+        mock_update_geocoding.assert_not_called()
+        self.assertFalse(
+            [
+                query
+                for query in queries
+                if query["sql"].startswith('SELECT "locations_branch"')
+            ]
+        )
+
+    @patch("locations.signals.update_geocoding")
+    def test_changed_location_is_geocoded(self, mock_update_geocoding):
+        branch = Branch.objects.get(pk=self.branch.pk)
+        branch.postcode = "AB13 4CD"
+        branch.save()
+        mock_update_geocoding.assert_called_once_with(branch)
+
+        mock_update_geocoding.reset_mock()
+        branch.save()
+        mock_update_geocoding.assert_not_called()
+
+    @patch("locations.signals.update_geocoding")
+    def test_deferred_location_is_compared_with_database(self, mock_update_geocoding):
+        branch = Branch.objects.only("id", "slug", "place_id", "division").get(
+            pk=self.branch.pk
+        )
+        branch.save(update_fields=["slug"])
+        mock_update_geocoding.assert_not_called()
+
+    @patch("locations.signals.update_geocoding")
+    def test_reformatted_location_is_not_geocoded(self, mock_update_geocoding):
+        branch = Branch.objects.get(pk=self.branch.pk)
+        branch.address_en = "  1 test   STREET "
+        branch.postcode = "ab12 3cd"
+
+        geocode_branch(branch)
+        branch.save()
+        branch.save()
+        mock_update_geocoding.assert_not_called()
+
+    @patch("locations.signals.update_geocoding")
+    def test_geocoded_branch_is_not_geocoded_on_save(self, mock_update_geocoding):
+        branch = Branch.objects.get(pk=self.branch.pk)
+        branch.postcode = "AB13 4CD"
+
+        geocode_branch(branch)
+        branch.save()
+        mock_update_geocoding.assert_called_once_with(branch)
+
+        branch.postcode = "AB14 5CD"
+        branch.save()
+        self.assertEqual(mock_update_geocoding.call_count, 2)
+
 
 class BranchDeleteViewTests(TestCase):
     @patch("locations.signals.update_geocoding")
@@ -1746,6 +2160,47 @@ class PersonListViewTests(TestCase):
         self.assertEqual(len(persons), 0)
         self.assertEqual(len(grouped_persons), 0)
 
+    def test_letter_index(self):
+        activate("en")
+        Person.objects.create(first_name_en="Dan", last_name_en="Dale")
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.context["letters"], [("B", 1), ("D", 2), ("S", 1)])
+
+    def test_filter_by_letter(self):
+        activate("en")
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(self.url, {"letter": "d"})
+
+        self.assertEqual(list(response.context["persons"]), [self.person2])
+        self.assertEqual(list(response.context["grouped_persons"]), ["D"])
+
+    def test_person_without_last_name(self):
+        activate("en")
+        person = Person.objects.create(first_name_en="Anon", last_name_en="")
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["grouped_persons"]["#"], [person])
+
+    def test_pagination(self):
+        activate("en")
+        Person.objects.bulk_create(
+            Person(first_name_en="Test", last_name_en=f"Zed{number:02d}")
+            for number in range(50)
+        )
+        self.client.login(username="testuser", password="password")
+        response = self.client.get(self.url)
+
+        self.assertEqual(len(response.context["persons"]), 50)
+        response = self.client.get(f"{self.url}?{response.context['next_page_query']}")
+        self.assertEqual(
+            [person.last_name_en for person in response.context["persons"]],
+            ["Zed47", "Zed48", "Zed49"],
+        )
+
 
 class PersonCreateViewTests(TestCase):
     def setUp(self):
@@ -6,6 +6,7 @@ app_name = "locations"
 
 urlpatterns = [
     path("person/", views.PersonListView.as_view(), name="person_list"),
+    path("person/search/", views.PersonSearchView.as_view(), name="person_search"),
     path("person/add/", views.PersonCreateView.as_view(), name="person_create"),
     path(
         "person/<uuid:pk>/edit/", views.PersonUpdateView.as_view(), name="person_edit"
@@ -1,19 +1,47 @@
+from functools import lru_cache
+
 import phonenumbers
 from django.core.exceptions import ValidationError
 
 
-def validate_uk_phone_number(value):
+@lru_cache(maxsize=8192)
+def normalize_uk_phone_number(value):
+    """
+    Returns the international and E.164 forms of a UK phone number. Results
+    are cached on the raw string, so each distinct input is parsed once.
+    """
     try:
         parsed_number = phonenumbers.parse(value, "GB")
-        if not phonenumbers.is_valid_number(parsed_number):
-            raise ValidationError(f"'{value}' is not a valid UK phone number.")
-        return parsed_number
     except phonenumbers.NumberParseException as e:
         raise ValidationError(f"'{value}' is not a valid phone number: {str(e)}")
+    if not phonenumbers.is_valid_number(parsed_number):
+        raise ValidationError(f"'{value}' is not a valid UK phone number.")
+    return (
+        phonenumbers.format_number(
+            parsed_number, phonenumbers.PhoneNumberFormat.INTERNATIONAL
+        ),
+        phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.E164),
+    )
+
+
+def normalize_uk_phone_numbers(values):
+    """
+    Normalizes a batch of raw numbers, parsing each distinct value once.
+    Returns ``{value: (international, e164)}`` for the valid numbers and
+    ``{value: error}`` for the rest.
+    """
+    numbers, errors = {}, {}
+    for value in dict.fromkeys(values):
+        try:
+            numbers[value] = normalize_uk_phone_number(value)
+        except ValidationError as e:
+            errors[value] = e.messages[0]
+    return numbers, errors
+
+
+def validate_uk_phone_number(value):
+    normalize_uk_phone_number(value)
 
 
 def format_uk_phone_number(value):
-    parsed_number = validate_uk_phone_number(value)
-    return phonenumbers.format_number(
-        parsed_number, phonenumbers.PhoneNumberFormat.INTERNATIONAL
-    )
+    return normalize_uk_phone_number(value)[0]
@@ -4,7 +4,7 @@ from itertools import groupby
 
 from braces.views import CsrfExemptMixin, JsonRequestResponseMixin
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
-from django.core.exceptions import FieldError, ValidationError
+from django.core.exceptions import ValidationError
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
@@ -15,9 +15,15 @@ from django.views.generic import ListView, View
 from django.views.generic.base import TemplateResponseMixin
 from django.views.generic.edit import CreateView, UpdateView, DeleteView, ModelFormMixin
 from django.db import transaction
+from django.db.models import Count, Value
+from django.db.models.functions import Coalesce, Left, Upper
 
+from hub.cache import invalidate_nav
+from hub.pagination import KeysetPaginationMixin, KeysetPaginator, get_page_queries
+from pages.cache import invalidate_all
 from .forms import BranchForm, PersonForm, PhoneFormSet, EmailFormSet, DivisionForm
 from .models import Branch, Division, Person
+from .signals import geocode_branch
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +59,16 @@ class DivisionListView(DivisionMixin, ListView):
     login_url = "account_login"
     redirect_field_name = "next"
     permission_required = "locations.view_division"
+    branches_per_page = 50
+    # Branch table columns and the fields they sort by
+    branch_sort_fields = {
+        "title": "title_{language}",
+        "parish_priest": "parish_priest__last_name_{language}",
+        "branch_chair": "branch_chair__last_name_{language}",
+        "postcode": "postcode",
+        "address": "address_{language}",
+        "status": "status",
+    }
 
     # def get_context_data(self, **kwargs):
     #     context = super().get_context_data(**kwargs)
@@ -108,26 +124,90 @@ class DivisionListView(DivisionMixin, ListView):
         )
         context["is_religious"] = is_religious
 
-        current_language = translation.get_language() or "en"
+        sort_column, sort_direction, ordering = self.get_branch_ordering()
+        paginator = KeysetPaginator(
+            self.get_branch_queryset(current_division, sort_column),
+            ordering,
+            self.branches_per_page,
+        )
+        branch_page = paginator.get_page(
+            after=self.request.GET.get("after"),
+            before=self.request.GET.get("before"),
+        )
+
+        context["branches"] = branch_page
+        context["branch_page"] = branch_page
+        context.update(get_page_queries(self.request, branch_page))
+        context["current_base_sort"] = sort_column
+        context["current_direction"] = sort_direction
+
+        return context
 
+    def get_branch_ordering(self):
         sort_column = self.request.GET.get("sort", "title")
+        if sort_column not in self.branch_sort_fields:
+            sort_column = "title"
         sort_direction = self.request.GET.get("direction", "asc")
+        if sort_direction != "desc":
+            sort_direction = "asc"
 
-        if sort_column == "title":
-            sort_column = f"title_{current_language}"
+        prefix = "-" if sort_direction == "desc" else ""
+        return sort_column, sort_direction, [f"{prefix}sort_key", f"{prefix}id"]
 
-        sort_order = f"-{sort_column}" if sort_direction == "desc" else sort_column
+    def get_branch_queryset(self, division, sort_column):
+        language = "uk" if translation.get_language() == "uk" else "en"
+        sort_field = self.branch_sort_fields[sort_column].format(language=language)
+        return division.branches.select_related(
+            "division", "parish_priest", "branch_chair"
+        ).annotate(sort_key=Coalesce(sort_field, Value("")))
 
-        try:
-            branches = current_division.branches.all().order_by(sort_order)
-        except FieldError:
-            branches = current_division.branches.all().order_by("title")
+    def render_to_response(self, context, **response_kwargs):
+        if self.request.GET.get("format") == "json" and "branch_page" in context:
+            return JsonResponse(self.get_branch_data(context))
+        return super().render_to_response(context, **response_kwargs)
 
-        context["branches"] = branches
-        context["current_base_sort"] = self.request.GET.get("sort", "title")
-        context["current_direction"] = sort_direction
-
-        return context
+    @staticmethod
+    def get_branch_data(context):
+        """
+        Serializes the current page of branches for the admin table.
+        """
+        branch_page = context["branch_page"]
+        role = "parish_priest" if context["is_religious"] else "branch_chair"
+        results = []
+        for branch in branch_page:
+            person = getattr(branch, role)
+            kwargs = {"division_slug": branch.division.slug, "branch_slug": branch.slug}
+            displayed = branch.status == Branch.Status.DISPLAY
+            results.append(
+                {
+                    "id": str(branch.id),
+                    "title": branch.title or "",
+                    "url": reverse("locations:division_branch_update", kwargs=kwargs),
+                    "person": (
+                        f"{person.first_name or ''} {person.last_name or ''}".strip()
+                        if person
+                        else ""
+                    ),
+                    "postcode": branch.postcode or "",
+                    "address": branch.address or "",
+                    "status": branch.status,
+                    "status_url": reverse(
+                        (
+                            "locations:division_branch_hide"
+                            if displayed
+                            else "locations:division_branch_display"
+                        ),
+                        kwargs=kwargs,
+                    ),
+                }
+            )
+        return {
+            "results": results,
+            "sort": context["current_base_sort"],
+            "direction": context["current_direction"],
+            "next_page_query": context.get("next_page_query"),
+            "previous_page_query": context.get("previous_page_query"),
+        }
 
 
 # class DivisionCreateView(DivisionMixin, TrackUserMixin, CreateView):
@@ -225,6 +305,11 @@ class DivisionOrderView(
 
             # Validate that each key is a valid UUID
             with transaction.atomic():  # Ensure atomicity
+                # update() sends no post_save. Divisions are listed on every
+                # page and in the navigation, so any committed change drops
+                # all cached pages and menus.
+                transaction.on_commit(invalidate_all)
+                transaction.on_commit(invalidate_nav)
                 for division_id, order in data.items():
                     try:
                         # Validate UUID
@@ -302,46 +387,21 @@ class BranchCreateUpdateView(DivisionMixin, TemplateResponseMixin, View):
         phone_formset = PhoneFormSet(request.POST, instance=self.branch)
         email_formset = EmailFormSet(request.POST, instance=self.branch)
 
-        is_valid = True
-
-        if not branch_form.is_valid():
-            is_valid = False
-            print("Branch form validation failed:")
-            print(branch_form.errors)
-
-        if not phone_formset.is_valid():
-            is_valid = False
-            print("Phone formset validation failed:")
-            print(phone_formset.errors)
-
-        if not email_formset.is_valid():
-            is_valid = False
-            print("Email formset validation failed:")
-            print(email_formset.errors)
-
-        # if is_valid:
-        #     branch = branch_form.save(commit=False)
-        #     branch.division = self.division
-        #
-        #     branch.save()
-        #     phone_formset.save()
-        #     email_formset.save()
-        #
-        #     return redirect("locations:division_list", slug=self.division.slug)
+        # Validate every form so all errors are shown at once
+        is_valid = all(
+            [branch_form.is_valid(), phone_formset.is_valid(), email_formset.is_valid()]
+        )
 
         if is_valid:
-            # Save the branch first
-            branch = branch_form.save(commit=False)
-            branch.division = self.division
-            branch.save()  # Save the branch before saving related formsets
+            geocode_branch(branch_form.instance)
+            with transaction.atomic():
+                branch = branch_form.save(commit=False)
+                branch.division = self.division
+                branch.save()
+                branch_form.save_m2m()
 
-            # Assign branch instance to formsets
-            phone_formset.instance = branch
-            email_formset.instance = branch
-
-            # Save formsets
-            phone_formset.save()
-            email_formset.save()
+                self.save_formset(phone_formset)
+                self.save_formset(email_formset)
 
             return redirect("locations:division_list", slug=self.division.slug)
 
@@ -355,6 +415,28 @@ class BranchCreateUpdateView(DivisionMixin, TemplateResponseMixin, View):
             }
         )
 
+    @staticmethod
+    def save_formset(formset):
+        """
+        Writes the formset's deletions, additions and changes with one bulk
+        statement each.
+        """
+        formset.save(commit=False)
+        manager = formset.model.objects
+
+        if formset.deleted_objects:
+            manager.filter(pk__in=[obj.pk for obj in formset.deleted_objects]).delete()
+        if formset.new_objects:
+            manager.bulk_create(formset.new_objects)
+        if formset.changed_objects:
+            # Every column, as saving a form can also update derived fields
+            fields = [
+                field.name
+                for field in formset.model._meta.concrete_fields
+                if not field.primary_key
+            ]
+            manager.bulk_update([obj for obj, _ in formset.changed_objects], fields)
+
 
 class BranchDeleteView(DivisionMixin, DeleteView):
     model = Branch
@@ -406,41 +488,81 @@ class BranchHideView(DivisionMixin, View):
         return redirect("locations:division_list", slug=division_slug)
 
 
-class PersonListView(DivisionMixin, ListView):
+class PersonListView(KeysetPaginationMixin, DivisionMixin, ListView):
     model = Person
     context_object_name = "persons"
     template_name = "locations/manage/person/list.html"
     login_url = "account_login"
     redirect_field_name = "next"
     permission_required = "locations.view_person"
+    paginate_by = 50
+    keyset_ordering = ["sort_name", "id"]
+    # Index entry for people without a last name in the current language
+    blank_initial = "#"
 
-    def get_queryset(self):
+    @staticmethod
+    def get_initial_annotations():
         language = get_language()
-        if language == "uk":
-            sort_field = "last_name_uk"
-        else:
-            sort_field = "last_name_en"
+        sort_field = "last_name_uk" if language == "uk" else "last_name_en"
+        sort_name = Coalesce(sort_field, Value(""))
+        return {"sort_name": sort_name, "initial": Upper(Left(sort_name, 1))}
 
-        queryset = Person.objects.all().order_by(sort_field)
+    def get_queryset(self):
+        queryset = Person.objects.annotate(**self.get_initial_annotations())
+
+        letter = self.request.GET.get("letter")
+        if letter:
+            queryset = queryset.filter(
+                initial="" if letter == self.blank_initial else letter[:1].upper()
+            )
         return queryset
 
+    def get_letters(self):
+        """
+        Returns the A-Z index with the number of people per initial, from a
+        single GROUP BY query.
+        """
+        annotations = self.get_initial_annotations()
+        return [
+            (row["initial"] or self.blank_initial, row["count"])
+            for row in Person.objects.annotate(initial=annotations["initial"])
+            .values("initial")
+            .annotate(count=Count("id"))
+            .order_by("initial")
+        ]
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        queryset = self.get_queryset()
-
-        language = get_language()
-        sort_field = "last_name_uk" if language == "uk" else "last_name_en"
 
         grouped = {}
         for key, group in groupby(
-            queryset, key=lambda x: getattr(x, sort_field)[0].upper()
+            context["object_list"], key=lambda x: x.initial or self.blank_initial
         ):
             grouped[key] = list(group)
 
         context["grouped_persons"] = grouped
+        context["letters"] = self.get_letters()
+        context["current_letter"] = self.request.GET.get("letter", "")
         return context
 
 
+class PersonSearchView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    login_url = "account_login"
+    redirect_field_name = "next"
+    permission_required = "locations.view_person"
+    limit = 20
+
+    def get(self, request, *args, **kwargs):
+        people = Person.objects.search(request.GET.get("q", ""), limit=self.limit)
+        return JsonResponse(
+            {
+                "results": [
+                    {"id": str(person.id), "text": str(person)} for person in people
+                ]
+            }
+        )
+
+
 class PersonCreateView(DivisionMixin, CreateView):
     model = Person
     form_class = PersonForm
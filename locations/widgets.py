@@ -0,0 +1,45 @@
+from django.core.exceptions import ValidationError
+from django.forms import Select
+from django.urls import reverse_lazy
+
+
+class PersonAutocompleteSelect(Select):
+    """
+    Select that renders only the chosen person. Other people are fetched from
+    the person search endpoint as the user types.
+    """
+
+    search_url = reverse_lazy("locations:person_search")
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs["data-autocomplete-url"] = self.search_url
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        selected = {str(v) for v in value if v}
+
+        options = []
+        if not self.is_required:
+            options.append(
+                self.create_option(name, "", field.empty_label, not selected, 0)
+            )
+
+        if selected:
+            try:
+                people = list(field.queryset.filter(pk__in=selected))
+            except ValidationError:
+                people = []
+            for index, person in enumerate(people, start=len(options)):
+                options.append(
+                    self.create_option(
+                        name,
+                        field.prepare_value(person),
+                        field.label_from_instance(person),
+                        True,
+                        index,
+                    )
+                )
+
+        return [(None, options, 0)]
@@ -0,0 +1,172 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.urls import NoReverseMatch, reverse
+from django.utils import translation
+from django.views.decorators.http import condition
+
+# Bumped to drop every cached page at once, e.g. when the navigation changes
+VERSION_KEY = "pages:version"
+# Time of the last change that affected every page
+MODIFIED_KEY = "pages:modified"
+
+
+def get_cache():
+    return caches[settings.PAGE_CACHE_ALIAS]
+
+
+def get_version():
+    return get_cache().get_or_set(VERSION_KEY, 1, timeout=None)
+
+
+def get_page_cache_key(path, language, version=None):
+    digest = hashlib.md5(path.encode()).hexdigest()
+    return f"pages:{version or get_version()}:{language}:{digest}"
+
+
+def get_modified_key(path, language):
+    digest = hashlib.md5(path.encode()).hexdigest()
+    return f"{MODIFIED_KEY}:{language}:{digest}"
+
+
+def is_cacheable_request(request):
+    """
+    Only anonymous GETs without a query string or session are served from
+    the cache; everything else is personal or one-off.
+    """
+    return (
+        request.method in ("GET", "HEAD")
+        and not request.GET
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and not request.user.is_authenticated
+    )
+
+
+def is_cacheable_response(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        and not response.has_header("Set-Cookie")
+    )
+
+
+def cache_anonymous_page(view_func):
+    """
+    Serves a public page from the shared cache for anonymous visitors. Keys
+    hold the path and language, so edits can drop exactly the pages they
+    affect through ``invalidate_paths``.
+    """
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return view_func(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = get_page_cache_key(request.path, translation.get_language())
+        response = cache.get(key)
+        if response is not None:
+            response["X-Page-Cache"] = "hit"
+            return response
+
+        response = view_func(request, *args, **kwargs)
+
+        def store(response):
+            if is_cacheable_response(request, response):
+                cache.set(key, response, settings.PAGE_CACHE_SECONDS)
+            response["X-Page-Cache"] = "miss"
+
+        if hasattr(response, "render") and not response.is_rendered:
+            response.add_post_render_callback(store)
+        else:
+            store(response)
+        return response
+
+    return wrapper
+
+
+def get_localized_paths(view_name, **kwargs):
+    paths = []
+    for language, _ in settings.LANGUAGES:
+        with translation.override(language):
+            try:
+                paths.append((reverse(view_name, kwargs=kwargs or None), language))
+            except NoReverseMatch:
+                continue
+    return paths
+
+
+def get_page_paths(page):
+    paths = get_localized_paths("page", slug=page.slug)
+    if page.slug == "home":
+        paths += get_localized_paths("home")
+    return paths
+
+
+def get_division_paths(division):
+    return get_localized_paths("locations", slug=division.slug)
+
+
+def invalidate_paths(paths):
+    cache = get_cache()
+    version = get_version()
+    cache.delete_many(
+        [get_page_cache_key(path, language, version) for path, language in paths]
+    )
+    now = time.time()
+    cache.set_many(
+        {get_modified_key(path, language): now for path, language in paths},
+        timeout=None,
+    )
+
+
+def invalidate_all():
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, timeout=None)
+    cache.set(MODIFIED_KEY, time.time(), timeout=None)
+
+
+def get_modified(request):
+    """
+    Returns when the requested page last changed, as recorded by the
+    invalidation above. A page with no record counts as changed now, so a
+    lost cache never produces a stale 304.
+    """
+    if not hasattr(request, "_page_modified"):
+        modified = None
+        if is_cacheable_request(request):
+            cache = get_cache()
+            key = get_modified_key(request.path, translation.get_language())
+            values = cache.get_many([key, MODIFIED_KEY])
+            if key not in values:
+                values[key] = time.time()
+                cache.add(key, values[key], timeout=None)
+            modified = max(values.values())
+        request._page_modified = modified
+    return request._page_modified
+
+
+def page_last_modified(request, *args, **kwargs):
+    modified = get_modified(request)
+    if modified is not None:
+        return datetime.fromtimestamp(modified, tz=timezone.utc)
+
+
+def page_etag(request, *args, **kwargs):
+    modified = get_modified(request)
+    if modified is not None:
+        key = f"{request.path}:{translation.get_language()}:{modified}"
+        return hashlib.md5(key.encode()).hexdigest()
+
+
+# Lets repeat visitors and proxies revalidate a page without rendering it
+page_condition = condition(etag_func=page_etag, last_modified_func=page_last_modified)
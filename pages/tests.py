@@ -1,7 +1,16 @@
+import json
+
+from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse, resolve
+from django.utils import translation
 
+from hub.cache import get_nav_version
 from hub.models import Page, Section, Text, Content, File, Video, URL
 from locations.models import Division, Branch
 from .views import GenericPageView, HomePageView
@@ -9,6 +18,7 @@ from .views import GenericPageView, HomePageView
 
 class HomePageTests(TestCase):
     def setUp(self):
+        cache.clear()
         url = reverse("home")
         self.response = self.client.get(url)
 
@@ -31,6 +41,7 @@ class HomePageTests(TestCase):
 
 class GenericPageTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.page = Page.objects.create(
             title="About Us",
             slug="about-us",
@@ -95,6 +106,7 @@ class RedirectToFirstDivisionViewTests(TestCase):
 
 class LocationsPageViewTests(TestCase):
     def setUp(self):
+        cache.clear()
         # Create sample divisions
         self.division1 = Division.objects.create(
             title="Division 1", slug="division-1", order=1
@@ -365,3 +377,193 @@ class PublicSearchTests(TestCase):
 
         results = response.context["results"]
         self.assertGreaterEqual(len(results), 1000)
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.page = Page.objects.create(title="News", slug="news")
+        self.other_page = Page.objects.create(title="Events", slug="events")
+        self.section = Section.objects.create(
+            page=self.page,
+            title="Latest",
+            status=Section.Status.PUBLISHED,
+        )
+        self.url = reverse("page", kwargs={"slug": "news"})
+        self.other_url = reverse("page", kwargs={"slug": "events"})
+
+    def test_anonymous_page_is_served_from_cache(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Page-Cache"], "miss")
+        self.assertNotIn("csrftoken", response.cookies)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Page-Cache"], "hit")
+        self.assertContains(response, "Latest")
+
+    def test_authenticated_user_bypasses_cache(self):
+        get_user_model().objects.create_user(username="user", password="password")
+        self.client.login(username="user", password="password")
+
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertNotIn("X-Page-Cache", response)
+
+    def test_query_string_bypasses_cache(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url, {"utm_source": "news"})
+        self.assertNotIn("X-Page-Cache", response)
+
+    def test_pages_are_cached_per_language(self):
+        self.client.get(self.url)
+        with translation.override("uk"):
+            url = reverse("page", kwargs={"slug": "news"})
+        response = self.client.get(url)
+        self.assertEqual(response["X-Page-Cache"], "miss")
+
+    def test_publishing_invalidates_only_its_page(self):
+        self.client.get(self.url)
+        self.client.get(self.other_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.section.status = Section.Status.DRAFT
+            self.section.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Page-Cache"], "miss")
+        self.assertNotContains(response, "Latest")
+        self.assertEqual(self.client.get(self.other_url)["X-Page-Cache"], "hit")
+
+    def test_branch_edit_invalidates_its_division(self):
+        division = Division.objects.create(title="Division 1", slug="division-1")
+        other_division = Division.objects.create(title="Division 2", slug="division-2")
+        branch = Branch.objects.create(
+            division=division, title="Branch 1", place_id="place"
+        )
+        url = reverse("locations", kwargs={"slug": division.slug})
+        other_url = reverse("locations", kwargs={"slug": other_division.slug})
+        self.client.get(url)
+        self.client.get(other_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            branch.status = Branch.Status.DISPLAY
+            branch.save()
+
+        self.assertEqual(self.client.get(url)["X-Page-Cache"], "miss")
+        self.assertEqual(self.client.get(other_url)["X-Page-Cache"], "hit")
+
+    def test_division_change_invalidates_every_page(self):
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Division.objects.create(title="Division 1", slug="division-1")
+
+        self.assertEqual(self.client.get(self.url)["X-Page-Cache"], "miss")
+
+    def reorder(self, url_name, permission, order):
+        user = get_user_model().objects.create_user(
+            username="editor", password="password"
+        )
+        user.user_permissions.add(Permission.objects.get(codename=permission))
+        self.client.login(username="editor", password="password")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse(url_name),
+                data=json.dumps(order),
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 200)
+        self.client.logout()
+
+    def test_section_reorder_invalidates_its_page(self):
+        earlier = Section.objects.create(
+            page=self.page, title="Earlier", status=Section.Status.PUBLISHED
+        )
+        self.client.get(self.url)
+        self.client.get(self.other_url)
+
+        self.reorder(
+            "section_order",
+            "change_section_order",
+            {str(earlier.id): 0, str(self.section.id): 1},
+        )
+
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Page-Cache"], "miss")
+        content = response.content.decode()
+        self.assertLess(content.index("Earlier"), content.index("Latest"))
+        self.assertEqual(self.client.get(self.other_url)["X-Page-Cache"], "hit")
+
+    def test_content_reorder_invalidates_its_page(self):
+        content = Content.objects.create(
+            section=self.section, item=Text.objects.create(content="First")
+        )
+        self.client.get(self.url)
+
+        self.reorder("content_order", "change_content_order", {str(content.id): 5})
+
+        self.assertEqual(self.client.get(self.url)["X-Page-Cache"], "miss")
+
+    def test_division_reorder_invalidates_every_page_and_the_nav(self):
+        division = Division.objects.create(title="Division 1", slug="division-1")
+        self.client.get(self.url)
+        nav_version = get_nav_version()
+
+        self.reorder(
+            "locations:division_order", "change_division_order", {str(division.id): 3}
+        )
+
+        self.assertEqual(self.client.get(self.url)["X-Page-Cache"], "miss")
+        self.assertEqual(get_nav_version(), nav_version + 1)
+
+
+class ConditionalPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.page = Page.objects.create(title="News", slug="news")
+        self.section = Section.objects.create(
+            page=self.page,
+            title="Latest",
+            status=Section.Status.PUBLISHED,
+        )
+        self.url = reverse("page", kwargs={"slug": "news"})
+
+    def test_unchanged_page_returns_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since_returns_not_modified(self):
+        response = self.client.get(self.url)
+
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_edit_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.section.title = "Updated"
+            self.section.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertContains(response, "Updated")
+
+    def test_authenticated_user_gets_no_etag(self):
+        get_user_model().objects.create_user(username="user", password="password")
+        self.client.login(username="user", password="password")
+
+        response = self.client.get(self.url)
+        self.assertFalse(response.has_header("ETag"))
+
+    def test_public_page_does_not_load_divisions(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+
+        self.assertFalse(any("locations_division" in query["sql"] for query in queries))
@@ -8,12 +8,24 @@ from django.db.models import Q
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import select_template, TemplateDoesNotExist
+from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.generic import TemplateView
 from environs import Env
 
-from hub.models import Section, Page, Content, Text, File, Image, Video, URL
+from hub.models import (
+    Section,
+    Page,
+    Content,
+    Text,
+    File,
+    Image,
+    Video,
+    URL,
+    prefetch_content_links,
+)
 from locations.models import Division, Branch, Person
+from .cache import cache_anonymous_page, page_condition
 from .forms import SearchForm
 
 env = Env()
@@ -24,6 +36,7 @@ class HomePageView(TemplateView):
     template_name = "pages/home.html"
 
 
+@method_decorator([page_condition, cache_anonymous_page], name="dispatch")
 class GenericPageView(TemplateView):
 
     def get_template_names(self):
@@ -79,6 +92,7 @@ class RedirectToFirstDivisionView(View):
         return redirect("home")
 
 
+@method_decorator([page_condition, cache_anonymous_page], name="dispatch")
 class LocationsPageView(TemplateView):
     template_name = "pages/locations.html"
 
@@ -170,7 +184,8 @@ def public_search(request):
             # ).filter(search=query)
 
             sections = (
-                Section.published.annotate(
+                Section.published.select_related("page")
+                .annotate(
                     search=SearchVector("title_en", "title_uk"),
                     rank=SearchRank(SearchVector("title_en", "title_uk"), search_query),
                 )
@@ -308,7 +323,8 @@ def public_search(request):
             # ).filter(search=query)
 
             branches = (
-                Branch.displayed.annotate(
+                Branch.displayed.select_related("division")
+                .annotate(
                     search=SearchVector(
                         "title_en", "title_uk", "address_en", "address_uk"
                     ),
@@ -370,6 +386,7 @@ def public_search(request):
                 + list(branches)
                 + list(persons)
             )
+            prefetch_content_links(results)
 
     return render(
         request,
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Donor, Donation
+from .models import Campaign, Donor, Donation
 
 
 @admin.register(Donor)
@@ -14,3 +14,16 @@ class DonationAdmin(admin.ModelAdmin):
     list_display = ("donor", "amount", "transaction_id", "donated_at")
     search_fields = ("transaction_id",)
     list_filter = ("donated_at",)
+
+
+@admin.register(Campaign)
+class CampaignAdmin(admin.ModelAdmin):
+    list_display = ("name", "audience", "status", "sent_count", "created_at")
+    list_filter = ("status", "audience")
+    readonly_fields = (
+        "status",
+        "last_donor_id",
+        "sent_count",
+        "started_at",
+        "finished_at",
+    )
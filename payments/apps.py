@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.core.signals import setting_changed
 
 
 class PaymentsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "payments"
+
+    def ready(self):
+        from .utils import reset_clients
+
+        # The PayPal clients are built from settings on first use
+        setting_changed.connect(reset_clients, dispatch_uid="payments_reset_clients")
@@ -0,0 +1,100 @@
+import threading
+from decimal import Decimal
+
+from django.db import transaction
+
+from .models import Plan, Product
+from .utils import create_billing_plan, create_product
+
+# Catalog entries never change once created, so each worker keeps the ones it
+# has seen and skips the database on repeat checkouts.
+_products = {}
+_plans = {}
+_lock = threading.Lock()
+
+
+def clear_cache():
+    with _lock:
+        _products.clear()
+        _plans.clear()
+
+
+def get_product(name, product_type="SERVICE", category="CHARITY"):
+    """
+    Returns the PayPal product the recurring donation plans belong to,
+    creating it remotely the first time.
+    """
+    key = (name, product_type, category)
+    product = _products.get(key)
+    if product is not None:
+        return product
+
+    with _lock:
+        product = (
+            Product.objects.filter(name=name, type=product_type, category=category)
+            .order_by("created_at")
+            .first()
+        )
+        if product is None:
+            product = create_product(
+                name=name, product_type=product_type, category=category
+            )
+        if product is not None:
+            _products[key] = product
+        return product
+
+
+def get_plan(product, name, amount, interval_unit, interval_count=1, currency="GBP"):
+    """
+    Returns the catalog plan for a price and billing interval. A plan is only
+    created at PayPal when no donor has chosen that price before; the row is
+    locked while it is created, so concurrent checkouts share one plan.
+    """
+    amount = Decimal(str(amount)).quantize(Decimal("0.01"))
+    key = (amount, currency, interval_unit, interval_count)
+    plan = _plans.get(key)
+    if plan is not None:
+        return plan
+
+    lookup = {
+        "is_catalog": True,
+        "amount": amount,
+        "currency": currency,
+        "interval_unit": interval_unit,
+        "interval_count": interval_count,
+    }
+    with _lock:
+        plan = Plan.objects.filter(**lookup).first()
+        if plan is None:
+            with transaction.atomic():
+                # Serializes plan creation across workers. The PayPal call has
+                # to run under the lock: creating a plan there is not
+                # idempotent, so racing workers would each leave a plan at
+                # PayPal. Only the first checkout at a new price waits here,
+                # later ones find the plan above without locking.
+                Product.objects.select_for_update().filter(pk=product.pk).first()
+                plan = Plan.objects.filter(**lookup).first()
+                if plan is None:
+                    plan = create_catalog_plan(
+                        product, name, amount, interval_unit, interval_count, currency
+                    )
+        if plan is not None:
+            _plans[key] = plan
+        return plan
+
+
+def create_catalog_plan(product, name, amount, interval_unit, interval_count, currency):
+    plan = create_billing_plan(
+        product=product,
+        name=name,
+        amount=amount,
+        interval_unit=interval_unit,
+        interval_count=interval_count,
+        currency=currency,
+    )
+    if plan is None:
+        return None
+
+    Plan.objects.filter(pk=plan.pk).update(is_catalog=True)
+    plan.is_catalog = True
+    return plan
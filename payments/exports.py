@@ -0,0 +1,234 @@
+import csv
+import re
+import zipfile
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+from .models import Donation, Donor, Subscription
+
+# Rows are read from a server-side cursor this many at a time
+CHUNK_SIZE = 2000
+
+EXPORTS = {
+    "donors": {
+        "model": Donor,
+        "date_field": "created_at",
+        "columns": [
+            ("ID", "id"),
+            ("First name", "first_name"),
+            ("Last name", "last_name"),
+            ("Email", "email"),
+            ("Language", "language"),
+            ("Created", "created_at"),
+        ],
+    },
+    "donations": {
+        "model": Donation,
+        "date_field": "donated_at",
+        "columns": [
+            ("Transaction ID", "transaction_id"),
+            ("Date", "donated_at"),
+            ("Amount", "amount"),
+            ("First name", "donor__first_name"),
+            ("Last name", "donor__last_name"),
+            ("Email", "donor__email"),
+            ("Subscription ID", "subscription__subscription_id"),
+        ],
+    },
+    "subscriptions": {
+        "model": Subscription,
+        "date_field": "created_at",
+        "columns": [
+            ("Subscription ID", "subscription_id"),
+            ("Status", "status"),
+            ("Created", "created_at"),
+            ("Email", "donor__email"),
+            ("Plan", "plan__name"),
+            ("Amount", "plan__amount"),
+            ("Currency", "plan__currency"),
+            ("Interval", "plan__interval_unit"),
+            ("Interval count", "plan__interval_count"),
+        ],
+    },
+}
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def get_rows(name, start=None, end=None):
+    """
+    Returns the export's rows as tuples, oldest first, fetched in chunks so
+    memory use does not grow with the history. ``end`` is inclusive.
+    """
+    export = EXPORTS[name]
+    date_field = export["date_field"]
+    rows = export["model"].objects.all()
+    # Whole-day bounds keep the filter on the indexed column
+    if start:
+        rows = rows.filter(**{f"{date_field}__gte": start_of_day(start)})
+    if end:
+        rows = rows.filter(
+            **{f"{date_field}__lt": start_of_day(end + timedelta(days=1))}
+        )
+    return (
+        rows.order_by(date_field, "pk")
+        .values_list(*[lookup for _, lookup in export["columns"]])
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def get_headers(name):
+    return [header for header, _ in EXPORTS[name]["columns"]]
+
+
+# Spreadsheets evaluate text starting with these as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def format_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return timezone.localtime(value).strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, str):
+        # Names and emails come from PayPal payer data, keep them as text
+        if value.startswith(FORMULA_PREFIXES):
+            return f"'{value}"
+        return value
+    return str(value)
+
+
+class Echo:
+    """A file-like object that hands back what is written to it."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(headers, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow([format_value(value) for value in row])
+
+
+class ChunkBuffer:
+    """An unseekable file that collects written bytes until they are taken."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+XLSX_FILES = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" '
+        'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+        'officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+        'officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+
+# Control characters that XML cannot hold
+XML_ILLEGAL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def xlsx_cell(value):
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = escape(XML_ILLEGAL.sub("", format_value(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def xlsx_row(values):
+    return "<row>" + "".join(xlsx_cell(value) for value in values) + "</row>"
+
+
+def stream_xlsx(headers, rows, rows_per_chunk=500):
+    """
+    Writes a one-sheet workbook with inline strings straight into a zip
+    stream, handing out the compressed bytes as they are produced. Nothing
+    beyond the current chunk of rows is held in memory.
+    """
+    buffer = ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for filename, content in XLSX_FILES.items():
+            archive.writestr(filename, content)
+        with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/'
+                b'spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(xlsx_row(headers).encode())
+            lines = []
+            for row in rows:
+                lines.append(xlsx_row(row))
+                if len(lines) >= rows_per_chunk:
+                    sheet.write("".join(lines).encode())
+                    lines = []
+                    yield buffer.take()
+            sheet.write("".join(lines).encode())
+            sheet.write(b"</sheetData></worksheet>")
+    yield buffer.take()
+
+
+FORMATS = {
+    "csv": ("text/csv", stream_csv),
+    "xlsx": (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        stream_xlsx,
+    ),
+}
+
+
+def get_filename(name, file_format, start=None, end=None):
+    dates = "-".join(
+        value.isoformat() if isinstance(value, date) else "all"
+        for value in (start, end)
+    )
+    return f"{name}-{dates}.{file_format}"
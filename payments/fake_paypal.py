@@ -0,0 +1,231 @@
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlencode
+
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def make_id(prefix):
+    return f"{prefix}-{uuid.uuid4().hex[:17].upper()}"
+
+
+def add_query(url, **params):
+    separator = "&" if "?" in url else "?"
+    return f"{url}{separator}{urlencode(params)}"
+
+
+class FakePayPal:
+    """
+    Answers the PayPal REST calls the payments app makes, from memory, so
+    checkouts can be load tested without the sandbox. Every response waits
+    ``latency`` seconds, give or take ``jitter``, and fails with a 503 at
+    ``failure_rate``.
+
+    Approval links point straight back at the return URL, as if the donor
+    had approved the payment at PayPal.
+    """
+
+    payer = {
+        "email": "donor@example.com",
+        "first_name": "Test",
+        "last_name": "Donor",
+        "payer_id": "FAKEPAYER",
+    }
+
+    def __init__(self, latency=0.0, jitter=0.0, failure_rate=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.payments = {}
+        self.subscriptions = {}
+        self.lock = threading.Lock()
+        self.routes = [
+            ("POST", r"/v1/oauth2/token", self.create_token),
+            ("POST", r"/v1/payments/payment", self.create_payment),
+            ("GET", r"/v1/payments/payment/(?P<id>[\w-]+)", self.get_payment),
+            (
+                "POST",
+                r"/v1/payments/payment/(?P<id>[\w-]+)/execute",
+                self.execute_payment,
+            ),
+            ("POST", r"/v1/catalogs/products", self.create_product),
+            ("POST", r"/v1/billing/plans", self.create_plan),
+            ("POST", r"/v1/billing/subscriptions", self.create_subscription),
+            (
+                "GET",
+                r"/v1/billing/subscriptions/(?P<id>[\w-]+)",
+                self.get_subscription,
+            ),
+        ]
+
+    def handle(self, method, path, data):
+        """Returns the status code and JSON body for a request."""
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if random.random() < self.failure_rate:
+            return 503, {
+                "name": "SERVICE_UNAVAILABLE",
+                "message": "Fake PayPal failure.",
+            }
+
+        path = path.split("?", 1)[0].rstrip("/")
+        for route_method, pattern, view in self.routes:
+            match = re.fullmatch(pattern, path)
+            if match and route_method == method:
+                return view(data, **match.groupdict())
+        return 404, {"name": "RESOURCE_NOT_FOUND", "message": f"No route {path}."}
+
+    def create_token(self, data):
+        return 200, {
+            "access_token": uuid.uuid4().hex,
+            "token_type": "Bearer",
+            "expires_in": 32400,
+        }
+
+    def create_payment(self, data):
+        payment_id = make_id("PAYID")
+        return_url = data.get("redirect_urls", {}).get("return_url", "")
+        payment = {
+            "id": payment_id,
+            "intent": data.get("intent", "sale"),
+            "state": "created",
+            "payer": {"payment_method": "paypal", "payer_info": self.payer},
+            "transactions": data.get("transactions", []),
+            "create_time": timezone.now().isoformat(),
+            "links": [
+                {
+                    "rel": "approval_url",
+                    "href": add_query(
+                        return_url,
+                        paymentId=payment_id,
+                        token=make_id("EC"),
+                        PayerID=self.payer["payer_id"],
+                    ),
+                    "method": "REDIRECT",
+                }
+            ],
+        }
+        with self.lock:
+            self.payments[payment_id] = payment
+        return 201, payment
+
+    def get_payment(self, data, id):
+        payment = self.payments.get(id)
+        if payment is None:
+            return 404, {"name": "INVALID_RESOURCE_ID", "message": "Unknown payment."}
+        return 200, payment
+
+    def execute_payment(self, data, id):
+        with self.lock:
+            payment = self.payments.get(id)
+            if payment is None:
+                return 404, {
+                    "name": "INVALID_RESOURCE_ID",
+                    "message": "Unknown payment.",
+                }
+            if payment["state"] == "approved":
+                return 400, {
+                    "name": "PAYMENT_ALREADY_DONE",
+                    "message": "Payment has already been executed.",
+                }
+            payment["state"] = "approved"
+            for transaction in payment["transactions"]:
+                transaction["related_resources"] = [
+                    {"sale": {"id": make_id("SALE"), "state": "completed"}}
+                ]
+        return 200, payment
+
+    def create_product(self, data):
+        return 201, {"id": make_id("PROD"), **data}
+
+    def create_plan(self, data):
+        return 201, {"id": make_id("P"), **data}
+
+    def create_subscription(self, data):
+        subscription_id = make_id("I")
+        return_url = data.get("application_context", {}).get("return_url", "")
+        now = timezone.now().isoformat()
+        subscription = {
+            "id": subscription_id,
+            "plan_id": data.get("plan_id"),
+            "status": "ACTIVE",
+            "subscriber": data.get("subscriber", {}),
+            "start_time": now,
+            "update_time": now,
+        }
+        with self.lock:
+            self.subscriptions[subscription_id] = subscription
+        return 201, {
+            "id": subscription_id,
+            "status": "APPROVAL_PENDING",
+            "links": [
+                {
+                    "rel": "approve",
+                    "href": add_query(
+                        return_url,
+                        subscription_id=subscription_id,
+                        ba_token=make_id("BA"),
+                        token=make_id("EC"),
+                    ),
+                    "method": "GET",
+                }
+            ],
+        }
+
+    def get_subscription(self, data, id):
+        subscription = self.subscriptions.get(id)
+        if subscription is None:
+            return 404, {
+                "name": "RESOURCE_NOT_FOUND",
+                "message": "Unknown subscription.",
+            }
+        return 200, subscription
+
+
+class FakePayPalHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.respond("GET")
+
+    def do_POST(self):
+        self.respond("POST")
+
+    def respond(self, method):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        try:
+            data = json.loads(body) if body.startswith(b"{") else {}
+        except ValueError:
+            data = {}
+
+        status, data = self.server.paypal.handle(method, self.path, data)
+        content = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+def make_server(host="127.0.0.1", port=8001, **options):
+    """
+    Returns a threaded HTTP server for a ``FakePayPal`` built with
+    ``options``. Port 0 picks a free port.
+    """
+    server = ThreadingHTTPServer((host, port), FakePayPalHandler)
+    server.daemon_threads = True
+    server.paypal = FakePayPal(**options)
+    return server
@@ -11,3 +11,18 @@ class CustomDonationForm(forms.Form):
             attrs={"class": "form-control", "placeholder": "Enter amount"}
         ),
     )
+
+
+class ExportForm(forms.Form):
+    start = forms.DateField(required=False)
+    end = forms.DateField(required=False)
+    format = forms.ChoiceField(
+        choices=[("csv", "CSV"), ("xlsx", "Excel")], required=False
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get("start"), cleaned_data.get("end")
+        if start and end and start > end:
+            raise forms.ValidationError(_("The start date must not be after the end."))
+        return cleaned_data
@@ -0,0 +1,149 @@
+import random
+import statistics
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urljoin, urlsplit
+
+import requests
+from django.utils import timezone
+
+
+def summarize(latencies):
+    """Returns the count and p50/p95/p99/max of latencies in seconds."""
+    if not latencies:
+        return {"count": 0, "p50": 0, "p95": 0, "p99": 0, "max": 0}
+    if len(latencies) == 1:
+        cuts = latencies * 99
+    else:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "count": len(latencies),
+        "p50": cuts[49],
+        "p95": cuts[94],
+        "p99": cuts[98],
+        "max": max(latencies),
+    }
+
+
+class LoadTest:
+    """
+    Drives checkouts and webhook deliveries against a running site at once,
+    timing every request. Meant to run against a site whose payments point
+    at the fake PayPal server.
+
+    A checkout posts the donation form and follows the approval link back to
+    the success page. Webhooks are sale events, ``duplicate_rate`` of them
+    resent to mimic PayPal's retries.
+    """
+
+    def __init__(self, base_url, language="en", timeout=30, duplicate_rate=0.2):
+        self.base_url = base_url.rstrip("/")
+        self.language = language
+        self.timeout = timeout
+        self.duplicate_rate = duplicate_rate
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.sent_events = []
+        self.lock = threading.Lock()
+
+    def url(self, path):
+        return f"{self.base_url}/{self.language}{path}"
+
+    def timed(self, name, session, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        kwargs.setdefault("allow_redirects", False)
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+        except requests.RequestException:
+            response = None
+        elapsed = time.perf_counter() - started
+
+        with self.lock:
+            self.latencies[name].append(elapsed)
+        if response is None or response.status_code >= 400:
+            self.count_error(name)
+            return None
+        return response
+
+    def count_error(self, name):
+        with self.lock:
+            self.errors[name] += 1
+
+    def checkout(self):
+        session = requests.Session()
+        response = self.timed(
+            "donate_form", session, "GET", self.url("/payments/donate/")
+        )
+        if response is None:
+            return
+
+        response = self.timed(
+            "donate",
+            session,
+            "POST",
+            self.url("/payments/donate/"),
+            data={
+                "amount": f"{random.randint(5, 100)}.00",
+                "csrfmiddlewaretoken": session.cookies.get("csrftoken", ""),
+            },
+        )
+        location = response.headers.get("Location") if response is not None else None
+        if response is not None and not location:
+            # The view rendered its error page instead of redirecting to PayPal
+            self.count_error("donate")
+        if not location:
+            return
+
+        # The fake approval link leads straight back to the success page
+        url = urljoin(response.url, location)
+        response = self.timed("success", session, "GET", url, allow_redirects=True)
+        payment_id = parse_qs(urlsplit(url).query).get("paymentId", [""])[0]
+        if response is not None and payment_id.encode() not in response.content:
+            self.count_error("success")
+
+    def webhook(self):
+        with self.lock:
+            duplicate = self.sent_events and random.random() < self.duplicate_rate
+            if duplicate:
+                event = random.choice(self.sent_events)
+            else:
+                event = {
+                    "id": f"WH-{uuid.uuid4().hex.upper()}",
+                    "event_type": "PAYMENT.SALE.COMPLETED",
+                    "create_time": timezone.now().isoformat(),
+                    "resource": {
+                        "id": f"SALE-{uuid.uuid4().hex[:17].upper()}",
+                        "amount": {"total": "10.00", "currency": "GBP"},
+                    },
+                }
+                self.sent_events.append(event)
+        self.timed(
+            "webhook",
+            requests.Session(),
+            "POST",
+            self.url("/payments/webhook/"),
+            json=event,
+        )
+
+    def run(self, checkouts=100, webhooks=100, concurrency=10):
+        """Runs the scenarios concurrently and returns the report."""
+        tasks = [self.checkout] * checkouts + [self.webhook] * webhooks
+        random.shuffle(tasks)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(task) for task in tasks]:
+                future.result()
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed):
+        return {
+            "elapsed": elapsed,
+            "steps": {
+                name: {**summarize(latencies), "errors": self.errors[name]}
+                for name, latencies in sorted(self.latencies.items())
+            },
+        }
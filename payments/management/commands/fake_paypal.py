@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from payments.fake_paypal import make_server
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs a local stand-in for the PayPal API. Point the site at it with "
+        "PAYPAL_API_URL=http://<host>:<port>."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8001)
+        parser.add_argument(
+            "--latency", type=float, default=0.2, help="Seconds per response."
+        )
+        parser.add_argument(
+            "--jitter",
+            type=float,
+            default=0.1,
+            help="Seconds the latency varies by either way.",
+        )
+        parser.add_argument(
+            "--failure-rate",
+            type=float,
+            default=0.0,
+            help="Share of requests answered with a 503, from 0 to 1.",
+        )
+
+    def handle(self, *args, **options):
+        server = make_server(
+            options["host"],
+            options["port"],
+            latency=options["latency"],
+            jitter=options["jitter"],
+            failure_rate=options["failure_rate"],
+        )
+        host, port = server.server_address[:2]
+        self.stdout.write(f"Fake PayPal listening on http://{host}:{port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from payments.loadtest import LoadTest
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs checkouts and webhook deliveries against a running site and "
+        "reports latency percentiles and errors. Start the site with "
+        "PAYPAL_API_URL pointing at the fake_paypal command first, and with "
+        "DJANGO_CSRF_COOKIE_SECURE=False when it is served over plain HTTP."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000")
+        parser.add_argument("--language", default="en")
+        parser.add_argument("--checkouts", type=int, default=100)
+        parser.add_argument("--webhooks", type=int, default=100)
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument(
+            "--duplicate-rate",
+            type=float,
+            default=0.2,
+            help="Share of webhook deliveries that repeat an earlier event.",
+        )
+
+    def handle(self, *args, **options):
+        load_test = LoadTest(
+            options["url"],
+            language=options["language"],
+            duplicate_rate=options["duplicate_rate"],
+        )
+        report = load_test.run(
+            checkouts=options["checkouts"],
+            webhooks=options["webhooks"],
+            concurrency=options["concurrency"],
+        )
+
+        self.stdout.write(
+            f"{'step':<12} {'count':>6} {'errors':>6} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+        )
+        for name, step in report["steps"].items():
+            self.stdout.write(
+                f"{name:<12} {step['count']:>6} {step['errors']:>6} "
+                + " ".join(
+                    f"{step[key] * 1000:>8.1f}" for key in ("p50", "p95", "p99", "max")
+                )
+            )
+        self.stdout.write(f"Finished in {report['elapsed']:.1f}s.")
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from payments.reconcile import PAGE_SIZE, reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        "Stores the PayPal subscription charges missing from the donations, "
+        "continuing from where the last run stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            help="Restart from this ISO 8601 time instead of the saved cursor.",
+        )
+        parser.add_argument(
+            "--window-days",
+            type=int,
+            default=1,
+            help="Days searched per request, at most 31.",
+        )
+        parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            since = parse_datetime(options["since"])
+            if since is None:
+                raise CommandError(f"Invalid time {options['since']!r}.")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        added = reconcile(
+            since=since,
+            window=timedelta(days=options["window_days"]),
+            page_size=options["page_size"],
+        )
+        self.stdout.write(f"Added {added} donation(s).")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from payments.reports import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = "Sums new donations into the reporting rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full", action="store_true", help="Rebuild every rollup from scratch."
+        )
+
+    def handle(self, *args, **options):
+        written = refresh_rollups(full=options["full"])
+        self.stdout.write(f"Wrote {written} donation rollup(s).")
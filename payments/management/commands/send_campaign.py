@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.campaigns import send_campaign
+from payments.models import Campaign
+
+
+class Command(BaseCommand):
+    help = "Sends a campaign email to its donors, resuming an interrupted send."
+
+    def add_arguments(self, parser):
+        parser.add_argument("campaign_id", type=int)
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=14.0,
+            help="Maximum emails per second, 0 for no limit.",
+        )
+
+    def handle(self, *args, **options):
+        campaign = Campaign.objects.filter(pk=options["campaign_id"]).first()
+        if campaign is None:
+            raise CommandError(f"Campaign {options['campaign_id']} does not exist.")
+
+        sent = send_campaign(
+            campaign, batch_size=options["batch_size"], rate=options["rate"]
+        )
+        self.stdout.write(f"Sent {sent} email(s) for {campaign}.")
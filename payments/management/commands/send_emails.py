@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from payments.outbox import send_pending
+
+
+class Command(BaseCommand):
+    help = "Sends the queued emails of the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2.0,
+            help="Seconds to wait when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Process one batch and exit."
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = send_pending(options["batch_size"])
+            if processed:
+                self.stdout.write(f"Processed {processed} email(s).")
+            if options["once"]:
+                break
+            if not processed:
+                time.sleep(options["sleep"])
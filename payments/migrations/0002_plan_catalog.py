@@ -0,0 +1,48 @@
+# Generated by Django 5.1.3 on 2026-10-19 00:57
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def mark_catalog_plans(apps, schema_editor):
+    """
+    Every checkout used to create its own plan. The oldest plan for each price
+    becomes the catalog plan, the others stay for their subscriptions.
+    """
+    Plan = apps.get_model("payments", "Plan")
+
+    groups = Plan.objects.values(
+        "amount", "currency", "interval_unit", "interval_count"
+    ).annotate(first_created=Min("created_at"))
+    for group in groups.iterator():
+        first_created = group.pop("first_created")
+        plan = (
+            Plan.objects.filter(**group, created_at=first_created)
+            .order_by("id")
+            .first()
+        )
+        Plan.objects.filter(pk=plan.pk).update(is_catalog=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="plan",
+            name="is_catalog",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_catalog_plans, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="plan",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_catalog", True)),
+                fields=("amount", "currency", "interval_unit", "interval_count"),
+                name="unique_catalog_plan",
+            ),
+        ),
+    ]
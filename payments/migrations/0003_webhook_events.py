@@ -0,0 +1,77 @@
+# Generated by Django 5.1.3 on 2026-10-19 00:58
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0002_plan_catalog"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="donation",
+            name="subscription",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="donations",
+                to="payments.subscription",
+            ),
+        ),
+        migrations.CreateModel(
+            name="WebhookEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("event_id", models.CharField(max_length=100, unique=True)),
+                ("event_type", models.CharField(max_length=100)),
+                (
+                    "resource_id",
+                    models.CharField(blank=True, default="", max_length=100),
+                ),
+                ("payload", models.JSONField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("PD", "Pending"), ("DN", "Done"), ("FL", "Failed")],
+                        default="PD",
+                        max_length=2,
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("error", models.TextField(blank=True, default="")),
+                (
+                    "occurred_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("run_after", models.DateTimeField(default=django.utils.timezone.now)),
+                ("received_at", models.DateTimeField(auto_now_add=True)),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "ordering": ["occurred_at", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "run_after"],
+                        name="payments_we_status_37e5b1_idx",
+                    ),
+                    models.Index(
+                        fields=["resource_id", "status", "occurred_at"],
+                        name="payments_we_resourc_f0d555_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0004_email_outbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Campaign",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255)),
+                (
+                    "audience",
+                    models.CharField(
+                        choices=[
+                            ("SUB", "Active subscribers"),
+                            ("DON", "Past donors"),
+                            ("ALL", "Subscribers and past donors"),
+                        ],
+                        default="ALL",
+                        max_length=3,
+                    ),
+                ),
+                ("subject", models.CharField(max_length=255)),
+                ("subject_en", models.CharField(max_length=255, null=True)),
+                ("subject_uk", models.CharField(max_length=255, null=True)),
+                ("body", models.TextField()),
+                ("body_en", models.TextField(null=True)),
+                ("body_uk", models.TextField(null=True)),
+                (
+                    "from_email",
+                    models.CharField(blank=True, default="", max_length=254),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("DR", "Draft"), ("SN", "Sending"), ("DN", "Done")],
+                        default="DR",
+                        max_length=2,
+                    ),
+                ),
+                ("last_donor_id", models.UUIDField(blank=True, null=True)),
+                ("sent_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="donor",
+            name="language",
+            field=models.CharField(
+                choices=[("en", "English"), ("uk", "Ukrainian")],
+                default="en",
+                max_length=7,
+            ),
+        ),
+    ]
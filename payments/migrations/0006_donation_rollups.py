@@ -0,0 +1,73 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0005_campaigns"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DonationRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("is_recurring", models.BooleanField(default=False)),
+                ("donation_count", models.PositiveIntegerField(default=0)),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="donation",
+            index=models.Index(
+                fields=["donated_at"], name="payments_do_donated_bcbb71_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="donationrollup",
+            name="donor",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="rollups",
+                to="payments.donor",
+            ),
+        ),
+        migrations.AddField(
+            model_name="donationrollup",
+            name="plan",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="rollups",
+                to="payments.plan",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="donationrollup",
+            index=models.Index(fields=["day"], name="payments_do_day_542809_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="donationrollup",
+            constraint=models.UniqueConstraint(
+                fields=("day", "donor", "plan", "is_recurring"),
+                name="unique_donation_rollup",
+                nulls_distinct=False,
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0007_transaction_sync"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="donor",
+            index=models.Index(
+                fields=["created_at"], name="payments_do_created_97cfe7_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="subscription",
+            index=models.Index(
+                fields=["created_at"], name="payments_su_created_0c3a00_idx"
+            ),
+        ),
+    ]
@@ -1,7 +1,11 @@
+from datetime import timedelta
 from uuid import uuid4
 
+from django.conf import settings
+from django.core.mail import EmailMessage
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
 
 
 class Donor(models.Model):
@@ -9,8 +13,15 @@ class Donor(models.Model):
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
     email = models.EmailField(unique=True)
+    # The language the donor used on the site, for their emails
+    language = models.CharField(
+        max_length=7, choices=settings.LANGUAGES, default=settings.LANGUAGE_CODE
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["created_at"])]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.email}"
 
@@ -28,7 +39,19 @@ class Donation(models.Model):
     donor = models.ForeignKey(Donor, on_delete=models.CASCADE, related_name="donations")
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     transaction_id = models.CharField(max_length=100, unique=True)
-    donated_at = models.DateTimeField(auto_now_add=True)
+    # Set for the recurring payments of a subscription
+    subscription = models.ForeignKey(
+        "Subscription",
+        on_delete=models.SET_NULL,
+        related_name="donations",
+        blank=True,
+        null=True,
+    )
+    # Reconciled donations keep the time PayPal recorded
+    donated_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=["donated_at"])]
 
     def __str__(self):
         return f"Donation by {self.donor.first_name} {self.donor.last_name} - £{self.amount}"
@@ -67,8 +90,19 @@ class Plan(models.Model):
     )
     interval_count = models.IntegerField()
     currency = models.CharField(max_length=10, default="GBP")
+    # Catalog plans are shared by every donor choosing the same price
+    is_catalog = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["amount", "currency", "interval_unit", "interval_count"],
+                condition=models.Q(is_catalog=True),
+                name="unique_catalog_plan",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.interval_unit})"
 
@@ -93,5 +127,199 @@ class Subscription(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["created_at"])]
+
     def __str__(self):
         return f"Subscription {self.subscription_id} for {self.donor.email}"
+
+
+class QueuedModel(models.Model):
+    """
+    Work done outside the request by a management command. Failures are
+    retried with exponential backoff until ``MAX_ATTEMPTS``.
+    """
+
+    MAX_ATTEMPTS = 5
+
+    class Status(models.TextChoices):
+        PENDING = "PD", "Pending"
+        DONE = "DN", "Done"
+        FAILED = "FL", "Failed"
+
+    status = models.CharField(
+        max_length=2, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    run_after = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        abstract = True
+
+    def fail(self, error):
+        self.attempts += 1
+        self.error = str(error)
+        if self.attempts >= self.MAX_ATTEMPTS:
+            self.status = self.Status.FAILED
+        else:
+            self.run_after = timezone.now() + timedelta(seconds=30 * 2**self.attempts)
+
+
+class WebhookEvent(QueuedModel):
+    """
+    A PayPal webhook event as received. The endpoint only stores it; the
+    ``process_webhooks`` management command applies it later.
+    """
+
+    event_id = models.CharField(max_length=100, unique=True)
+    event_type = models.CharField(max_length=100)
+    # The subscription the event belongs to; its events are applied in order
+    resource_id = models.CharField(max_length=100, blank=True, default="")
+    payload = models.JSONField()
+    occurred_at = models.DateTimeField(default=timezone.now)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["occurred_at", "id"]
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+            models.Index(fields=["resource_id", "status", "occurred_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} {self.event_id} ({self.get_status_display()})"
+
+
+class OutboxEmail(QueuedModel):
+    """
+    An email waiting to be sent by the ``send_emails`` management command.
+    Rows are written in the transaction that records what the email is about,
+    so an email is neither lost nor sent for a rolled back change.
+    """
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    # A claimed email is sent again if its worker has not finished it by then
+    CLAIM_TIMEOUT = timedelta(minutes=10)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)} ({self.get_status_display()})"
+
+    def build(self, connection=None):
+        return EmailMessage(
+            subject=self.subject,
+            body=self.body,
+            from_email=self.from_email,
+            to=self.to,
+            connection=connection,
+        )
+
+
+class Campaign(models.Model):
+    """
+    An email to many donors, e.g. an appeal or the annual Gift Aid statement.
+    Subject and body are templates rendered with the donor as ``donor``.
+    The ``send_campaign`` command records the last donor it reached, so an
+    interrupted send resumes where it stopped.
+    """
+
+    class Audience(models.TextChoices):
+        SUBSCRIBERS = "SUB", "Active subscribers"
+        DONORS = "DON", "Past donors"
+        EVERYONE = "ALL", "Subscribers and past donors"
+
+    class Status(models.TextChoices):
+        DRAFT = "DR", "Draft"
+        SENDING = "SN", "Sending"
+        DONE = "DN", "Done"
+
+    name = models.CharField(max_length=255)
+    audience = models.CharField(
+        max_length=3, choices=Audience.choices, default=Audience.EVERYONE
+    )
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True, default="")
+    status = models.CharField(
+        max_length=2, choices=Status.choices, default=Status.DRAFT
+    )
+    last_donor_id = models.UUIDField(blank=True, null=True)
+    sent_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return self.name
+
+    def get_recipients(self):
+        subscribers = Subscription.objects.filter(
+            donor=models.OuterRef("pk"), status="ACTIVE"
+        )
+        donations = Donation.objects.filter(donor=models.OuterRef("pk"))
+        if self.audience == self.Audience.SUBSCRIBERS:
+            condition = models.Exists(subscribers)
+        elif self.audience == self.Audience.DONORS:
+            condition = models.Exists(donations)
+        else:
+            condition = models.Exists(subscribers) | models.Exists(donations)
+        return Donor.objects.filter(condition)
+
+
+class DonationRollup(models.Model):
+    """
+    Donations summed by day, donor and plan, so reports read a few hundred
+    rows instead of every donation. Kept up to date by ``refresh_rollups``.
+    """
+
+    day = models.DateField()
+    donor = models.ForeignKey(Donor, on_delete=models.CASCADE, related_name="rollups")
+    # Empty for one-off donations
+    plan = models.ForeignKey(
+        Plan, on_delete=models.CASCADE, related_name="rollups", blank=True, null=True
+    )
+    is_recurring = models.BooleanField(default=False)
+    donation_count = models.PositiveIntegerField(default=0)
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "donor", "plan", "is_recurring"],
+                name="unique_donation_rollup",
+                nulls_distinct=False,
+            )
+        ]
+        indexes = [models.Index(fields=["day"])]
+
+    def __str__(self):
+        return f"{self.day}: {self.donor_id} - £{self.amount}"
+
+
+class SyncCursor(models.Model):
+    """
+    How far a periodic sync with PayPal got: the start of the window it is
+    in and the next page to fetch. Saved after every page, so a failed run
+    resumes where it stopped.
+    """
+
+    name = models.CharField(max_length=50, unique=True)
+    position = models.DateTimeField()
+    page = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.position:%Y-%m-%d %H:%M} page {self.page}"
@@ -0,0 +1,85 @@
+import logging
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+RESULT_FIELDS = ["status", "attempts", "error", "run_after", "sent_at"]
+
+
+def queue_mail(subject, message, from_email, recipient_list):
+    """
+    Takes the arguments of ``send_mail`` and stores the email for the
+    ``send_emails`` command instead of sending it in the request.
+    """
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(recipient_list),
+    )
+
+
+def claim_pending(batch_size=50):
+    """
+    Claims a batch of due emails by moving their ``run_after`` past the claim
+    timeout, the same way ``hub.media.claim_pending`` claims media tasks.
+    Locked rows are skipped so several workers can share the outbox, and the
+    locks are released as soon as the claim commits.
+    """
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.Status.PENDING, run_after__lte=timezone.now())
+            .order_by("id")[:batch_size]
+        )
+        OutboxEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+            run_after=timezone.now() + OutboxEmail.CLAIM_TIMEOUT
+        )
+    return emails
+
+
+def send_pending(batch_size=50):
+    """
+    Sends one batch of due emails over a single connection. Sending happens
+    outside of any transaction and each email records its result as soon as
+    it is sent, so a crash mid-batch never sends the same email twice.
+    Emails the provider rejects are retried later.
+    """
+    emails = claim_pending(batch_size)
+    if not emails:
+        return 0
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        logger.exception("Could not connect to the email provider.")
+        for email in emails:
+            email.fail(e)
+            email.save(update_fields=RESULT_FIELDS)
+    else:
+        try:
+            for email in emails:
+                send(email, connection)
+        finally:
+            connection.close()
+    return len(emails)
+
+
+def send(email, connection):
+    try:
+        email.build(connection).send()
+    except Exception as e:
+        logger.exception("Email %s failed.", email.pk)
+        email.fail(e)
+    else:
+        email.status = OutboxEmail.Status.DONE
+        email.error = ""
+        email.sent_at = timezone.now()
+    email.save(update_fields=RESULT_FIELDS)
@@ -0,0 +1,166 @@
+import logging
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Donation, Subscription, SyncCursor
+from .reports import refresh_rollups
+from .utils import get_client
+
+logger = logging.getLogger(__name__)
+
+CURSOR_NAME = "paypal_transactions"
+# PayPal makes transactions searchable up to three hours after they happen
+SETTLE_DELAY = timedelta(hours=3)
+# PayPal searches at most 31 days at a time
+MAX_WINDOW = timedelta(days=31)
+PAGE_SIZE = 500
+
+
+def fetch_page(start, end, page, page_size=PAGE_SIZE):
+    response = get_client().get(
+        "/v1/reporting/transactions",
+        params={
+            "start_date": start.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "end_date": end.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "transaction_status": "S",
+            "fields": "transaction_info,payer_info",
+            "page_size": page_size,
+            "page": page,
+        },
+    )
+    if response is None:
+        raise ValueError("Failed to fetch PayPal access token.")
+    response.raise_for_status()
+    return response.json()
+
+
+def sync_page(details):
+    """
+    Stores the subscription charges of one page that are not recorded yet,
+    reading the existing ones with one lookup on the unique transaction id.
+
+    One-off donations are skipped: they are recorded under the id of the
+    payment, which the transaction search does not return.
+
+    Returns the created donations.
+    """
+    charges = {}
+    for detail in details:
+        info = detail.get("transaction_info", {})
+        if info.get("paypal_reference_id_type") == "SUB" and info.get("transaction_id"):
+            charges[info["transaction_id"]] = info
+    if not charges:
+        return []
+
+    existing = set(
+        Donation.objects.filter(transaction_id__in=charges).values_list(
+            "transaction_id", flat=True
+        )
+    )
+    missing = {
+        transaction_id: info
+        for transaction_id, info in charges.items()
+        if transaction_id not in existing
+    }
+    subscriptions = Subscription.objects.filter(
+        subscription_id__in={info["paypal_reference_id"] for info in missing.values()}
+    ).only("id", "donor_id", "subscription_id")
+    subscriptions = {
+        subscription.subscription_id: subscription for subscription in subscriptions
+    }
+
+    donations = []
+    for transaction_id, info in missing.items():
+        subscription = subscriptions.get(info["paypal_reference_id"])
+        if subscription is None:
+            logger.warning(
+                "Skipping %s of unknown subscription %s.",
+                transaction_id,
+                info["paypal_reference_id"],
+            )
+            continue
+        donations.append(
+            Donation(
+                donor_id=subscription.donor_id,
+                subscription=subscription,
+                amount=info.get("transaction_amount", {}).get("value"),
+                transaction_id=transaction_id,
+                donated_at=parse_datetime(info.get("transaction_initiation_date", ""))
+                or timezone.now(),
+            )
+        )
+    return create_donations(donations)
+
+
+def create_donations(donations):
+    """
+    Inserts the donations and returns only the rows that were actually new.
+    Webhooks may store some of the same charges between the lookup above and
+    the insert; ``ignore_conflicts`` would hide those but still return them,
+    so a conflict drops the rows that now exist and inserts the rest again.
+    """
+    while donations:
+        try:
+            with transaction.atomic():
+                return Donation.objects.bulk_create(donations)
+        except IntegrityError:
+            existing = set(
+                Donation.objects.filter(
+                    transaction_id__in=[
+                        donation.transaction_id for donation in donations
+                    ]
+                ).values_list("transaction_id", flat=True)
+            )
+            if not existing:
+                raise
+            donations = [
+                donation
+                for donation in donations
+                if donation.transaction_id not in existing
+            ]
+    return []
+
+
+def reconcile(since=None, until=None, window=timedelta(days=1), page_size=PAGE_SIZE):
+    """
+    Walks PayPal's transactions from the saved cursor up to ``until``, one
+    window and page at a time, and stores the missing donations. ``since``
+    restarts the walk from that time. Returns the number of donations added.
+    """
+    window = min(window, MAX_WINDOW)
+    until = until or timezone.now() - SETTLE_DELAY
+    cursor, created = SyncCursor.objects.get_or_create(
+        name=CURSOR_NAME,
+        defaults={"position": since or until - timedelta(days=30)},
+    )
+    if since is not None and not created:
+        cursor.position = since
+        cursor.page = 1
+        cursor.save()
+
+    added = 0
+    first_day = None
+    while cursor.position < until:
+        end = min(cursor.position + window, until)
+        data = fetch_page(cursor.position, end, cursor.page, page_size)
+        with transaction.atomic():
+            donations = sync_page(data.get("transaction_details", []))
+            if cursor.page < data.get("total_pages", 1):
+                cursor.page += 1
+            else:
+                cursor.position = end
+                cursor.page = 1
+            cursor.save()
+
+        added += len(donations)
+        for donation in donations:
+            day = timezone.localdate(donation.donated_at)
+            first_day = day if first_day is None else min(first_day, day)
+        logger.info("Reconciled PayPal transactions up to %s.", cursor)
+
+    if first_day is not None:
+        refresh_rollups(since=first_day)
+    return added
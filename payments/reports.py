@@ -0,0 +1,115 @@
+import logging
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import Donation, DonationRollup
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_rollups(full=False, since=None):
+    """
+    Rebuilds the rollup rows from the day before the last summed day
+    onwards. Donations are stamped when they are saved, so only a donation
+    stamped just before midnight that commits after a run has summed the
+    next day reaches back, by one day at most; each run reads only the
+    donations of the last day or two. Callers that add donations to older
+    days, like the PayPal reconciliation, pass the first such day as
+    ``since``. Returns the number of rollup rows written.
+    """
+    with transaction.atomic():
+        donations = Donation.objects.all()
+        rollups = DonationRollup.objects.all()
+        last_day = None if full else rollups.aggregate(Max("day"))["day__max"]
+        if last_day is not None:
+            last_day -= timedelta(days=1)
+        if last_day is not None and since is not None:
+            last_day = min(last_day, since)
+        if last_day is not None:
+            start = timezone.make_aware(datetime.combine(last_day, time.min))
+            donations = donations.filter(donated_at__gte=start)
+            rollups = rollups.filter(day__gte=last_day)
+
+        groups = (
+            donations.annotate(day=TruncDate("donated_at"))
+            .values("day", "donor_id", "subscription__plan_id")
+            .annotate(
+                donation_count=Count("id"),
+                total=Sum("amount"),
+                recurring=Count("subscription_id"),
+            )
+            .order_by()
+        )
+        rows = [
+            DonationRollup(
+                day=group["day"],
+                donor_id=group["donor_id"],
+                plan_id=group["subscription__plan_id"],
+                is_recurring=group["recurring"] > 0,
+                donation_count=group["donation_count"],
+                amount=group["total"],
+            )
+            for group in groups.iterator()
+        ]
+        rollups.delete()
+        DonationRollup.objects.bulk_create(rows, batch_size=500)
+
+    logger.info("Refreshed %s donation rollup(s).", len(rows))
+    return len(rows)
+
+
+def get_totals():
+    return DonationRollup.objects.aggregate(
+        total=Sum("amount", default=0),
+        donation_count=Sum("donation_count", default=0),
+        donor_count=Count("donor", distinct=True),
+        recurring=Sum("amount", filter=Q(is_recurring=True), default=0),
+        one_off=Sum("amount", filter=Q(is_recurring=False), default=0),
+    )
+
+
+def get_monthly_totals(months=12):
+    since = (timezone.now() - timedelta(days=31 * (months - 1))).date().replace(day=1)
+    return (
+        DonationRollup.objects.filter(day__gte=since)
+        .annotate(month=TruncMonth("day"))
+        .values("month")
+        .annotate(
+            total=Sum("amount"),
+            donation_count=Sum("donation_count"),
+            recurring=Sum("amount", filter=Q(is_recurring=True), default=0),
+            one_off=Sum("amount", filter=Q(is_recurring=False), default=0),
+        )
+        .order_by("-month")
+    )
+
+
+def get_lifetime_values(limit=20):
+    """Returns the donors who gave the most, with their lifetime totals."""
+    return (
+        DonationRollup.objects.values(
+            "donor_id",
+            first_name=F("donor__first_name"),
+            last_name=F("donor__last_name"),
+            email=F("donor__email"),
+        )
+        .annotate(
+            total=Sum("amount"),
+            donation_count=Sum("donation_count"),
+            last_day=Max("day"),
+        )
+        .order_by("-total")[:limit]
+    )
+
+
+def get_average_lifetime_value():
+    per_donor = (
+        DonationRollup.objects.values("donor_id")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    return per_donor.aggregate(average=Avg("total", default=0))["average"]
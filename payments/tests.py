@@ -1,18 +1,55 @@
+import csv
 import json
 import logging
+import os
+import subprocess
+import sys
+import threading
 import uuid
+import zipfile
+from io import BytesIO, StringIO
+from xml.etree import ElementTree
 from unittest.mock import patch, MagicMock, Mock
 
 import requests
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
-from django.test import TestCase, Client
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
+from django.utils import timezone
 
+from payments.campaigns import send_campaign
+from payments.fake_paypal import make_server
+from payments.catalog import clear_cache, get_plan, get_product
 from payments.forms import CustomDonationForm
-from payments.models import Donor, Donation, Product, Plan, Subscription
-from payments.views import get_subscription_details
+from payments.models import (
+    Campaign,
+    Donor,
+    Donation,
+    DonationRollup,
+    OutboxEmail,
+    Product,
+    Plan,
+    Subscription,
+    SyncCursor,
+    WebhookEvent,
+)
+from payments.loadtest import summarize
+from payments.reconcile import reconcile, sync_page
+from payments.reports import get_lifetime_values, get_totals, refresh_rollups
+from payments.outbox import (
+    claim_pending as claim_outbox,
+    queue_mail,
+    send_pending as send_outbox,
+)
+from payments.utils import PayPalClient, get_api, get_api_url, get_client
+from payments.views import DonorPageView, get_subscription_details
+from payments.webhooks import process_pending as process_webhook_events
 
 User = get_user_model()
 
@@ -46,7 +83,7 @@ class CreateDonationViewTests(TestCase):
         self.assertTemplateUsed(response, "payments/donate.html")
         self.assertIsInstance(response.context["form"], CustomDonationForm)
 
-    @patch("payments.views.paypalrestsdk.Payment")
+    @patch("payments.views.new_payment")
     def test_valid_post_request_creates_payment(self, mock_payment):
         """
         Test POST request with valid data creates PayPal payment and redirects.
@@ -68,7 +105,7 @@ class CreateDonationViewTests(TestCase):
             fetch_redirect_response=False,
         )
 
-    @patch("payments.views.paypalrestsdk.Payment")
+    @patch("payments.views.new_payment")
     def test_invalid_post_request_returns_error(self, mock_payment):
         """
         Test POST request with invalid data shows an error message.
@@ -126,21 +163,21 @@ class CreateSubscriptionViewTests(TestCase):
         """Restore logger settings after each test."""
         self.logger.setLevel(logging.DEBUG)
 
-    @patch("payments.views.create_product")
-    @patch("payments.views.create_billing_plan")
+    @patch("payments.views.get_product")
+    @patch("payments.views.get_plan")
     @patch("payments.views.create_subscription_util")
     def test_valid_post_request_creates_subscription(
         self,
         mock_create_subscription_util,
-        mock_create_billing_plan,
-        mock_create_product,
+        mock_get_plan,
+        mock_get_product,
     ):
         """
         Test valid POST request creates a subscription and redirects to approval URL.
         """
         # Mock dependencies
-        mock_create_product.return_value = {"id": "product_123"}
-        mock_create_billing_plan.return_value = {"id": "plan_123"}
+        mock_get_product.return_value = {"id": "product_123"}
+        mock_get_plan.return_value = {"id": "plan_123"}
         mock_create_subscription_util.return_value = {
             "links": [{"rel": "approve", "href": "https://www.paypal.com/approval-url"}]
         }
@@ -149,10 +186,10 @@ class CreateSubscriptionViewTests(TestCase):
         response = self.client.post(self.url, self.data)
 
         # Assertions
-        mock_create_product.assert_called_once_with(
+        mock_get_product.assert_called_once_with(
             name="Recurring Donation", product_type="SERVICE", category="CHARITY"
         )
-        mock_create_billing_plan.assert_called_once_with(
+        mock_get_plan.assert_called_once_with(
             product={"id": "product_123"},
             name="Recurring Donation",
             amount=self.data["amount"],
@@ -169,49 +206,47 @@ class CreateSubscriptionViewTests(TestCase):
             fetch_redirect_response=False,
         )
 
-    @patch("payments.views.create_product")
-    def test_product_creation_failure_returns_error(self, mock_create_product):
+    @patch("payments.views.get_product")
+    def test_product_creation_failure_returns_error(self, mock_get_product):
         """
         Test if product creation failure returns 500 and error messages.
         """
-        mock_create_product.return_value = None  # Simulate failure
+        mock_get_product.return_value = None  # Simulate failure
 
         response = self.client.post(self.url, self.data)
 
         self.assertEqual(response.status_code, 500)
         self.assertJSONEqual(response.content, {"error": "Failed to create product"})
 
-    @patch("payments.views.create_product")
-    @patch("payments.views.create_billing_plan")
-    def test_plan_creation_failure_returns_error(
-        self, mock_create_billing_plan, mock_create_product
-    ):
+    @patch("payments.views.get_product")
+    @patch("payments.views.get_plan")
+    def test_plan_creation_failure_returns_error(self, mock_get_plan, mock_get_product):
         """
         Test if plan creation failure returns 500 and error message.
         """
-        mock_create_product.return_value = {"id": "product_123"}
-        mock_create_billing_plan.return_value = None  # Simulate failure
+        mock_get_product.return_value = {"id": "product_123"}
+        mock_get_plan.return_value = None  # Simulate failure
 
         response = self.client.post(self.url, self.data)
 
         self.assertEqual(response.status_code, 500)
         self.assertJSONEqual(response.content, {"error": "Failed to create plan"})
 
-    @patch("payments.views.create_product")
-    @patch("payments.views.create_billing_plan")
+    @patch("payments.views.get_product")
+    @patch("payments.views.get_plan")
     @patch("payments.views.create_subscription_util")
     def test_subscription_creation_failure_returns_error(
         self,
         mock_create_subscription_util,
-        mock_create_billing_plan,
-        mock_create_product,
+        mock_get_plan,
+        mock_get_product,
     ):
         """
         Test if subscription creation failure returns 500 and error message.
         """
         # Mock valid product and plan
-        mock_create_product.return_value = {"id": "product_123"}
-        mock_create_billing_plan.return_value = {"id": "plan_123"}
+        mock_get_product.return_value = {"id": "product_123"}
+        mock_get_plan.return_value = {"id": "plan_123"}
         mock_create_subscription_util.return_value = None  # Simulate failure
 
         response = self.client.post(self.url, self.data)
@@ -230,6 +265,71 @@ class CreateSubscriptionViewTests(TestCase):
         self.assertTemplateUsed(response, "payments/donate.html")
 
 
+class PlanCatalogTests(TestCase):
+    def setUp(self):
+        clear_cache()
+        self.addCleanup(clear_cache)
+        self.product = Product.objects.create(
+            product_id="PROD-1",
+            name="Recurring Donation",
+            type="SERVICE",
+            category="CHARITY",
+        )
+
+    def create_plan(self, plan_id, **kwargs):
+        return Plan.objects.create(
+            plan_id=plan_id,
+            product=self.product,
+            name="Recurring Donation",
+            amount="10.00",
+            interval_unit="MONTH",
+            interval_count=1,
+            **kwargs,
+        )
+
+    @patch("payments.catalog.create_product")
+    def test_existing_product_is_reused(self, mock_create_product):
+        product = get_product("Recurring Donation")
+
+        self.assertEqual(product, self.product)
+        mock_create_product.assert_not_called()
+
+    @patch("payments.catalog.create_billing_plan")
+    def test_existing_catalog_plan_is_reused(self, mock_create_billing_plan):
+        plan = self.create_plan("P-1", is_catalog=True)
+
+        self.assertEqual(
+            get_plan(self.product, "Recurring Donation", "10", "MONTH"), plan
+        )
+        mock_create_billing_plan.assert_not_called()
+
+    @patch("payments.catalog.create_billing_plan")
+    def test_missing_plan_is_created_once(self, mock_create_billing_plan):
+        mock_create_billing_plan.side_effect = lambda **kwargs: self.create_plan("P-2")
+
+        plan = get_plan(self.product, "Recurring Donation", "10.00", "MONTH")
+        self.assertTrue(Plan.objects.get(pk=plan.pk).is_catalog)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                get_plan(self.product, "Recurring Donation", "10.00", "MONTH"), plan
+            )
+        mock_create_billing_plan.assert_called_once()
+
+    @patch("payments.catalog.create_billing_plan")
+    def test_plans_outside_the_catalog_are_not_reused(self, mock_create_billing_plan):
+        self.create_plan("P-OLD")
+        mock_create_billing_plan.side_effect = lambda **kwargs: self.create_plan("P-3")
+
+        plan = get_plan(self.product, "Recurring Donation", "10.00", "MONTH")
+        self.assertEqual(plan.plan_id, "P-3")
+
+    def test_catalog_plan_is_unique_per_price(self):
+        self.create_plan("P-1", is_catalog=True)
+        with self.assertRaises(IntegrityError):
+            self.create_plan("P-2", is_catalog=True)
+
+
 class PaymentSuccessViewTests(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -253,10 +353,10 @@ class PaymentSuccessViewTests(TestCase):
         """Restore logger settings after each test."""
         self.logger.setLevel(logging.DEBUG)
 
-    @patch("payments.views.paypalrestsdk.Payment.find")
-    @patch("payments.views.send_mail")
+    @patch("payments.views.find_payment")
+    @patch("payments.views.queue_mail")
     def test_successful_payment_creates_donation(
-        self, mock_send_mail, mock_find_payment
+        self, mock_queue_mail, mock_find_payment
     ):
         """
         Test successful payment creates a donation and sends confirmation email.
@@ -295,7 +395,7 @@ class PaymentSuccessViewTests(TestCase):
         expected_from_email = settings.DEFAULT_FROM_EMAIL
 
         # Verify email sent
-        mock_send_mail.assert_called_once_with(
+        mock_queue_mail.assert_called_once_with(
             subject="Thank you for your donation!",
             message=(
                 f"Dear {donor.first_name},\n\n"
@@ -307,7 +407,7 @@ class PaymentSuccessViewTests(TestCase):
             recipient_list=[self.donor_email],
         )
 
-    @patch("payments.views.paypalrestsdk.Payment.find")
+    @patch("payments.views.find_payment")
     def test_payment_execution_failure_returns_error(self, mock_find_payment):
         """
         Test that payment execution failure renders error page.
@@ -330,7 +430,7 @@ class PaymentSuccessViewTests(TestCase):
         self.assertEqual(Donor.objects.count(), 0)
         self.assertEqual(Donation.objects.count(), 0)
 
-    @patch("payments.views.paypalrestsdk.Payment.find")
+    @patch("payments.views.find_payment")
     def test_invalid_payment_id_raises_error(self, mock_find_payment):
         """
         Test invalid payment ID raises an error and renders error page.
@@ -373,6 +473,188 @@ class PaymentSuccessViewTests(TestCase):
         self.assertContains(response, "error")
 
 
+class OutboxTests(TestCase):
+    def queue(self, to="john.doe@example.com"):
+        return queue_mail(
+            subject="Thank you for your donation!",
+            message="Dear John",
+            from_email=None,
+            recipient_list=[to],
+        )
+
+    def test_queued_email_is_sent_by_worker(self):
+        email = self.queue()
+        self.assertEqual(len(mail.outbox), 0)
+
+        call_command("send_emails", "--once", stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["john.doe@example.com"])
+        self.assertEqual(mail.outbox[0].from_email, settings.DEFAULT_FROM_EMAIL)
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.Status.DONE)
+        self.assertIsNotNone(email.sent_at)
+
+    def test_batch_shares_one_connection(self):
+        for index in range(3):
+            self.queue(f"donor{index}@example.com")
+
+        with patch("payments.outbox.get_connection", wraps=get_connection) as mock:
+            self.assertEqual(send_outbox(), 3)
+        mock.assert_called_once()
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_failed_email_is_retried_later(self):
+        email = self.queue()
+
+        with patch(
+            "django.core.mail.EmailMessage.send", side_effect=OSError("Throttled")
+        ), self.assertLogs("payments.outbox", level="ERROR"):
+            send_outbox()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.Status.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.error, "Throttled")
+        self.assertEqual(send_outbox(), 0)
+
+    def test_email_fails_after_max_attempts(self):
+        email = self.queue()
+        email.attempts = OutboxEmail.MAX_ATTEMPTS - 1
+        email.save()
+
+        with patch(
+            "django.core.mail.EmailMessage.send", side_effect=OSError("Rejected")
+        ), self.assertLogs("payments.outbox", level="ERROR"):
+            send_outbox()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.Status.FAILED)
+
+    def test_claimed_email_is_not_claimed_again(self):
+        email = self.queue()
+
+        self.assertEqual(claim_outbox(), [email])
+        self.assertEqual(claim_outbox(), [])
+        self.assertEqual(send_outbox(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_sent_email_is_recorded_before_the_next_is_sent(self):
+        first = self.queue("first@example.com")
+        self.queue("second@example.com")
+        statuses = []
+
+        def send(message):
+            statuses.append(OutboxEmail.objects.get(pk=first.pk).status)
+            return 1
+
+        with patch(
+            "django.core.mail.EmailMessage.send", autospec=True, side_effect=send
+        ):
+            send_outbox()
+
+        self.assertEqual(
+            statuses, [OutboxEmail.Status.PENDING, OutboxEmail.Status.DONE]
+        )
+
+
+class CampaignTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        product = Product.objects.create(
+            product_id="PROD-1",
+            name="Recurring Donation",
+            type="SERVICE",
+            category="CHARITY",
+        )
+        plan = Plan.objects.create(
+            plan_id="P-1",
+            product=product,
+            name="Recurring Donation",
+            amount="10.00",
+            interval_unit="MONTH",
+            interval_count=1,
+        )
+        cls.subscriber = Donor.objects.create(
+            first_name="John", email="john@example.com", language="en"
+        )
+        Subscription.objects.create(
+            subscription_id="SUB-1", plan=plan, donor=cls.subscriber, status="ACTIVE"
+        )
+        cls.donor = Donor.objects.create(
+            first_name="Olena", email="olena@example.com", language="uk"
+        )
+        Donation.objects.create(donor=cls.donor, amount="5.00", transaction_id="SALE-1")
+        Donor.objects.create(first_name="Nobody", email="nobody@example.com")
+
+    def create_campaign(self, **kwargs):
+        return Campaign.objects.create(
+            name="Appeal",
+            subject_en="Thank you, {{ donor.first_name }}",
+            subject_uk="Дякуємо, {{ donor.first_name }}",
+            body_en="Dear {{ donor.first_name }}",
+            **kwargs,
+        )
+
+    def test_audience_selects_recipients(self):
+        campaign = self.create_campaign(audience=Campaign.Audience.SUBSCRIBERS)
+        self.assertQuerySetEqual(campaign.get_recipients(), [self.subscriber])
+        campaign.audience = Campaign.Audience.DONORS
+        self.assertQuerySetEqual(campaign.get_recipients(), [self.donor])
+        campaign.audience = Campaign.Audience.EVERYONE
+        self.assertEqual(campaign.get_recipients().count(), 2)
+
+    def test_sends_in_donor_language(self):
+        campaign = self.create_campaign()
+
+        self.assertEqual(send_campaign(campaign), 2)
+
+        subjects = {message.to[0]: message.subject for message in mail.outbox}
+        self.assertEqual(subjects["john@example.com"], "Thank you, John")
+        self.assertEqual(subjects["olena@example.com"], "Дякуємо, Olena")
+        # Missing translations fall back to English
+        self.assertIn("Dear Olena", [message.body for message in mail.outbox])
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, Campaign.Status.DONE)
+        self.assertEqual(campaign.sent_count, 2)
+
+    def test_batches_share_one_connection(self):
+        campaign = self.create_campaign()
+
+        with patch("payments.campaigns.get_connection", wraps=get_connection) as mock:
+            send_campaign(campaign, batch_size=1)
+
+        mock.assert_called_once()
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_interrupted_send_resumes_after_last_donor(self):
+        campaign = self.create_campaign()
+        first, second = sorted([self.subscriber, self.donor], key=lambda d: d.pk)
+
+        with patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=[1, OSError("Connection lost")],
+        ), self.assertRaises(OSError):
+            send_campaign(campaign, batch_size=1)
+
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, Campaign.Status.SENDING)
+        self.assertEqual(campaign.last_donor_id, first.pk)
+        self.assertEqual(campaign.sent_count, 1)
+
+        call_command("send_campaign", campaign.pk, "--rate", "0", stdout=StringIO())
+
+        self.assertEqual([message.to for message in mail.outbox], [[second.email]])
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, Campaign.Status.DONE)
+        self.assertEqual(campaign.sent_count, 2)
+
+    def test_finished_campaign_is_not_sent_again(self):
+        campaign = self.create_campaign(status=Campaign.Status.DONE)
+        self.assertEqual(send_campaign(campaign), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+
 class PaymentCancelViewTests(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -456,63 +738,86 @@ class PayPalWebhookTests(TestCase):
         """Restore logger settings after each test."""
         self.logger.setLevel(logging.DEBUG)
 
-    def test_subscription_created_event(self):
-        """Test BILLING.SUBSCRIPTION.CREATED event handling."""
+    def post_event(self, event_type, resource, event_id=None, **extra):
         payload = {
-            "event_type": "BILLING.SUBSCRIPTION.CREATED",
-            "resource": {
+            "id": event_id or f"WH-{uuid.uuid4()}",
+            "event_type": event_type,
+            "resource": resource,
+            **extra,
+        }
+        return self.client.post(
+            self.url, data=json.dumps(payload), content_type="application/json"
+        )
+
+    def test_event_is_stored_and_applied_later(self):
+        """The endpoint only records the event."""
+        response = self.post_event(
+            "BILLING.SUBSCRIPTION.CREATED",
+            {
                 "id": "SUB-001",
                 "plan_id": self.plan.plan_id,
                 "subscriber": {"email_address": self.donor.email},
             },
-        }
-
-        response = self.client.post(
-            self.url, data=json.dumps(payload), content_type="application/json"
         )
 
-        # Assertions
         self.assertEqual(response.status_code, 200)
-        self.assertJSONEqual(response.content, {"status": "subscription_created"})
-        self.assertEqual(Subscription.objects.count(), 1)
+        self.assertJSONEqual(response.content, {"status": "received"})
+        self.assertEqual(Subscription.objects.count(), 0)
 
-        # Verify Subscription Details
-        subscription = Subscription.objects.first()
-        self.assertEqual(subscription.subscription_id, "SUB-001")
-        self.assertEqual(subscription.plan, self.plan)
+        self.assertEqual(process_webhook_events(), 1)
+        subscription = Subscription.objects.get(subscription_id="SUB-001")
         self.assertEqual(subscription.donor, self.donor)
         self.assertEqual(subscription.status, "ACTIVE")
 
-    def test_subscription_cancelled_event(self):
-        """Test BILLING.SUBSCRIPTION.CANCELLED event handling."""
-        # Create an active subscription
-        subscription = Subscription.objects.create(
+    def test_redelivered_event_is_stored_once(self):
+        resource = {
+            "id": "SUB-001",
+            "plan_id": self.plan.plan_id,
+            "subscriber": {"email_address": self.donor.email},
+        }
+        self.post_event("BILLING.SUBSCRIPTION.CREATED", resource, "WH-1")
+        response = self.post_event("BILLING.SUBSCRIPTION.CREATED", resource, "WH-1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(WebhookEvent.objects.count(), 1)
+
+    def test_created_event_for_existing_subscription_is_idempotent(self):
+        Subscription.objects.create(
             subscription_id="SUB-001",
             plan=self.plan,
             donor=self.donor,
             status="ACTIVE",
         )
+        self.post_event(
+            "BILLING.SUBSCRIPTION.CREATED",
+            {
+                "id": "SUB-001",
+                "plan_id": self.plan.plan_id,
+                "subscriber": {"email_address": self.donor.email},
+            },
+        )
 
-        payload = {
-            "event_type": "BILLING.SUBSCRIPTION.CANCELLED",
-            "resource": {"id": "SUB-001"},
-        }
+        process_webhook_events()
+        self.assertEqual(WebhookEvent.objects.get().status, WebhookEvent.Status.DONE)
+        self.assertEqual(Subscription.objects.count(), 1)
 
-        response = self.client.post(
-            self.url, data=json.dumps(payload), content_type="application/json"
+    def test_subscription_cancelled_event(self):
+        """Test BILLING.SUBSCRIPTION.CANCELLED event handling."""
+        subscription = Subscription.objects.create(
+            subscription_id="SUB-001",
+            plan=self.plan,
+            donor=self.donor,
+            status="ACTIVE",
         )
 
-        # Assertions
-        self.assertEqual(response.status_code, 200)
-        self.assertJSONEqual(response.content, {"status": "subscription_cancelled"})
+        self.post_event("BILLING.SUBSCRIPTION.CANCELLED", {"id": "SUB-001"})
+        process_webhook_events()
 
-        # Verify Subscription Status
         subscription.refresh_from_db()
         self.assertEqual(subscription.status, "CANCELLED")
 
     def test_subscription_suspended_event(self):
         """Test BILLING.SUBSCRIPTION.SUSPENDED event handling."""
-        # Create an active subscription
         subscription = Subscription.objects.create(
             subscription_id="SUB-001",
             plan=self.plan,
@@ -520,52 +825,88 @@ class PayPalWebhookTests(TestCase):
             status="ACTIVE",
         )
 
-        payload = {
-            "event_type": "BILLING.SUBSCRIPTION.SUSPENDED",
-            "resource": {"id": "SUB-001"},
-        }
+        self.post_event("BILLING.SUBSCRIPTION.SUSPENDED", {"id": "SUB-001"})
+        process_webhook_events()
 
-        response = self.client.post(
-            self.url, data=json.dumps(payload), content_type="application/json"
-        )
+        subscription.refresh_from_db()
+        self.assertEqual(subscription.status, "SUSPENDED")
 
-        # Assertions
-        self.assertEqual(response.status_code, 200)
-        self.assertJSONEqual(response.content, {"status": "subscription_suspended"})
+    def test_events_are_applied_in_order_per_subscription(self):
+        subscription = Subscription.objects.create(
+            subscription_id="SUB-001",
+            plan=self.plan,
+            donor=self.donor,
+            status="ACTIVE",
+        )
+        # Delivered out of order
+        self.post_event(
+            "BILLING.SUBSCRIPTION.ACTIVATED",
+            {"id": "SUB-001"},
+            create_time="2024-01-02T00:00:00Z",
+        )
+        self.post_event(
+            "BILLING.SUBSCRIPTION.SUSPENDED",
+            {"id": "SUB-001"},
+            create_time="2024-01-01T00:00:00Z",
+        )
 
-        # Verify Subscription Status
+        self.assertEqual(process_webhook_events(), 1)
         subscription.refresh_from_db()
         self.assertEqual(subscription.status, "SUSPENDED")
 
-    def test_payment_completed_event(self):
+        self.assertEqual(process_webhook_events(), 1)
+        subscription.refresh_from_db()
+        self.assertEqual(subscription.status, "ACTIVE")
+
+    def test_payment_completed_event_records_donation(self):
         """Test PAYMENT.SALE.COMPLETED event handling."""
-        payload = {
-            "event_type": "PAYMENT.SALE.COMPLETED",
-            "resource": {
-                "billing_agreement_id": "SUB-001",
+        subscription = Subscription.objects.create(
+            subscription_id="SUB-001",
+            plan=self.plan,
+            donor=self.donor,
+            status="ACTIVE",
+        )
+        resource = {
+            "id": "SALE-001",
+            "billing_agreement_id": "SUB-001",
+            "amount": {"total": "10.00", "currency": "GBP"},
+        }
+        self.post_event("PAYMENT.SALE.COMPLETED", resource)
+        self.post_event("PAYMENT.SALE.COMPLETED", resource)
+
+        call_command("process_webhooks", "--once", stdout=StringIO())
+        call_command("process_webhooks", "--once", stdout=StringIO())
+
+        donation = Donation.objects.get()
+        self.assertEqual(donation.transaction_id, "SALE-001")
+        self.assertEqual(donation.subscription, subscription)
+        self.assertEqual(donation.donor, self.donor)
+
+    def test_failed_event_is_retried_later(self):
+        self.post_event(
+            "PAYMENT.SALE.COMPLETED",
+            {
+                "id": "SALE-001",
+                "billing_agreement_id": "SUB-UNKNOWN",
                 "amount": {"total": "10.00", "currency": "GBP"},
             },
-        }
-
-        response = self.client.post(
-            self.url, data=json.dumps(payload), content_type="application/json"
         )
 
-        # Assertions
-        self.assertEqual(response.status_code, 200)
-        self.assertJSONEqual(response.content, {"status": "payment_completed"})
+        with self.assertLogs("payments.webhooks", level="ERROR"):
+            process_webhook_events()
+
+        event = WebhookEvent.objects.get()
+        self.assertEqual(event.status, WebhookEvent.Status.PENDING)
+        self.assertEqual(event.attempts, 1)
+        self.assertGreater(event.run_after, event.received_at)
+        self.assertEqual(process_webhook_events(), 0)
 
     def test_unhandled_event_type(self):
         """Test unhandled event type is ignored."""
-        payload = {"event_type": "UNKNOWN.EVENT", "resource": {}}
-
-        response = self.client.post(
-            self.url, data=json.dumps(payload), content_type="application/json"
-        )
+        self.post_event("UNKNOWN.EVENT", {})
+        process_webhook_events()
 
-        # Assertions
-        self.assertEqual(response.status_code, 200)
-        self.assertJSONEqual(response.content, {"status": "event_ignored"})
+        self.assertEqual(WebhookEvent.objects.get().status, WebhookEvent.Status.DONE)
 
     def test_invalid_json_payload(self):
         """Test invalid JSON payload returns 400."""
@@ -585,15 +926,19 @@ class PayPalWebhookTests(TestCase):
 
 
 class GetSubscriptionDetailsTests(TestCase):
-    @patch("payments.utils.requests.get")
-    @patch("payments.views.get_access_token")
-    def test_get_subscription_details_success(self, mock_get_access_token, mock_get):
+    def setUp(self):
+        token_patcher = patch(
+            "payments.utils.PayPalClient.get_access_token",
+            return_value="mock_access_token",
+        )
+        self.mock_get_access_token = token_patcher.start()
+        self.addCleanup(token_patcher.stop)
+
+    @patch("payments.utils.requests.Session.request")
+    def test_get_subscription_details_success(self, mock_request):
         """
         Test that subscription details are fetched successfully.
         """
-        # Mock the access token
-        mock_get_access_token.return_value = "mock_access_token"
-
         # Mock the response for the GET request
         mock_response = Mock()
         mock_response.status_code = 200
@@ -602,7 +947,7 @@ class GetSubscriptionDetailsTests(TestCase):
             "status": "ACTIVE",
             "plan_id": "P-12345",
         }
-        mock_get.return_value = mock_response
+        mock_request.return_value = mock_response
 
         # Call the function under test
         response = get_subscription_details("I-SUB12345")
@@ -613,57 +958,180 @@ class GetSubscriptionDetailsTests(TestCase):
         self.assertEqual(response["plan_id"], "P-12345")
 
         # Verify the mocks were called correctly
-        mock_get_access_token.assert_called_once()  # Confirm token was fetched
-        mock_get.assert_called_once_with(
+        self.mock_get_access_token.assert_called_once()  # Confirm token was fetched
+        mock_request.assert_called_once_with(
+            "GET",
             "https://api-m.sandbox.paypal.com/v1/billing/subscriptions/I-SUB12345",
             headers={"Authorization": "Bearer mock_access_token"},
+            timeout=PayPalClient.timeout,
         )
 
-    @patch("payments.views.get_access_token")
-    @patch("payments.utils.requests.get")
-    def test_get_subscription_details_not_found(self, mock_get, mock_get_access_token):
+    @patch("payments.utils.requests.Session.request")
+    def test_get_subscription_details_not_found(self, mock_request):
         """
         Test that 404 Not Found raises an HTTPError.
         """
-        # Mock access token retrieval
-        mock_get_access_token.return_value = "mock_access_token"
-
         # Mock API response
         mock_response = Mock()
+        mock_response.status_code = 404
         mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(
             "404 Client Error: Not Found for url"
         )
-        mock_get.return_value = mock_response
+        mock_request.return_value = mock_response
 
         # Test function
         with self.assertRaises(requests.exceptions.HTTPError):
             get_subscription_details("invalid_id")
 
         # Verify mocks
-        mock_get_access_token.assert_called_once()
-        mock_get.assert_called_once()
+        self.mock_get_access_token.assert_called_once()
+        mock_request.assert_called_once()
 
-    @patch("payments.views.get_access_token")
-    @patch("payments.utils.requests.get")
-    def test_get_subscription_details_network_error(
-        self, mock_get, mock_get_access_token
-    ):
+    @patch("payments.utils.requests.Session.request")
+    def test_get_subscription_details_network_error(self, mock_request):
         """
         Test network error raises RequestException.
         """
-        # Mock access token retrieval
-        mock_get_access_token.return_value = "mock_access_token"
-
         # Simulate network error
-        mock_get.side_effect = requests.exceptions.RequestException("Network Error")
+        mock_request.side_effect = requests.exceptions.RequestException("Network Error")
 
         # Test function
         with self.assertRaises(requests.exceptions.RequestException):
             get_subscription_details("I-SUB12345")
 
         # Verify mocks
-        mock_get_access_token.assert_called_once()
-        mock_get.assert_called_once()
+        self.mock_get_access_token.assert_called_once()
+        mock_request.assert_called_once()
+
+
+class PayPalClientTests(TestCase):
+    def setUp(self):
+        self.client = PayPalClient("id", "secret", "https://paypal.test")
+        self.token_response = Mock(status_code=200)
+        self.token_response.json.return_value = {
+            "access_token": "token",
+            "expires_in": 32400,
+        }
+
+    @patch("payments.utils.requests.Session.post")
+    def test_access_token_is_cached(self, mock_post):
+        mock_post.return_value = self.token_response
+
+        self.assertEqual(self.client.get_access_token(), "token")
+        self.assertEqual(self.client.get_access_token(), "token")
+        mock_post.assert_called_once()
+
+    @patch("payments.utils.time.monotonic")
+    @patch("payments.utils.requests.Session.post")
+    def test_access_token_is_refreshed_before_expiry(self, mock_post, mock_monotonic):
+        mock_post.return_value = self.token_response
+        mock_monotonic.return_value = 1000
+        self.client.get_access_token()
+
+        mock_monotonic.return_value = 1000 + 32400 - PayPalClient.token_margin
+        self.client.get_access_token()
+        self.assertEqual(mock_post.call_count, 2)
+
+    @patch("payments.utils.requests.Session.request")
+    @patch("payments.utils.requests.Session.post")
+    def test_rejected_token_is_refreshed_once(self, mock_post, mock_request):
+        mock_post.return_value = self.token_response
+        mock_request.side_effect = [Mock(status_code=401), Mock(status_code=200)]
+
+        response = self.client.get("/v1/billing/subscriptions/I-SUB12345")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_post.call_count, 2)
+
+    @patch("payments.utils.requests.Session.request")
+    @patch("payments.utils.requests.Session.post")
+    def test_post_sends_request_id_and_timeout(self, mock_post, mock_request):
+        mock_post.return_value = self.token_response
+        mock_request.return_value = Mock(status_code=201)
+
+        self.client.post("/v1/catalogs/products", json={"name": "Donation"})
+        kwargs = mock_request.call_args.kwargs
+        self.assertIn("PayPal-Request-Id", kwargs["headers"])
+        self.assertEqual(kwargs["timeout"], PayPalClient.timeout)
+
+    def test_session_retries_with_backoff(self):
+        adapter = self.client.session.get_adapter("https://paypal.test")
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+
+
+class SdkLoadingTests(TestCase):
+    def test_url_conf_does_not_import_sdk(self):
+        code = (
+            "import sys, django; django.setup(); "
+            "from django.urls import resolve; resolve('/en/payments/donate/'); "
+            "print('paypalrestsdk' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "django_project.settings"},
+        )
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "False")
+
+
+class FakePayPalTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = make_server(port=0)
+        cls.url = "http://%s:%s" % cls.server.server_address[:2]
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+
+    def test_payment_checkout_through_views(self):
+        with override_settings(PAYPAL_API_URL=self.url, PAYPAL_MODE="sandbox"):
+            response = self.client.post(reverse("create_donation"), {"amount": "25"})
+            self.assertEqual(response.status_code, 302)
+            self.assertIn("PayerID=", response.url)
+
+            response = self.client.get(response.url, follow=True)
+
+        self.assertTemplateUsed(response, "payments/success.html")
+        donation = Donation.objects.get()
+        self.assertEqual(str(donation.amount), "25.00")
+        self.assertEqual(donation.donor.email, "donor@example.com")
+
+    def test_subscription_round_trip(self):
+        client = PayPalClient("id", "secret", self.url)
+        response = client.post(
+            "/v1/billing/subscriptions", json={"plan_id": "P-1", "subscriber": {}}
+        )
+        self.assertEqual(response.status_code, 201)
+
+        details = client.get(f"/v1/billing/subscriptions/{response.json()['id']}")
+        self.assertEqual(details.json()["status"], "ACTIVE")
+        self.assertEqual(details.json()["plan_id"], "P-1")
+
+    def test_failure_rate(self):
+        self.server.paypal.failure_rate = 1
+        self.addCleanup(setattr, self.server.paypal, "failure_rate", 0)
+
+        response = requests.post(f"{self.url}/v1/oauth2/token")
+
+        self.assertEqual(response.status_code, 503)
+
+    def test_api_url_setting_overrides_mode(self):
+        self.assertEqual(get_api_url(), "https://api-m.sandbox.paypal.com")
+        with override_settings(PAYPAL_API_URL=self.url):
+            self.assertEqual(get_api_url(), self.url)
+            self.assertEqual(get_client().base_url, self.url)
+            self.assertEqual(get_api().endpoint, self.url)
+        self.assertEqual(get_client().base_url, "https://api-m.sandbox.paypal.com")
+
+    def test_summarize_percentiles(self):
+        summary = summarize([index / 1000 for index in range(1, 101)])
+        self.assertEqual(summary["count"], 100)
+        self.assertAlmostEqual(summary["p50"], 0.0505)
+        self.assertAlmostEqual(summary["p99"], 0.09901)
+        self.assertEqual(summary["max"], 0.1)
+        self.assertEqual(summarize([])["count"], 0)
 
 
 class SubscriptionSuccessViewTests(TestCase):
@@ -698,9 +1166,9 @@ class SubscriptionSuccessViewTests(TestCase):
         self.logger.setLevel(logging.DEBUG)
 
     @patch("payments.views.get_subscription_details")
-    @patch("payments.views.send_mail")
+    @patch("payments.views.queue_mail")
     def test_subscription_success_creates_subscription_and_sends_email(
-        self, mock_send_mail, mock_get_subscription_details
+        self, mock_queue_mail, mock_get_subscription_details
     ):
         """
         Verify that a subscription is created and an email is sent after successful processing.
@@ -725,7 +1193,7 @@ class SubscriptionSuccessViewTests(TestCase):
         self.assertEqual(subscription.status, "ACTIVE")
         self.assertEqual(subscription.donor.email, "john.doe@example.com")
 
-        mock_send_mail.assert_called_once_with(
+        mock_queue_mail.assert_called_once_with(
             subject="Thank you for subscribing!",
             message=(
                 "Dear Unknown,\n\n"
@@ -856,3 +1324,394 @@ class DonorPageViewTests(TestCase):
         response = self.client.get(self.url)
         self.assertContains(response, "Doe, John")
         self.assertContains(response, "john.doe@example.com")
+
+    def test_total_covers_every_donation(self):
+        for index in range(3):
+            Donation.objects.create(
+                donor=self.donor, amount="10.00", transaction_id=f"SALE-{index}"
+            )
+        self.client.login(username="testuser", password="password")
+
+        with patch.object(DonorPageView, "paginate_donations", 2):
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.context["donations"]), 2)
+        self.assertEqual(response.context["donation_count"], 3)
+        self.assertContains(response, "£30.00")
+
+
+class DonationReportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        product = Product.objects.create(
+            product_id="PROD-1",
+            name="Recurring Donation",
+            type="SERVICE",
+            category="CHARITY",
+        )
+        cls.plan = Plan.objects.create(
+            plan_id="P-1",
+            product=product,
+            name="Recurring Donation",
+            amount="10.00",
+            interval_unit="MONTH",
+            interval_count=1,
+        )
+        cls.john = Donor.objects.create(
+            first_name="John", last_name="Doe", email="john@example.com"
+        )
+        cls.jane = Donor.objects.create(
+            first_name="Jane", last_name="Roe", email="jane@example.com"
+        )
+        cls.subscription = Subscription.objects.create(
+            subscription_id="SUB-1", plan=cls.plan, donor=cls.john, status="ACTIVE"
+        )
+        cls.user = User.objects.create_user(username="owner", password="password")
+        cls.user.user_permissions.add(Permission.objects.get(codename="view_donation"))
+
+    def donate(self, donor, amount, days_ago=0, subscription=None):
+        donation = Donation.objects.create(
+            donor=donor,
+            amount=amount,
+            transaction_id=str(uuid.uuid4()),
+            subscription=subscription,
+        )
+        donated_at = timezone.now() - timezone.timedelta(days=days_ago)
+        Donation.objects.filter(pk=donation.pk).update(donated_at=donated_at)
+        return donation
+
+    def test_rollups_sum_by_day_donor_and_plan(self):
+        self.donate(self.john, "10.00", days_ago=40, subscription=self.subscription)
+        self.donate(self.john, "10.00", days_ago=10, subscription=self.subscription)
+        self.donate(self.john, "5.00", days_ago=10)
+        self.donate(self.jane, "20.00", days_ago=10)
+        self.donate(self.jane, "30.00", days_ago=10)
+
+        self.assertEqual(refresh_rollups(), 4)
+
+        jane = DonationRollup.objects.get(donor=self.jane)
+        self.assertEqual(jane.donation_count, 2)
+        self.assertEqual(str(jane.amount), "50.00")
+        self.assertFalse(jane.is_recurring)
+        totals = get_totals()
+        self.assertEqual(str(totals["total"]), "75.00")
+        self.assertEqual(str(totals["recurring"]), "20.00")
+        self.assertEqual(str(totals["one_off"]), "55.00")
+        self.assertEqual(totals["donation_count"], 5)
+        self.assertEqual(totals["donor_count"], 2)
+        top = list(get_lifetime_values())
+        self.assertEqual(
+            [donor["email"] for donor in top], [self.jane.email, self.john.email]
+        )
+
+    def test_refresh_reads_from_last_day_onwards(self):
+        old = self.donate(self.jane, "20.00", days_ago=10)
+        self.donate(self.jane, "10.00", days_ago=5)
+        refresh_rollups()
+        # Days before the last summed one are final, so they are not reread
+        Donation.objects.filter(pk=old.pk).update(amount="99.00")
+        self.donate(self.jane, "5.00", days_ago=5)
+        self.donate(self.jane, "5.00")
+
+        refresh_rollups()
+
+        rollups = DonationRollup.objects.order_by("day")
+        amounts = [str(amount) for amount in rollups.values_list("amount", flat=True)]
+        self.assertEqual(amounts, ["20.00", "15.00", "5.00"])
+
+        refresh_rollups(full=True)
+        amounts = [str(amount) for amount in rollups.values_list("amount", flat=True)]
+        self.assertEqual(amounts, ["99.00", "15.00", "5.00"])
+
+    def test_refresh_rereads_the_day_before_the_last(self):
+        self.donate(self.jane, "10.00", days_ago=1)
+        self.donate(self.jane, "20.00")
+        refresh_rollups()
+        # Stamped before midnight, committed after the next day was summed
+        self.donate(self.john, "5.00", days_ago=1)
+
+        refresh_rollups()
+
+        self.assertEqual(str(get_totals()["total"]), "35.00")
+
+    def test_refresh_is_repeatable(self):
+        self.donate(self.jane, "20.00")
+        call_command("refresh_rollups", stdout=StringIO())
+        call_command("refresh_rollups", stdout=StringIO())
+        self.assertEqual(DonationRollup.objects.get().donation_count, 1)
+
+    def test_report_requires_permission(self):
+        url = reverse("donation_report")
+        User.objects.create_user(username="visitor", password="password")
+        self.client.login(username="visitor", password="password")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_report_reads_rollups(self):
+        self.donate(self.john, "10.00", subscription=self.subscription)
+        self.donate(self.jane, "20.00")
+        refresh_rollups()
+        self.client.login(username="owner", password="password")
+
+        response = self.client.get(reverse("donation_report"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "payments/report.html")
+        self.assertEqual(str(response.context["totals"]["total"]), "30.00")
+        self.assertEqual(response.context["average_lifetime_value"], 15)
+        self.assertEqual(len(response.context["months"]), 1)
+        self.assertContains(response, "Roe, Jane")
+
+
+class ReconcileTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        product = Product.objects.create(
+            product_id="PROD-1",
+            name="Recurring Donation",
+            type="SERVICE",
+            category="CHARITY",
+        )
+        plan = Plan.objects.create(
+            plan_id="P-1",
+            product=product,
+            name="Recurring Donation",
+            amount="10.00",
+            interval_unit="MONTH",
+            interval_count=1,
+        )
+        cls.donor = Donor.objects.create(first_name="John", email="john@example.com")
+        cls.subscription = Subscription.objects.create(
+            subscription_id="I-1", plan=plan, donor=cls.donor, status="ACTIVE"
+        )
+        cls.until = timezone.now()
+        cls.since = cls.until - timezone.timedelta(days=2)
+
+    def charge(self, transaction_id, reference="I-1", reference_type="SUB"):
+        return {
+            "transaction_info": {
+                "transaction_id": transaction_id,
+                "paypal_reference_id": reference,
+                "paypal_reference_id_type": reference_type,
+                "transaction_initiation_date": "2024-11-05T10:00:00+0000",
+                "transaction_amount": {"currency_code": "GBP", "value": "10.00"},
+            }
+        }
+
+    def page(self, *details, total_pages=1):
+        return {"transaction_details": list(details), "total_pages": total_pages}
+
+    @patch("payments.reconcile.fetch_page")
+    def test_missing_charges_are_added(self, mock_fetch):
+        Donation.objects.create(
+            donor=self.donor, amount="10.00", transaction_id="SALE-1"
+        )
+        mock_fetch.side_effect = [
+            self.page(
+                self.charge("SALE-1"),
+                self.charge("SALE-2"),
+                self.charge("SALE-3", reference="I-UNKNOWN"),
+                self.charge("PAYID-1", reference="", reference_type=""),
+            ),
+            self.page(),
+        ]
+
+        with self.assertLogs("payments.reconcile", level="WARNING"):
+            added = reconcile(since=self.since, until=self.until)
+
+        self.assertEqual(added, 1)
+        self.assertEqual(mock_fetch.call_count, 2)
+        donation = Donation.objects.get(transaction_id="SALE-2")
+        self.assertEqual(donation.subscription, self.subscription)
+        self.assertEqual(donation.donated_at.isoformat(), "2024-11-05T10:00:00+00:00")
+        self.assertEqual(Donation.objects.count(), 2)
+        # Rollups include the past day the charge belongs to
+        self.assertTrue(
+            DonationRollup.objects.filter(day="2024-11-05", is_recurring=True).exists()
+        )
+
+    @patch("payments.reconcile.fetch_page")
+    def test_pages_are_checkpointed(self, mock_fetch):
+        mock_fetch.side_effect = [
+            self.page(self.charge("SALE-1"), total_pages=2),
+            requests.ConnectionError("Connection reset"),
+        ]
+
+        with self.assertRaises(requests.ConnectionError):
+            reconcile(since=self.since, until=self.until)
+
+        self.assertTrue(Donation.objects.filter(transaction_id="SALE-1").exists())
+        cursor = SyncCursor.objects.get()
+        self.assertEqual(cursor.position, self.since)
+        self.assertEqual(cursor.page, 2)
+
+        mock_fetch.reset_mock(side_effect=True)
+        mock_fetch.side_effect = [
+            self.page(self.charge("SALE-2"), total_pages=2),
+            self.page(),
+        ]
+        self.assertEqual(reconcile(until=self.until), 1)
+
+        first_call = mock_fetch.call_args_list[0].args
+        self.assertEqual(
+            first_call[:3], (self.since, self.since + timezone.timedelta(days=1), 2)
+        )
+        cursor.refresh_from_db()
+        self.assertEqual(cursor.position, self.until)
+        self.assertEqual(cursor.page, 1)
+
+    @patch("payments.reconcile.fetch_page")
+    def test_second_run_over_the_same_page_adds_nothing(self, mock_fetch):
+        mock_fetch.side_effect = lambda *args: self.page(self.charge("SALE-1"))
+
+        self.assertEqual(reconcile(since=self.since, until=self.until), 1)
+        with patch("payments.reconcile.refresh_rollups") as mock_refresh:
+            self.assertEqual(reconcile(since=self.since, until=self.until), 0)
+        mock_refresh.assert_not_called()
+        self.assertEqual(Donation.objects.count(), 1)
+
+    def test_charges_stored_concurrently_are_not_counted(self):
+        lookup = Subscription.objects.filter
+
+        def webhook_stores_sale_1(*args, **kwargs):
+            Donation.objects.create(
+                donor=self.donor, amount="10.00", transaction_id="SALE-1"
+            )
+            return lookup(*args, **kwargs)
+
+        with patch.object(
+            Subscription.objects, "filter", side_effect=webhook_stores_sale_1
+        ):
+            donations = sync_page([self.charge("SALE-1"), self.charge("SALE-2")])
+
+        self.assertEqual(
+            [donation.transaction_id for donation in donations], ["SALE-2"]
+        )
+        self.assertEqual(Donation.objects.count(), 2)
+
+    @patch("payments.reconcile.fetch_page")
+    def test_command_restarts_from_since(self, mock_fetch):
+        SyncCursor.objects.create(name="paypal_transactions", position=self.until)
+        mock_fetch.return_value = self.page()
+
+        out = StringIO()
+        call_command(
+            "reconcile_paypal",
+            "--since",
+            (timezone.now() - timezone.timedelta(days=2)).isoformat(),
+            stdout=out,
+        )
+
+        self.assertTrue(mock_fetch.called)
+        self.assertIn("Added 0 donation(s).", out.getvalue())
+
+
+class ExportViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="owner", password="password")
+        cls.user.user_permissions.add(
+            *Permission.objects.filter(
+                codename__in=["view_donor", "view_donation", "view_subscription"]
+            )
+        )
+        cls.donor = Donor.objects.create(
+            first_name="John", last_name="Doe", email="john@example.com"
+        )
+        for index, day in enumerate(["2024-04-05", "2024-04-06", "2025-04-05"]):
+            Donation.objects.create(
+                donor=cls.donor,
+                amount="10.00",
+                transaction_id=f"SALE-{index}",
+                donated_at=timezone.make_aware(
+                    timezone.datetime.fromisoformat(f"{day}T12:00:00")
+                ),
+            )
+
+    def setUp(self):
+        self.client.login(username="owner", password="password")
+
+    def export(self, name, **params):
+        return self.client.get(reverse("export", args=[name]), params)
+
+    def test_csv_streams_rows_in_range(self):
+        response = self.export("donations", start="2024-04-06", end="2025-04-05")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn(
+            'filename="donations-2024-04-06-2025-04-05.csv"',
+            response["Content-Disposition"],
+        )
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.reader(StringIO(content)))
+        self.assertEqual(rows[0][:3], ["Transaction ID", "Date", "Amount"])
+        self.assertEqual([row[0] for row in rows[1:]], ["SALE-1", "SALE-2"])
+        self.assertEqual(rows[1][5], "john@example.com")
+
+    def test_xlsx_is_a_valid_workbook(self):
+        response = self.export("donations", format="xlsx")
+
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(BytesIO(b"".join(response.streaming_content)))
+        self.assertIn("xl/workbook.xml", archive.namelist())
+        sheet = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+        namespace = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+        rows = sheet.findall(f"{namespace}sheetData/{namespace}row")
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(
+            rows[1].find(f"{namespace}c/{namespace}is/{namespace}t").text, "SALE-0"
+        )
+
+    def test_subscriptions_join_plan(self):
+        product = Product.objects.create(
+            product_id="PROD-1",
+            name="Recurring Donation",
+            type="SERVICE",
+            category="CHARITY",
+        )
+        plan = Plan.objects.create(
+            plan_id="P-1",
+            product=product,
+            name="Monthly",
+            amount="10.00",
+            interval_unit="MONTH",
+            interval_count=1,
+        )
+        Subscription.objects.create(
+            subscription_id="I-1", plan=plan, donor=self.donor, status="ACTIVE"
+        )
+
+        content = b"".join(self.export("subscriptions").streaming_content).decode()
+
+        self.assertIn("I-1,ACTIVE,", content)
+        self.assertIn("john@example.com,Monthly,10.00,GBP,MONTH,1", content)
+
+    def test_csv_neutralizes_formulas(self):
+        Donor.objects.create(
+            first_name="=HYPERLINK(\"http://example.com\")",
+            last_name="-2+3",
+            email="@donor@example.com",
+        )
+
+        content = b"".join(self.export("donors").streaming_content).decode()
+
+        row = list(csv.reader(StringIO(content)))[-1]
+        self.assertEqual(
+            row[1:4],
+            [
+                "'=HYPERLINK(\"http://example.com\")",
+                "'-2+3",
+                "'@donor@example.com",
+            ],
+        )
+
+    def test_requires_permission_for_the_model(self):
+        User.objects.create_user(username="visitor", password="password")
+        self.client.login(username="visitor", password="password")
+        self.assertEqual(self.export("donors").status_code, 403)
+
+    def test_unknown_export_or_bad_dates(self):
+        self.assertEqual(self.export("users").status_code, 404)
+        response = self.export("donors", start="2025-01-01", end="2024-01-01")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,8 @@
+from modeltranslation.translator import register, TranslationOptions
+
+from .models import Campaign
+
+
+@register(Campaign)
+class CampaignTranslationOptions(TranslationOptions):
+    fields = ("subject", "body")
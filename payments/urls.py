@@ -6,6 +6,12 @@ urlpatterns = [
     path(
         "dashboard/donor/<uuid:pk>", views.DonorPageView.as_view(), name="donor_details"
     ),
+    path(
+        "dashboard/donations/",
+        views.DonationReportView.as_view(),
+        name="donation_report",
+    ),
+    path("dashboard/export/<slug:name>/", views.ExportView.as_view(), name="export"),
     # Single payment
     path("donate/", views.create_donation, name="create_donation"),
     # Endpoint for setting up subscription donations
@@ -1,63 +1,214 @@
 import logging
-import os
-import sys
+import threading
+import time
+import uuid
 
-import django
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "uwc_pro.settings")
-django.setup()
+from payments.models import Product, Plan
 
-import paypalrestsdk
-from django.conf import settings
+logger = logging.getLogger(__name__)
 
-paypalrestsdk.configure(
-    {
-        "mode": settings.PAYPAL_MODE,
-        "client_id": settings.PAYPAL_CLIENT_ID,
-        "client_secret": settings.PAYPAL_CLIENT_SECRET,
-    }
-)
+PAYPAL_API_URLS = {
+    "sandbox": "https://api-m.sandbox.paypal.com",
+    "live": "https://api-m.paypal.com",
+}
 
 
-import requests
-from django.conf import settings
-from payments.models import Product, Plan
+class PayPalClient:
+    """
+    Talks to the PayPal REST API over one pooled keep-alive session. The OAuth
+    token is cached until shortly before it expires and refreshed by one
+    thread at a time.
+
+    POSTs carry a ``PayPal-Request-Id``, which makes PayPal treat a retried
+    request as the same one, so they are retried like GETs.
+    """
+
+    # Refresh the token this many seconds before PayPal expires it
+    token_margin = 60
+    # Connect and read timeouts in seconds
+    timeout = (3.05, 15)
+    pool_size = 10
+
+    def __init__(self, client_id, client_secret, base_url):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.base_url = base_url.rstrip("/")
+        self.session = self.create_session()
+        self._token = None
+        self._token_expires = 0
+        self._token_lock = threading.Lock()
+
+    def create_session(self):
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST", "PATCH"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(
+            {"Accept": "application/json", "Accept-Language": "en_GB"}
+        )
+        return session
+
+    def get_access_token(self):
+        if self._token and time.monotonic() < self._token_expires:
+            return self._token
+
+        with self._token_lock:
+            # Another thread may have refreshed it while we waited
+            if self._token and time.monotonic() < self._token_expires:
+                return self._token
+
+            response = self.session.post(
+                f"{self.base_url}/v1/oauth2/token",
+                data={"grant_type": "client_credentials"},
+                auth=(self.client_id, self.client_secret),
+                timeout=self.timeout,
+            )
+            if response.status_code != 200:
+                logger.error("PayPal token request failed: %s", response.status_code)
+                return None
+
+            data = response.json()
+            expires_in = int(data.get("expires_in", 0))
+            self._token = data.get("access_token")
+            self._token_expires = time.monotonic() + max(
+                expires_in - self.token_margin, 0
+            )
+            return self._token
+
+    def clear_access_token(self):
+        with self._token_lock:
+            self._token = None
+            self._token_expires = 0
+
+    def request(self, method, path, **kwargs):
+        """
+        Sends an authenticated request. A token PayPal rejects is refreshed
+        and the request repeated once.
+        """
+        headers = kwargs.pop("headers", {})
+        if method.upper() == "POST":
+            headers.setdefault("PayPal-Request-Id", str(uuid.uuid4()))
+        kwargs.setdefault("timeout", self.timeout)
+
+        response = None
+        for attempt in range(2):
+            access_token = self.get_access_token()
+            if not access_token:
+                return response
+            headers["Authorization"] = f"Bearer {access_token}"
+            response = self.session.request(
+                method, f"{self.base_url}{path}", headers=headers, **kwargs
+            )
+            if response.status_code != 401:
+                break
+            self.clear_access_token()
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+
+_client = None
+_client_lock = threading.Lock()
+_api = None
+_api_lock = threading.Lock()
+
+
+def get_api_url():
+    return settings.PAYPAL_API_URL or PAYPAL_API_URLS.get(
+        settings.PAYPAL_MODE, PAYPAL_API_URLS["sandbox"]
+    )
 
-logger = logging.getLogger(__name__)
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = PayPalClient(
+                    settings.PAYPAL_CLIENT_ID,
+                    settings.PAYPAL_CLIENT_SECRET,
+                    get_api_url(),
+                )
+    return _client
+
+
+def get_api():
+    """
+    Returns the paypalrestsdk API the one-off payments use. The SDK is
+    imported and configured on first use, so only workers that take a
+    payment load it.
+    """
+    global _api
+    if _api is None:
+        with _api_lock:
+            if _api is None:
+                import paypalrestsdk
+
+                options = {
+                    "mode": settings.PAYPAL_MODE,
+                    "client_id": settings.PAYPAL_CLIENT_ID,
+                    "client_secret": settings.PAYPAL_CLIENT_SECRET,
+                }
+                if settings.PAYPAL_API_URL:
+                    options["endpoint"] = settings.PAYPAL_API_URL
+                _api = paypalrestsdk.Api(options)
+    return _api
+
+
+def reset_clients(**kwargs):
+    """Drops the configured clients, e.g. after the PayPal settings change."""
+    global _client, _api
+    with _client_lock, _api_lock:
+        _client = None
+        _api = None
+
+
+def new_payment(data):
+    from paypalrestsdk import Payment
+
+    return Payment(data, api=get_api())
+
+
+def find_payment(payment_id):
+    from paypalrestsdk import Payment
+
+    return Payment.find(payment_id, api=get_api())
 
 
 def get_access_token():
-    url = "https://api-m.sandbox.paypal.com/v1/oauth2/token"
-    auth = (settings.PAYPAL_CLIENT_ID, settings.PAYPAL_CLIENT_SECRET)
-    headers = {"Accept": "application/json", "Accept-Language": "en_GB"}
-    data = {"grant_type": "client_credentials"}
-
-    response = requests.post(url, headers=headers, data=data, auth=auth)
-    if response.status_code == 200:
-        return response.json().get("access_token")
-    else:
-        return None
+    return get_client().get_access_token()
 
 
 def create_product(name, product_type="SERVICE", category="CHARITY"):
-    access_token = get_access_token()
-    if not access_token:
-        return None
-
-    url = "https://api-m.sandbox.paypal.com/v1/catalogs/products"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {access_token}",
-    }
     data = {
         "name": name,
         "type": product_type,
         "category": category,
     }
 
-    response = requests.post(url, headers=headers, json=data)
-    if response.status_code == 201:
+    response = get_client().post("/v1/catalogs/products", json=data)
+    if response is not None and response.status_code == 201:
         product_data = response.json()
         product, created = Product.objects.get_or_create(
             product_id=product_data["id"],
@@ -75,15 +226,6 @@ def create_product(name, product_type="SERVICE", category="CHARITY"):
 def create_billing_plan(
     product, name, amount, interval_unit, interval_count, currency="GBP"
 ):
-    access_token = get_access_token()
-    if not access_token:
-        return None
-
-    url = "https://api-m.sandbox.paypal.com/v1/billing/plans"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {access_token}",
-    }
     data = {
         "product_id": product.product_id,
         "name": name,
@@ -114,8 +256,8 @@ def create_billing_plan(
         },
     }
 
-    response = requests.post(url, headers=headers, json=data)
-    if response.status_code == 201:
+    response = get_client().post("/v1/billing/plans", json=data)
+    if response is not None and response.status_code == 201:
         plan_data = response.json()
         plan, created = Plan.objects.get_or_create(
             plan_id=plan_data["id"],
@@ -134,15 +276,6 @@ def create_billing_plan(
 
 
 def create_subscription(plan, donor, return_url, cancel_url):
-    access_token = get_access_token()
-    if not access_token:
-        raise ValueError("Failed to fetch PayPal access token.")
-
-    url = "https://api-m.sandbox.paypal.com/v1/billing/subscriptions"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {access_token}",
-    }
     data = {
         "plan_id": plan.plan_id,
         "subscriber": {
@@ -159,8 +292,18 @@ def create_subscription(plan, donor, return_url, cancel_url):
         },
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = get_client().post("/v1/billing/subscriptions", json=data)
+    if response is None:
+        raise ValueError("Failed to fetch PayPal access token.")
     if response.status_code == 201:
         return response.json()
     else:
         response.raise_for_status()
+
+
+def get_subscription_details(subscription_id):
+    response = get_client().get(f"/v1/billing/subscriptions/{subscription_id}")
+    if response is None:
+        raise ValueError("Failed to fetch PayPal access token.")
+    response.raise_for_status()
+    return response.json()
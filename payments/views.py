@@ -2,24 +2,41 @@ import json
 import logging
 from decimal import Decimal, InvalidOperation
 
-import requests
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
-from django.core.mail import send_mail
-from django.http import JsonResponse, HttpResponse
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import render, redirect
+from django.utils.translation import get_language
 from django.views.decorators.csrf import csrf_exempt
+from django.views.generic import TemplateView, View
 from django.views.generic.detail import DetailView
 
-from .forms import CustomDonationForm
+from .catalog import get_plan, get_product
+from .exports import EXPORTS, FORMATS, get_filename, get_headers, get_rows
+from .forms import CustomDonationForm, ExportForm
 from .models import Donor, Donation, Subscription, Plan
+from .outbox import queue_mail
+from .reports import (
+    get_average_lifetime_value,
+    get_lifetime_values,
+    get_monthly_totals,
+    get_totals,
+)
 from .utils import (
-    paypalrestsdk,
-    create_product,
-    create_billing_plan,
     create_subscription as create_subscription_util,
-    get_access_token,
+    find_payment,
+    get_subscription_details,
+    new_payment,
 )
+from .webhooks import record_event
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +47,6 @@ def create_donation(request):
         form = CustomDonationForm(request.POST) if not amount else None
 
         if amount:
-            print("amount (raw):", amount)
             try:
                 formatted_amount = Decimal(amount.replace("£", "").strip())
             except (ValueError, InvalidOperation):
@@ -49,7 +65,7 @@ def create_donation(request):
         return_url = request.build_absolute_uri("/payments/success/")
         cancel_url = request.build_absolute_uri("/payments/cancel/")
 
-        payment = paypalrestsdk.Payment(
+        payment = new_payment(
             {
                 "intent": "sale",
                 "payer": {"payment_method": "paypal"},
@@ -92,13 +108,13 @@ def create_subscription(request):
                 defaults={"first_name": "John", "last_name": "Doe"},
             )
 
-            product = create_product(
+            product = get_product(
                 name="Recurring Donation", product_type="SERVICE", category="CHARITY"
             )
             if not product:
                 return JsonResponse({"error": "Failed to create product"}, status=500)
 
-            plan = create_billing_plan(
+            plan = get_plan(
                 product=product,
                 name="Recurring Donation",
                 amount=amount,
@@ -144,36 +160,36 @@ def payment_success(request):
     payer_id = request.GET.get("PayerID")
 
     try:
-        payment = paypalrestsdk.Payment.find(payment_id)
+        payment = find_payment(payment_id)
         if payment.execute({"payer_id": payer_id}):
             payer_info = payment.payer.payer_info
-            transaction = payment.transactions[0]
-
-            donor, created = Donor.objects.get_or_create(
-                email=payer_info.email,
-                defaults={
-                    "first_name": payer_info.first_name,
-                    "last_name": payer_info.last_name,
-                },
-            )
+            sale = payment.transactions[0]
 
-            print("donor:", donor)
+            with transaction.atomic():
+                donor, created = Donor.objects.get_or_create(
+                    email=payer_info.email,
+                    defaults={
+                        "first_name": payer_info.first_name,
+                        "last_name": payer_info.last_name,
+                        "language": get_language(),
+                    },
+                )
 
-            donation = Donation.objects.create(
-                donor=donor,
-                amount=transaction.amount.total,
-                transaction_id=payment.id,
-            )
+                donation = Donation.objects.create(
+                    donor=donor,
+                    amount=sale.amount.total,
+                    transaction_id=payment.id,
+                )
 
-            send_mail(
-                subject="Thank you for your donation!",
-                message=f"Dear {donor.first_name},\n\n"
-                f"Thank you for your generous donation of £{donation.amount}.\n\n"
-                f"Transaction ID: {donation.transaction_id}\n\n"
-                f"We deeply appreciate your support!",
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[donor.email],
-            )
+                queue_mail(
+                    subject="Thank you for your donation!",
+                    message=f"Dear {donor.first_name},\n\n"
+                    f"Thank you for your generous donation of £{donation.amount}.\n\n"
+                    f"Transaction ID: {donation.transaction_id}\n\n"
+                    f"We deeply appreciate your support!",
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    recipient_list=[donor.email],
+                )
 
             return render(request, "payments/success.html", {"donation": donation})
         else:
@@ -189,70 +205,21 @@ def payment_cancel(request):
 
 @csrf_exempt
 def paypal_webhook(request):
+    """
+    Stores the event and answers at once; ``process_webhooks`` applies it.
+    """
     if request.method == "POST":
         try:
             data = json.loads(request.body)
-            event_type = data.get("event_type")
-            resource = data.get("resource")
-
-            if event_type == "BILLING.SUBSCRIPTION.CREATED":
-                subscription_id = resource.get("id")
-                plan_id = resource.get("plan_id")
-                donor_email = resource.get("subscriber", {}).get("email_address")
-
-                plan = Plan.objects.filter(plan_id=plan_id).first()
-                donor, _ = Donor.objects.get_or_create(email=donor_email)
-
-                Subscription.objects.create(
-                    subscription_id=subscription_id,
-                    plan=plan,
-                    donor=donor,
-                    status="ACTIVE",
-                )
-                return JsonResponse({"status": "subscription_created"})
-
-            elif event_type == "BILLING.SUBSCRIPTION.CANCELLED":
-                subscription_id = resource.get("id")
-                subscription = Subscription.objects.filter(
-                    subscription_id=subscription_id
-                ).first()
-                if subscription:
-                    subscription.status = "CANCELLED"
-                    subscription.save()
-                return JsonResponse({"status": "subscription_cancelled"})
-
-            elif event_type == "BILLING.SUBSCRIPTION.SUSPENDED":
-                subscription_id = resource.get("id")
-                subscription = Subscription.objects.filter(
-                    subscription_id=subscription_id
-                ).first()
-                if subscription:
-                    subscription.status = "SUSPENDED"
-                    subscription.save()
-                return JsonResponse({"status": "subscription_suspended"})
-
-            elif event_type == "PAYMENT.SALE.COMPLETED":
-                subscription_id = resource.get("billing_agreement_id")
-                payment_amount = resource.get("amount", {}).get("total")
-                currency = resource.get("amount", {}).get("currency")
-
-                return JsonResponse({"status": "payment_completed"})
-
-            return JsonResponse({"status": "event_ignored"})
-
-        except Exception as e:
+        except ValueError as e:
             return JsonResponse({"error": str(e)}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({"error": "Invalid event."}, status=400)
 
-    return HttpResponse(status=405)
-
+        record_event(data)
+        return JsonResponse({"status": "received"})
 
-def get_subscription_details(subscription_id):
-    access_token = get_access_token()
-    url = f"https://api-m.sandbox.paypal.com/v1/billing/subscriptions/{subscription_id}"
-    headers = {"Authorization": f"Bearer {access_token}"}
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return HttpResponse(status=405)
 
 
 def subscription_success(request):
@@ -271,41 +238,46 @@ def subscription_success(request):
                 subscriber_email = response.get("subscriber", {}).get("email_address")
 
                 plan = Plan.objects.filter(plan_id=plan_id).first()
-                donor, created = Donor.objects.get_or_create(
-                    email=subscriber_email,
-                    defaults={"first_name": "Unknown", "last_name": "Unknown"},
-                )
-
-                subscription, created = Subscription.objects.update_or_create(
-                    subscription_id=subscription_id,
-                    defaults={
-                        "plan": plan,
-                        "donor": donor,
-                        "status": response.get("status"),
-                        "created_at": response.get("start_time"),
-                        "updated_at": response.get("update_time"),
-                    },
-                )
-
-                send_mail(
-                    subject="Thank you for subscribing!",
-                    message=(
-                        f"Dear {subscription.donor.first_name},\n\n"
-                        f'Thank you for joining us and subscribing to the "{subscription.plan.name}" plan!\n\n'
-                        f"Your subscription details are as follows:\n"
-                        f"- Subscription ID: {subscription.subscription_id}\n"
-                        f"- Plan: {subscription.plan.name}\n"
-                        f"- Amount: £{subscription.plan.amount} {subscription.plan.currency}\n"
-                        f"- Billing Frequency: Every {subscription.plan.interval_count} {subscription.plan.interval_unit.lower()}(s)\n\n"
-                        f"Your support means so much to us and helps us continue making a difference. "
-                        f"If you have any questions or need assistance, feel free to reach out.\n\n"
-                        f"Thank you for being a part of our community!\n\n"
-                        f"Warm regards,\n"
-                        f"The Team"
-                    ),
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[subscription.donor.email],
-                )
+                with transaction.atomic():
+                    donor, created = Donor.objects.get_or_create(
+                        email=subscriber_email,
+                        defaults={
+                            "first_name": "Unknown",
+                            "last_name": "Unknown",
+                            "language": get_language(),
+                        },
+                    )
+
+                    subscription, created = Subscription.objects.update_or_create(
+                        subscription_id=subscription_id,
+                        defaults={
+                            "plan": plan,
+                            "donor": donor,
+                            "status": response.get("status"),
+                            "created_at": response.get("start_time"),
+                            "updated_at": response.get("update_time"),
+                        },
+                    )
+
+                    queue_mail(
+                        subject="Thank you for subscribing!",
+                        message=(
+                            f"Dear {subscription.donor.first_name},\n\n"
+                            f'Thank you for joining us and subscribing to the "{subscription.plan.name}" plan!\n\n'
+                            f"Your subscription details are as follows:\n"
+                            f"- Subscription ID: {subscription.subscription_id}\n"
+                            f"- Plan: {subscription.plan.name}\n"
+                            f"- Amount: £{subscription.plan.amount} {subscription.plan.currency}\n"
+                            f"- Billing Frequency: Every {subscription.plan.interval_count} {subscription.plan.interval_unit.lower()}(s)\n\n"
+                            f"Your support means so much to us and helps us continue making a difference. "
+                            f"If you have any questions or need assistance, feel free to reach out.\n\n"
+                            f"Thank you for being a part of our community!\n\n"
+                            f"Warm regards,\n"
+                            f"The Team"
+                        ),
+                        from_email=settings.DEFAULT_FROM_EMAIL,
+                        recipient_list=[subscription.donor.email],
+                    )
 
                 return render(
                     request,
@@ -339,7 +311,68 @@ class DonorPageView(LoginRequiredMixin, PermissionRequiredMixin, DetailView):
     redirect_field_name = "next"
     permission_required = "payments.view_donor"
 
+    # The history shows the latest donations, the total covers all of them
+    paginate_donations = 50
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["donations"] = Donation.objects.filter(donor=self.object)
+        donations = Donation.objects.filter(donor=self.object)
+        context["donations"] = donations.order_by("-donated_at")[
+            : self.paginate_donations
+        ]
+        context.update(
+            donations.aggregate(
+                donation_count=Count("id"), total=Sum("amount", default=0)
+            )
+        )
         return context
+
+
+class DonationReportView(LoginRequiredMixin, PermissionRequiredMixin, TemplateView):
+    template_name = "payments/report.html"
+    login_url = "account_login"
+    redirect_field_name = "next"
+    permission_required = "payments.view_donation"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["totals"] = get_totals()
+        context["months"] = get_monthly_totals()
+        context["top_donors"] = get_lifetime_values()
+        context["average_lifetime_value"] = get_average_lifetime_value()
+        return context
+
+
+class ExportView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    """
+    Streams donors, donations or subscriptions as CSV or Excel, optionally
+    limited to a date range, e.g. ``?start=2024-04-06&end=2025-04-05``.
+    """
+
+    login_url = "account_login"
+    redirect_field_name = "next"
+
+    def dispatch(self, request, *args, **kwargs):
+        if kwargs["name"] not in EXPORTS:
+            raise Http404
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_permission_required(self):
+        model = EXPORTS[self.kwargs["name"]]["model"]
+        return [f"payments.view_{model._meta.model_name}"]
+
+    def get(self, request, name):
+        form = ExportForm(request.GET)
+        if not form.is_valid():
+            return HttpResponseBadRequest(form.errors.as_text())
+
+        start, end = form.cleaned_data["start"], form.cleaned_data["end"]
+        file_format = form.cleaned_data["format"] or "csv"
+        content_type, stream = FORMATS[file_format]
+        response = StreamingHttpResponse(
+            stream(get_headers(name), get_rows(name, start, end)),
+            content_type=content_type,
+        )
+        filename = get_filename(name, file_format, start, end)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import logging
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Donation, Donor, Plan, Subscription, WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIPTION_STATUSES = {
+    "BILLING.SUBSCRIPTION.ACTIVATED": "ACTIVE",
+    "BILLING.SUBSCRIPTION.CANCELLED": "CANCELLED",
+    "BILLING.SUBSCRIPTION.SUSPENDED": "SUSPENDED",
+}
+
+
+def get_resource_id(event_type, resource):
+    if event_type.startswith("BILLING.SUBSCRIPTION."):
+        return resource.get("id") or ""
+    if event_type.startswith("PAYMENT.SALE."):
+        return resource.get("billing_agreement_id") or ""
+    return ""
+
+
+def record_event(data):
+    """
+    Stores an event unless it was received before. PayPal retries deliveries,
+    so the event id decides whether an event is new.
+    """
+    event_type = data.get("event_type") or ""
+    resource = data.get("resource") or {}
+    event_id = data.get("id")
+    if not event_id:
+        body = json.dumps(data, sort_keys=True).encode()
+        event_id = hashlib.sha256(body).hexdigest()[:64]
+
+    occurred_at = parse_datetime(data.get("create_time") or "") or timezone.now()
+    WebhookEvent.objects.bulk_create(
+        [
+            WebhookEvent(
+                event_id=event_id,
+                event_type=event_type,
+                resource_id=get_resource_id(event_type, resource),
+                payload=data,
+                occurred_at=occurred_at,
+            )
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def subscription_created(resource):
+    plan = Plan.objects.filter(plan_id=resource.get("plan_id")).first()
+    if plan is None:
+        raise ValueError(f"Unknown plan {resource.get('plan_id')}.")
+
+    donor_email = resource.get("subscriber", {}).get("email_address")
+    donor, _ = Donor.objects.get_or_create(email=donor_email)
+    Subscription.objects.get_or_create(
+        subscription_id=resource.get("id"),
+        defaults={"plan": plan, "donor": donor, "status": "ACTIVE"},
+    )
+
+
+def sale_completed(resource):
+    subscription_id = resource.get("billing_agreement_id")
+    if not subscription_id:
+        # One-off payments are recorded when the donor returns from PayPal
+        return
+
+    subscription = (
+        Subscription.objects.filter(subscription_id=subscription_id)
+        .select_related("donor")
+        .first()
+    )
+    if subscription is None:
+        raise ValueError(f"Unknown subscription {subscription_id}.")
+
+    Donation.objects.get_or_create(
+        transaction_id=resource.get("id"),
+        defaults={
+            "donor": subscription.donor,
+            "subscription": subscription,
+            "amount": resource.get("amount", {}).get("total"),
+        },
+    )
+
+
+def apply_event(event):
+    resource = event.payload.get("resource") or {}
+    if event.event_type == "BILLING.SUBSCRIPTION.CREATED":
+        subscription_created(resource)
+    elif event.event_type in SUBSCRIPTION_STATUSES:
+        Subscription.objects.filter(subscription_id=resource.get("id")).update(
+            status=SUBSCRIPTION_STATUSES[event.event_type]
+        )
+    elif event.event_type == "PAYMENT.SALE.COMPLETED":
+        sale_completed(resource)
+
+
+def process_event(event):
+    try:
+        with transaction.atomic():
+            apply_event(event)
+    except Exception as e:
+        logger.exception("Webhook event %s failed.", event.event_id)
+        event.fail(e)
+    else:
+        event.status = WebhookEvent.Status.DONE
+        event.error = ""
+        event.processed_at = timezone.now()
+    event.save()
+
+
+def process_pending(batch_size=50):
+    """
+    Applies one batch of due events, oldest first. An event waits while an
+    earlier event of the same subscription is still pending, so workers
+    sharing the queue never apply a subscription's events out of order.
+    """
+    earlier = WebhookEvent.objects.filter(
+        Q(occurred_at__lt=OuterRef("occurred_at"))
+        | Q(occurred_at=OuterRef("occurred_at"), id__lt=OuterRef("id")),
+        resource_id=OuterRef("resource_id"),
+        status=WebhookEvent.Status.PENDING,
+    ).exclude(resource_id="")
+    with transaction.atomic():
+        events = list(
+            WebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(status=WebhookEvent.Status.PENDING, run_after__lte=timezone.now())
+            .exclude(Exists(earlier))
+            .order_by("occurred_at", "id")[:batch_size]
+        )
+        for event in events:
+            process_event(event)
+    return len(events)
@@ -123,10 +123,13 @@ for _, row in data.iterrows():
             # Add phone numbers
             phone_numbers = row.get("Phone Number", "")
             if pd.notna(phone_numbers):
-                for phone in str(phone_numbers).split(";"):
-                    phone_cleaned = phone.strip().replace(".0", "")
-                    if phone_cleaned:
-                        Phone.objects.get_or_create(branch=branch, number=phone_cleaned)
+                phones = [
+                    phone.strip().replace(".0", "")
+                    for phone in str(phone_numbers).split(";")
+                ]
+                invalid = Phone.objects.add_numbers(branch, filter(None, phones))
+                for phone, error in invalid.items():
+                    print(f"Skipping phone '{phone}' for '{title_en}': {error}")
 
             # Add email addresses
             emails = safe_strip(row.get("Email"))
@@ -14,4 +14,20 @@ $(document).ready(function () {
         loadingText.hide();
         contentDraft.show()
     });
-});
\ No newline at end of file
+});
+$(document).ready(function () {
+    const uploadStatus = $("#upload-status[data-status-url]");
+
+    if (!uploadStatus.length) {
+        return;
+    }
+
+    const poll = setInterval(function () {
+        $.getJSON(uploadStatus.data("status-url"), function (data) {
+            if (data.status !== "PD") {
+                clearInterval(poll);
+                window.location.reload();
+            }
+        });
+    }, 3000);
+});
@@ -46,4 +46,57 @@ $(document).ready(function () {
             $formRow.remove();
         }
     });
-});
\ No newline at end of file
+
+    function initPersonAutocomplete($select) {
+        const url = $select.data("autocomplete-url");
+        const $input = $("<input type='search' class='form-control mb-1' autocomplete='off'>")
+            .attr("placeholder", "Search people")
+            .val($select.find("option:selected").val() ? $select.find("option:selected").text() : "");
+        const $results = $("<div class='list-group position-absolute w-100 shadow-sm' style='z-index: 10'></div>");
+        const $wrapper = $("<div class='position-relative'></div>").append($input, $results);
+        let timer = null;
+        let request = null;
+
+        $select.addClass("d-none").before($wrapper);
+
+        function choose(id, text) {
+            if (id && !$select.find(`option[value="${id}"]`).length) {
+                $select.append(new Option(text, id));
+            }
+            $select.val(id).trigger("change");
+            $input.val(id ? text : "");
+            $results.empty();
+        }
+
+        $input.on("input", function () {
+            const query = $input.val().trim();
+            clearTimeout(timer);
+            if (!query) {
+                choose("", "");
+                return;
+            }
+            timer = setTimeout(function () {
+                if (request) request.abort();
+                request = $.getJSON(url, {q: query}, function (data) {
+                    $results.empty();
+                    data.results.forEach(function (person) {
+                        $("<button type='button' class='list-group-item list-group-item-action'></button>")
+                            .text(person.text)
+                            .on("click", function () {
+                                choose(person.id, person.text);
+                            })
+                            .appendTo($results);
+                    });
+                });
+            }, 250);
+        });
+
+        $input.on("keydown", function (event) {
+            if (event.key === "Escape") $results.empty();
+        });
+    }
+
+    $("select[data-autocomplete-url]").each(function () {
+        initPersonAutocomplete($(this));
+    });
+});